@@ -2,7 +2,7 @@
 
 import json
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import AnyHttpUrl, Field, field_validator
 from pydantic_settings import BaseSettings, DotEnvSettingsSource, SettingsConfigDict
@@ -40,14 +40,71 @@ class Settings(BaseSettings):
     supabase_service_role_key: str = Field(default="local-service-key", alias="SUPABASE_SERVICE_ROLE_KEY")
     supabase_jwt_secret: str = Field(default="local-secret", alias="SUPABASE_JWT_SECRET")
     supabase_api_audience: str = Field(default="authenticated", alias="SUPABASE_API_AUDIENCE")
+    supabase_jwt_local_verification: bool = Field(default=False, alias="SUPABASE_JWT_LOCAL_VERIFICATION")
+    supabase_token_cache_size: int = Field(default=4096, alias="SUPABASE_TOKEN_CACHE_SIZE")
     supabase_http_timeout_seconds: float = Field(default=1.0, alias="SUPABASE_HTTP_TIMEOUT_SECONDS")
+    supabase_http_max_connections: int = Field(default=100, alias="SUPABASE_HTTP_MAX_CONNECTIONS")
+    supabase_http_max_keepalive_connections: int = Field(default=20, alias="SUPABASE_HTTP_MAX_KEEPALIVE_CONNECTIONS")
+    supabase_http_keepalive_expiry_seconds: float = Field(default=30.0, alias="SUPABASE_HTTP_KEEPALIVE_EXPIRY_SECONDS")
+    supabase_http2_enabled: bool = Field(default=False, alias="SUPABASE_HTTP2_ENABLED")
     supabase_metadata_cache_path: Path | None = Field(
         default=Path(".ai/supabase-metadata-cache.json"),
         alias="SUPABASE_METADATA_CACHE_PATH",
     )
+    supabase_metadata_flush_interval_seconds: float = Field(
+        default=1.0,
+        alias="SUPABASE_METADATA_FLUSH_INTERVAL_SECONDS",
+    )
+    supabase_metadata_flush_batch_size: int = Field(default=100, alias="SUPABASE_METADATA_FLUSH_BATCH_SIZE")
+    supabase_metadata_compact_min_records: int = Field(
+        default=1000,
+        alias="SUPABASE_METADATA_COMPACT_MIN_RECORDS",
+    )
+    supabase_metadata_cache_policy: Literal["lru", "lfu"] = Field(default="lru", alias="SUPABASE_METADATA_CACHE_POLICY")
+    supabase_metadata_cache_max_entries: int = Field(default=10_000, alias="SUPABASE_METADATA_CACHE_MAX_ENTRIES")
+    supabase_metadata_cache_ttl_seconds: float | None = Field(default=None, alias="SUPABASE_METADATA_CACHE_TTL_SECONDS")
+    redis_url: str | None = Field(default=None, alias="REDIS_URL")
+    redis_session_ttl_seconds: int = Field(default=300, alias="REDIS_SESSION_TTL_SECONDS")
+    redis_metadata_ttl_seconds: int = Field(default=86_400, alias="REDIS_METADATA_TTL_SECONDS")
+    plan_usage_backend: Literal["memory", "redis"] = Field(default="memory", alias="PLAN_USAGE_BACKEND")
+    plan_usage_read_cache_ttl_seconds: float = Field(default=1.0, alias="PLAN_USAGE_READ_CACHE_TTL_SECONDS")
+    plan_usage_windows: dict[str, Literal["fixed", "sliding", "token_bucket"]] = Field(
+        default_factory=dict,
+        alias="PLAN_USAGE_WINDOWS",
+    )
+    plan_usage_sliding_buckets: int = Field(default=288, alias="PLAN_USAGE_SLIDING_BUCKETS")
+    plan_usage_sweep_interval_seconds: float = Field(default=60.0, alias="PLAN_USAGE_SWEEP_INTERVAL_SECONDS")
     datadog_log_endpoint: AnyHttpUrl | None = Field(default="http://127.0.0.1:8282/logs", alias="DATADOG_LOG_ENDPOINT")
     datadog_api_key: str | None = Field(default=None, alias="DATADOG_API_KEY")
-    compliance_export_path: Path = Field(default=Path("docs/ops/audit-log-sample.csv"), alias="COMPLIANCE_EXPORT_PATH")
+    datadog_queue_max_events: int = Field(default=10_000, alias="DATADOG_QUEUE_MAX_EVENTS")
+    datadog_batch_max_events: int = Field(default=500, alias="DATADOG_BATCH_MAX_EVENTS")
+    datadog_batch_max_bytes: int = Field(default=1_000_000, alias="DATADOG_BATCH_MAX_BYTES")
+    datadog_flush_interval_seconds: float = Field(default=2.0, alias="DATADOG_FLUSH_INTERVAL_SECONDS")
+    datadog_gzip_enabled: bool = Field(default=True, alias="DATADOG_GZIP_ENABLED")
+    datadog_overflow_policy: Literal["drop_oldest", "drop_newest", "block"] = Field(
+        default="drop_oldest",
+        alias="DATADOG_OVERFLOW_POLICY",
+    )
+    datadog_spool_path: Path | None = Field(default=Path(".ai/datadog-spool"), alias="DATADOG_SPOOL_PATH")
+    datadog_spool_max_bytes: int = Field(default=256 * 1024 * 1024, alias="DATADOG_SPOOL_MAX_BYTES")
+    datadog_spool_segment_bytes: int = Field(default=8 * 1024 * 1024, alias="DATADOG_SPOOL_SEGMENT_BYTES")
+    datadog_retry_max_seconds: float = Field(default=60.0, alias="DATADOG_RETRY_MAX_SECONDS")
+    audit_dispatch_mode: Literal["await", "background"] = Field(default="background", alias="AUDIT_DISPATCH_MODE")
+    audit_sink_timeout_seconds: float = Field(default=2.0, alias="AUDIT_SINK_TIMEOUT_SECONDS")
+    audit_drain_timeout_seconds: float = Field(default=10.0, alias="AUDIT_DRAIN_TIMEOUT_SECONDS")
+    audit_max_pending: int = Field(default=1_000, alias="AUDIT_MAX_PENDING")
+    audit_journal_path: Path | None = Field(default=Path(".ai/audit-journal.log"), alias="AUDIT_JOURNAL_PATH")
+    audit_history_capacity: int = Field(default=10_000, alias="AUDIT_HISTORY_CAPACITY")
+    notification_history_capacity: int = Field(default=1_000, alias="NOTIFICATION_HISTORY_CAPACITY")
+    compliance_history_capacity: int = Field(default=10_000, alias="COMPLIANCE_HISTORY_CAPACITY")
+    audit_store_path: Path | None = Field(default=Path(".ai/audit-events.sqlite3"), alias="AUDIT_STORE_PATH")
+    audit_store_batch_size: int = Field(default=100, alias="AUDIT_STORE_BATCH_SIZE")
+    compliance_export_path: Path = Field(default=Path(".ai/compliance/audit-log.csv"), alias="COMPLIANCE_EXPORT_PATH")
+    compliance_rotate_max_bytes: int | None = Field(default=64 * 1024 * 1024, alias="COMPLIANCE_ROTATE_MAX_BYTES")
+    compliance_rotate_daily: bool = Field(default=True, alias="COMPLIANCE_ROTATE_DAILY")
+    compliance_fsync_interval_seconds: float = Field(default=1.0, alias="COMPLIANCE_FSYNC_INTERVAL_SECONDS")
+    compliance_archive_path: Path | None = Field(default=None, alias="COMPLIANCE_ARCHIVE_PATH")
+    compliance_archive_batch_size: int = Field(default=10_000, alias="COMPLIANCE_ARCHIVE_BATCH_SIZE")
     notification_channel: str | None = Field(default=None, alias="NOTIFICATION_CHANNEL")
     cors_allow_origins: list[str] = Field(
         default_factory=lambda: ["http://localhost:3000", "http://127.0.0.1:3000"],
@@ -61,6 +118,16 @@ class Settings(BaseSettings):
             return [origin.strip() for origin in value.split(",") if origin.strip()]
         return value
 
+    @field_validator("plan_usage_windows", mode="before")
+    @classmethod
+    def _parse_plan_usage_windows(cls, value: Any) -> dict[str, str] | Any:
+        """Accept ``backtests=sliding,paper_trades=token_bucket`` as well as JSON."""
+
+        if isinstance(value, str):
+            pairs = (item.split("=", 1) for item in value.split(",") if item.strip())
+            return {metric.strip(): kind.strip() for metric, kind in pairs}
+        return value
+
     @classmethod
     def settings_customise_sources(
         cls,
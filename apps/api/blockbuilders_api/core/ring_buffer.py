@@ -0,0 +1,104 @@
+"""Fixed-capacity ring buffer with sequence-number cursors for paging in-memory history."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Generic, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RingPage(Generic[T]):
+    """One page of entries. Pass ``next_cursor`` back to continue; it is None at the end."""
+
+    items: List[T]
+    next_cursor: Optional[int]
+
+
+class RingBuffer(Generic[T]):
+    """Keeps the most recent ``capacity`` entries in a preallocated list.
+
+    Every appended entry gets a monotonically increasing sequence number, which doubles as a
+    stable paging cursor: entries evicted between two page requests are simply skipped. When
+    the buffer is full the oldest entry is handed to ``on_evict`` before it is overwritten.
+    """
+
+    def __init__(self, capacity: int, *, on_evict: Callable[[T], None] | None = None) -> None:
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive")
+        self.capacity = capacity
+        self.on_evict = on_evict
+        self._slots: List[Optional[T]] = [None] * capacity
+        self._next_sequence = 0
+        self._size = 0
+        self._evicted = 0
+        self._lock = Lock()
+
+    @property
+    def first_sequence(self) -> int:
+        return self._next_sequence - self._size
+
+    def append(self, item: T) -> int:
+        evicted: Optional[T] = None
+        with self._lock:
+            sequence = self._next_sequence
+            slot = sequence % self.capacity
+            if self._size == self.capacity:
+                evicted = self._slots[slot]
+                self._evicted += 1
+            else:
+                self._size += 1
+            self._slots[slot] = item
+            self._next_sequence += 1
+        if evicted is not None and self.on_evict is not None:
+            self.on_evict(evicted)
+        return sequence
+
+    def get(self, sequence: int) -> Optional[T]:
+        with self._lock:
+            if not self.first_sequence <= sequence < self._next_sequence:
+                return None
+            return self._slots[sequence % self.capacity]
+
+    def page(self, cursor: int | None = None, limit: int = 100) -> RingPage[T]:
+        """Return up to ``limit`` entries, oldest first, starting at sequence ``cursor``."""
+
+        with self._lock:
+            start = max(cursor or 0, self.first_sequence)
+            stop = min(start + limit, self._next_sequence)
+            items = [self._slots[sequence % self.capacity] for sequence in range(start, stop)]
+            next_cursor = stop if stop < self._next_sequence else None
+        return RingPage(items=items, next_cursor=next_cursor)  # type: ignore[arg-type]
+
+    def __iter__(self) -> Iterator[T]:
+        """Iterate oldest to newest without copying; entries evicted mid-iteration are skipped."""
+
+        sequence = self.first_sequence
+        end = self._next_sequence
+        while sequence < end:
+            sequence = max(sequence, self.first_sequence)
+            if sequence >= end:
+                break
+            item = self.get(sequence)
+            sequence += 1
+            if item is not None:
+                yield item
+
+    def to_list(self) -> List[T]:
+        with self._lock:
+            start = self.first_sequence
+            return [self._slots[sequence % self.capacity] for sequence in range(start, self._next_sequence)]  # type: ignore[misc]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slots = [None] * self.capacity
+            self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def evicted(self) -> int:
+        return self._evicted
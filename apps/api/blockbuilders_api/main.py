@@ -1,43 +1,125 @@
 """FastAPI application entrypoint."""
 
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .core.config import settings
+from .repositories.audit_journal import AuditJournal
+from .repositories.audit_store import SqliteAuditStore
 from .repositories.compliance import ComplianceRepository
-from .routers import auth, plan_usage, strategies
+from .repositories.compliance_archive import ComplianceArchive
+from .routers import audit, auth, plan_usage, strategies
 from .services.audit import AuditService
 from .services.datadog import DatadogLogClient
+from .services.datadog_spool import DiskSpool
 from .services.notifications import NotificationService
+from .services.plan_usage import get_plan_usage_service
+from .services.supabase import SupabaseService
 
 
 def create_app() -> FastAPI:
     """Configure FastAPI application with routers and services."""
-    app = FastAPI(title="BlockBuilders API", version="0.1.0")
 
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=[origin for origin in settings.cors_allow_origins if origin],
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
-        expose_headers=["*"],
+    datadog_spool = (
+        DiskSpool(
+            settings.datadog_spool_path,
+            max_bytes=settings.datadog_spool_max_bytes,
+            segment_bytes=settings.datadog_spool_segment_bytes,
+        )
+        if settings.datadog_spool_path
+        else None
     )
-
     datadog_client = DatadogLogClient(
         endpoint=str(settings.datadog_log_endpoint) if settings.datadog_log_endpoint else None,
         api_key=settings.datadog_api_key,
+        max_queue_events=settings.datadog_queue_max_events,
+        max_batch_events=settings.datadog_batch_max_events,
+        max_batch_bytes=settings.datadog_batch_max_bytes,
+        flush_interval_seconds=settings.datadog_flush_interval_seconds,
+        compress=settings.datadog_gzip_enabled,
+        overflow_policy=settings.datadog_overflow_policy,
+        spool=datadog_spool,
+        retry_max_seconds=settings.datadog_retry_max_seconds,
+    )
+    compliance_repo = ComplianceRepository(
+        export_path=settings.compliance_export_path,
+        rotate_max_bytes=settings.compliance_rotate_max_bytes,
+        rotate_daily=settings.compliance_rotate_daily,
+        fsync_interval_seconds=settings.compliance_fsync_interval_seconds,
+        history_capacity=settings.compliance_history_capacity,
+        archive=(
+            ComplianceArchive(settings.compliance_archive_path, batch_size=settings.compliance_archive_batch_size)
+            if settings.compliance_archive_path
+            else None
+        ),
+    )
+    notification_service = NotificationService(
+        channel=settings.notification_channel or "audit-alerts",
+        history_capacity=settings.notification_history_capacity,
     )
-    compliance_repo = ComplianceRepository(export_path=settings.compliance_export_path)
-    notification_service = NotificationService(channel=settings.notification_channel or "audit-alerts")
 
+    audit_store = (
+        SqliteAuditStore(settings.audit_store_path, batch_size=settings.audit_store_batch_size)
+        if settings.audit_store_path
+        else None
+    )
+    audit_journal = AuditJournal(settings.audit_journal_path) if settings.audit_journal_path else None
     audit_service = AuditService(
         datadog=datadog_client,
         compliance=compliance_repo,
         notifications=notification_service,
+        store=audit_store,
+        journal=audit_journal,
+        dispatch_mode=settings.audit_dispatch_mode,
+        sink_timeout_seconds=settings.audit_sink_timeout_seconds,
+        max_pending=settings.audit_max_pending,
+        history_capacity=settings.audit_history_capacity,
+    )
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        """Open long-lived resources on startup and release them on shutdown."""
+
+        await SupabaseService.open_http_pool()
+        await SupabaseService.start_metadata_persister()
+        await SupabaseService.start_shared_cache()
+        await datadog_client.start()
+        if audit_store is not None:
+            await audit_store.start()
+        await audit_service.recover()
+        await get_plan_usage_service().start()
+        try:
+            yield
+        finally:
+            await get_plan_usage_service().aclose()
+            await audit_service.drain(settings.audit_drain_timeout_seconds)
+            await datadog_client.aclose()
+            compliance_repo.close()
+            if audit_store is not None:
+                await audit_store.aclose()
+            if audit_journal is not None:
+                audit_journal.close()
+            await SupabaseService.stop_shared_cache()
+            await SupabaseService.stop_metadata_persister()
+            await SupabaseService.close_http_pool()
+
+    app = FastAPI(title="BlockBuilders API", version="0.1.0", lifespan=lifespan)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[origin for origin in settings.cors_allow_origins if origin],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["*"],
     )
+
     app.dependency_overrides[AuditService] = lambda: audit_service
 
+    app.include_router(audit.router, prefix="/api/v1")
     app.include_router(auth.router, prefix="/api/v1")
     app.include_router(plan_usage.router, prefix="/api/v1")
     app.include_router(strategies.router, prefix="/api/v1")
@@ -46,6 +128,20 @@ def create_app() -> FastAPI:
     def healthcheck() -> dict[str, str]:
         return {"status": "ok"}
 
+    @app.get("/healthz/metrics", tags=["health"])
+    def runtime_metrics() -> dict[str, Any]:
+        return {
+            "supabaseHttpPool": SupabaseService.http_pool_metrics(),
+            "supabaseUserLookups": SupabaseService.user_lookup_metrics(),
+            "supabaseMetadataCache": SupabaseService.metadata_cache_metrics(),
+            "supabaseMetadataPersister": SupabaseService.metadata_persister_metrics(),
+            "supabaseSharedCache": SupabaseService.shared_cache_metrics(),
+            "datadog": datadog_client.metrics(),
+            "auditSinks": audit_service.metrics(),
+            "auditStore": audit_store.metrics() if audit_store is not None else None,
+            "planUsage": get_plan_usage_service().metrics(),
+        }
+
     return app
 
 
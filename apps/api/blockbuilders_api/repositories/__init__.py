@@ -1,6 +1,8 @@
 """Repository layer abstractions."""
 
 from .compliance import ComplianceRepository
+from .compliance_archive import ComplianceArchive
+from .metadata_log import MetadataLogStore
 from .plan_usage import PlanUsageRepository
 
-__all__ = ["PlanUsageRepository", "ComplianceRepository"]
+__all__ = ["PlanUsageRepository", "ComplianceRepository", "ComplianceArchive", "MetadataLogStore"]
@@ -0,0 +1,129 @@
+"""Write-ahead journal that keeps background audit deliveries recoverable across crashes."""
+
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Collection, Dict, List, Set, TextIO, Tuple
+
+from blockbuilders_shared import AuditLogEvent
+
+LOGGER = logging.getLogger(__name__)
+
+_EVENT = "E"
+_DONE = "D"
+
+
+class AuditJournal:
+    """Append-only log of ``E\\t<event json>`` and ``D\\t<event id>\\t<sink>`` records.
+
+    ``append`` fsyncs the event before ``record`` returns, naming the sinks that must persist
+    it; each of those sinks calls ``complete`` once its copy is durable. After a crash,
+    :meth:`recover` returns every event with the sinks it is still missing, so it is replayed
+    only where it was lost. The file is truncated whenever nothing is outstanding and it has
+    grown past ``compact_bytes``.
+    """
+
+    def __init__(self, path: Path, *, compact_bytes: int = 4 * 1024 * 1024) -> None:
+        self.path = path
+        self.compact_bytes = compact_bytes
+        self._open: Dict[str, Set[str]] = {}
+        self._handle: TextIO | None = None
+        self._lock = Lock()
+        self._journaled = 0
+        self._recovered = 0
+        self._compactions = 0
+
+    def _ensure_open_locked(self) -> TextIO:
+        if self._handle is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = self.path.open("a", encoding="utf-8")
+        return self._handle
+
+    def recover(self, sinks: Collection[str]) -> List[Tuple[AuditLogEvent, Set[str]]]:
+        """Events journaled by earlier processes, oldest first, with the ``sinks`` still missing them."""
+
+        with self._lock:
+            if not self.path.exists():
+                return []
+            events: Dict[str, AuditLogEvent] = {}
+            done: Dict[str, Set[str]] = {}
+            complete = 0
+            torn = False
+            with self.path.open("rb") as handle:
+                for line in handle:
+                    if not line.endswith(b"\n"):
+                        torn = True
+                        break
+                    complete += len(line)
+                    kind, _, payload = line[:-1].decode("utf-8", errors="replace").partition("\t")
+                    if kind == _EVENT:
+                        try:
+                            event = AuditLogEvent.model_validate_json(payload)
+                        except ValueError:
+                            LOGGER.warning("Skipping unreadable audit journal record in %s", self.path)
+                            continue
+                        events[event.id] = event
+                    elif kind == _DONE:
+                        event_id, _, sink = payload.partition("\t")
+                        done.setdefault(event_id, set()).add(sink)
+            if torn:
+                # An event whose line never finished was never acknowledged to its caller.
+                LOGGER.warning("Truncating torn trailing record in %s at byte %d", self.path, complete)
+                with self.path.open("r+b") as handle:
+                    handle.truncate(complete)
+
+            pending: List[Tuple[AuditLogEvent, Set[str]]] = []
+            for event_id, event in events.items():
+                missing = set(sinks) - done.get(event_id, set())
+                if missing:
+                    self._open[event_id] = missing
+                    pending.append((event, set(missing)))
+            self._recovered += len(pending)
+            return pending
+
+    def append(self, event: AuditLogEvent, sinks: Collection[str]) -> None:
+        if not sinks:
+            return
+        line = f"{_EVENT}\t{event.model_dump_json()}\n"
+        with self._lock:
+            handle = self._ensure_open_locked()
+            handle.write(line)
+            handle.flush()
+            os.fsync(handle.fileno())
+            self._open[event.id] = set(sinks)
+            self._journaled += 1
+
+    def complete(self, event_id: str, sink: str) -> None:
+        """Record that ``sink`` holds a durable copy; losing this record to a crash only causes a duplicate."""
+
+        with self._lock:
+            missing = self._open.get(event_id)
+            if missing is None or sink not in missing:
+                return
+            missing.discard(sink)
+            if not missing:
+                del self._open[event_id]
+            handle = self._ensure_open_locked()
+            handle.write(f"{_DONE}\t{event_id}\t{sink}\n")
+            handle.flush()
+            if not self._open and handle.tell() >= self.compact_bytes:
+                handle.truncate(0)
+                os.fsync(handle.fileno())
+                self._compactions += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._open),
+            "journaledTotal": self._journaled,
+            "recoveredTotal": self._recovered,
+            "compactionsTotal": self._compactions,
+        }
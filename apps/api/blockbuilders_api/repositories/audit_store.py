@@ -0,0 +1,265 @@
+"""Embedded SQLite store for audit events with indexed, keyset-paginated queries."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from blockbuilders_shared import AuditEventType, AuditLogEvent
+
+LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_events (
+    id TEXT PRIMARY KEY,
+    actor_id TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    created_at_us INTEGER NOT NULL,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS audit_events_actor_created ON audit_events (actor_id, created_at_us);
+CREATE INDEX IF NOT EXISTS audit_events_type_created ON audit_events (event_type, created_at_us);
+"""
+
+AuditCursor = Tuple[int, str]
+
+
+def _to_micros(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(value: int) -> datetime:
+    seconds, micros = divmod(value, 1_000_000)
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(microsecond=micros)
+
+
+def encode_cursor(created_at: datetime, event_id: str) -> str:
+    raw = f"{_to_micros(created_at)}|{event_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> AuditCursor:
+    """Inverse of :func:`encode_cursor`; raises ValueError for malformed input."""
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        micros, _, event_id = raw.partition("|")
+        return int(micros), event_id
+    except (UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Invalid audit cursor") from exc
+
+
+@dataclass(frozen=True)
+class AuditEventQuery:
+    actor_id: str | None = None
+    event_type: AuditEventType | None = None
+    start: datetime | None = None
+    end: datetime | None = None
+    cursor: str | None = None
+    limit: int = 50
+
+    def matches(self, event: AuditLogEvent) -> bool:
+        """In-memory equivalent of the SQL filter, used when no store is configured."""
+
+        if self.actor_id is not None and event.actor_id != self.actor_id:
+            return False
+        if self.event_type is not None and event.event_type != self.event_type:
+            return False
+        created_at = _to_micros(event.created_at)
+        if self.start is not None and created_at < _to_micros(self.start):
+            return False
+        if self.end is not None and created_at >= _to_micros(self.end):
+            return False
+        if self.cursor is not None and (created_at, event.id) >= decode_cursor(self.cursor):
+            return False
+        return True
+
+
+@dataclass(frozen=True)
+class AuditEventPage:
+    events: List[AuditLogEvent]
+    next_cursor: Optional[str]
+
+
+class SqliteAuditStore:
+    """Persists audit events to a WAL-mode SQLite file.
+
+    Events are buffered and written with one ``executemany`` per ``batch_size`` events, or once
+    ``flush_interval_seconds`` have passed since the last write. ``start`` runs a background task
+    that applies the interval even when no further events arrive. Queries return newest first and
+    page with an opaque ``(created_at, id)`` keyset cursor, so deep pages cost the same as the
+    first one.
+    """
+
+    def __init__(self, path: Path, *, batch_size: int = 100, flush_interval_seconds: float = 1.0) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self._last_flush = time.monotonic()
+        self._connection: sqlite3.Connection | None = None
+        self._pending: List[Tuple[str, str, str, int, str | None]] = []
+        # Run after the batch holding their rows commits.
+        self._on_persisted: List[Callable[[], None]] = []
+        self._lock = Lock()
+        self._inserted = 0
+        self._batches = 0
+        self._task: asyncio.Task[None] | None = None
+
+    def _connect_locked(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def add(self, event: AuditLogEvent, *, on_persisted: Callable[[], None] | None = None) -> None:
+        row = (
+            event.id,
+            event.actor_id,
+            event.event_type.value,
+            _to_micros(event.created_at),
+            json.dumps(event.metadata, separators=(",", ":")) if event.metadata else None,
+        )
+        with self._lock:
+            self._pending.append(row)
+            if on_persisted is not None:
+                self._on_persisted.append(on_persisted)
+            due = time.monotonic() - self._last_flush >= self.flush_interval_seconds
+            if len(self._pending) >= self.batch_size or due:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_if_due(self) -> None:
+        with self._lock:
+            if self._pending and time.monotonic() - self._last_flush >= self.flush_interval_seconds:
+                self._flush_locked()
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        """Stop the flush task, then write what is pending and close the connection."""
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.close)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            if not self._pending:
+                continue
+            try:
+                await asyncio.to_thread(self._flush_if_due)
+            except Exception as exc:  # pragma: no cover - defensive logging
+                LOGGER.warning("Audit store flush failed: %s", exc)
+
+    def _flush_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        connection = self._connect_locked()
+        rows, self._pending = self._pending, []
+        connection.execute("BEGIN")
+        try:
+            connection.executemany(
+                "INSERT OR IGNORE INTO audit_events (id, actor_id, event_type, created_at_us, metadata) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            self._pending[:0] = rows
+            raise
+        connection.execute("COMMIT")
+        self._inserted += len(rows)
+        self._batches += 1
+        callbacks, self._on_persisted = self._on_persisted, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as exc:  # pragma: no cover - defensive logging
+                LOGGER.warning("Audit store persisted callback failed: %s", exc)
+
+    def query(self, query: AuditEventQuery) -> AuditEventPage:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if query.actor_id is not None:
+            clauses.append("actor_id = ?")
+            params.append(query.actor_id)
+        if query.event_type is not None:
+            clauses.append("event_type = ?")
+            params.append(query.event_type.value)
+        if query.start is not None:
+            clauses.append("created_at_us >= ?")
+            params.append(_to_micros(query.start))
+        if query.end is not None:
+            clauses.append("created_at_us < ?")
+            params.append(_to_micros(query.end))
+        if query.cursor is not None:
+            created_at, event_id = decode_cursor(query.cursor)
+            clauses.append("(created_at_us < ? OR (created_at_us = ? AND id < ?))")
+            params.extend([created_at, created_at, event_id])
+
+        sql = "SELECT id, actor_id, event_type, created_at_us, metadata FROM audit_events"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at_us DESC, id DESC LIMIT ?"
+        params.append(query.limit + 1)
+
+        with self._lock:
+            self._flush_locked()
+            rows = self._connect_locked().execute(sql, params).fetchall()
+
+        events = [
+            AuditLogEvent(
+                id=event_id,
+                actor_id=actor_id,
+                event_type=AuditEventType(event_type),
+                created_at=_from_micros(created_at),
+                metadata=json.loads(metadata) if metadata else {},
+            )
+            for event_id, actor_id, event_type, created_at, metadata in rows[: query.limit]
+        ]
+        next_cursor = None
+        if len(rows) > query.limit and events:
+            next_cursor = encode_cursor(events[-1].created_at, events[-1].id)
+        return AuditEventPage(events=events, next_cursor=next_cursor)
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "insertedTotal": self._inserted,
+            "batchesTotal": self._batches,
+        }
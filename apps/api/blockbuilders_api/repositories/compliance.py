@@ -1,61 +1,163 @@
-"""In-memory compliance repository mirroring the governance data model."""
+"""Compliance repository mirroring the governance data model."""
 
 from __future__ import annotations
 
-import csv
 import json
 from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, Iterable, List
 
 from blockbuilders_shared import AuditLogEvent
 
+from ..core.ring_buffer import RingBuffer, RingPage
+from .compliance_archive import ComplianceArchive
+from .compliance_csv import ComplianceCsvWriter
 
 ComplianceRecord = Dict[str, str | None]
 
 
+@dataclass(frozen=True, slots=True)
+class _ComplianceRow:
+    event_id: str
+    event_type: str
+    actor_id: str
+    occurred_at: str
+    strategy_id: str | None
+    version_id: str | None
+    metadata: str
+
+    def as_dict(self) -> ComplianceRecord:
+        return {
+            "event_id": self.event_id,
+            "event_type": self.event_type,
+            "actor_id": self.actor_id,
+            "occurred_at": self.occurred_at,
+            "strategy_id": self.strategy_id,
+            "version_id": self.version_id,
+            "metadata": self.metadata,
+        }
+
+
 @dataclass
 class ComplianceRepository:
-    """Persists compliance events and exports a CSV snapshot for auditors."""
+    """Persists compliance events to an append-only CSV export and builds full snapshots for auditors.
+
+    Only the latest ``history_capacity`` rows stay in memory; the export and archive are the
+    durable record, and ``on_evict`` receives rows as they fall out of memory.
+    """
 
     export_path: Path | None = None
-    _records: List[ComplianceRecord] = field(default_factory=list)
+    rotate_max_bytes: int | None = None
+    rotate_daily: bool = False
+    fsync_interval_seconds: float = 1.0
+    archive: ComplianceArchive | None = None
+    history_capacity: int = 10_000
+    on_evict: Callable[[ComplianceRecord], None] | None = None
+    _records: RingBuffer[_ComplianceRow] = field(init=False, repr=False)
+    _writer: ComplianceCsvWriter | None = field(default=None, init=False, repr=False)
+    _export_had_rows: bool = field(default=False, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        on_evict = self.on_evict
+        self._records = RingBuffer(
+            self.history_capacity,
+            on_evict=(lambda row: on_evict(row.as_dict())) if on_evict else None,
+        )
+        if self.export_path:
+            self._writer = ComplianceCsvWriter(
+                self.export_path,
+                rotate_max_bytes=self.rotate_max_bytes,
+                rotate_daily=self.rotate_daily,
+                fsync_interval_seconds=self.fsync_interval_seconds,
+            )
+            # Rows written before this process started are only reachable through the export.
+            self._export_had_rows = self._writer.has_rows()
 
     def record(self, event: AuditLogEvent) -> ComplianceRecord:
         metadata = event.metadata or {}
-        record: ComplianceRecord = {
-            "event_id": event.id,
-            "event_type": event.event_type.value,
-            "actor_id": event.actor_id,
-            "occurred_at": event.created_at.isoformat(),
-            "strategy_id": metadata.get("strategyId"),
-            "version_id": metadata.get("versionId"),
-            "metadata": json.dumps(metadata, sort_keys=True) if metadata else "{}",
-        }
-        self._records.append(record)
-        self.export_snapshot()
+        row = _ComplianceRow(
+            event_id=event.id,
+            event_type=event.event_type.value,
+            actor_id=event.actor_id,
+            occurred_at=event.created_at.isoformat(),
+            strategy_id=metadata.get("strategyId"),
+            version_id=metadata.get("versionId"),
+            metadata=json.dumps(metadata, sort_keys=True) if metadata else "{}",
+        )
+        self._records.append(row)
+        record = row.as_dict()
+        if self._writer is not None:
+            self._writer.append(record)
+        if self.archive is not None:
+            self.archive.append(record)
         return record
 
-    def export_snapshot(self) -> None:
-        if not self.export_path:
-            return
-
-        self.export_path.parent.mkdir(parents=True, exist_ok=True)
-        with self.export_path.open("w", newline="", encoding="utf-8") as handle:
-            writer = csv.DictWriter(
-                handle,
-                fieldnames=[
-                    "event_id",
-                    "event_type",
-                    "actor_id",
-                    "occurred_at",
-                    "strategy_id",
-                    "version_id",
-                    "metadata",
-                ],
+    def export_snapshot(self, destination: Path | None = None) -> Path | None:
+        """Write every exported row, across rotated segments, to ``destination`` in one CSV.
+
+        Defaults to ``<stem>.snapshot<suffix>`` next to the export.
+        """
+
+        if self._writer is None or self.export_path is None:
+            return None
+        target = destination or self.export_path.with_name(f"{self.export_path.stem}.snapshot{self.export_path.suffix}")
+        self._writer.write_snapshot(target)
+        return target
+
+    def query(
+        self,
+        *,
+        actor_id: str | None = None,
+        strategy_id: str | None = None,
+        event_type: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> List[ComplianceRecord]:
+        """Filter compliance events; served from the columnar archive when one is configured.
+
+        Otherwise the in-memory history is searched while it still holds every exported row.
+        Once the export also holds rows the history does not (rows evicted from memory, or
+        written by an earlier process), the CSV is streamed and filtered row by row instead;
+        without an export, only the latest ``history_capacity`` rows can be found.
+        """
+
+        if self.archive is not None:
+            return self.archive.query(
+                actor_id=actor_id,
+                strategy_id=strategy_id,
+                event_type=event_type,
+                start=start,
+                end=end,
             )
-            writer.writeheader()
-            writer.writerows(self._records)
+
+        records: Iterable[ComplianceRecord]
+        if self._writer is not None and (self._export_had_rows or self._records.evicted):
+            records = (
+                {**row, "strategy_id": row["strategy_id"] or None, "version_id": row["version_id"] or None}
+                for row in self._writer.iter_rows()
+            )
+        else:
+            records = (row.as_dict() for row in self._records)
+        return [
+            record
+            for record in records
+            if (actor_id is None or record["actor_id"] == actor_id)
+            and (strategy_id is None or record["strategy_id"] == strategy_id)
+            and (event_type is None or record["event_type"] == event_type)
+            and (start is None or datetime.fromisoformat(record["occurred_at"] or "") >= start)
+            and (end is None or datetime.fromisoformat(record["occurred_at"] or "") < end)
+        ]
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self.archive is not None:
+            self.archive.flush()
 
     def all(self) -> List[ComplianceRecord]:
-        return list(self._records)
+        return [row.as_dict() for row in self._records]
+
+    def page(self, cursor: int | None = None, limit: int = 100) -> RingPage[ComplianceRecord]:
+        page = self._records.page(cursor, limit)
+        return RingPage(items=[row.as_dict() for row in page.items], next_cursor=page.next_cursor)
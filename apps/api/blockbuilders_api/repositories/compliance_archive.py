@@ -0,0 +1,292 @@
+"""Columnar Parquet archive of compliance events, partitioned by day and event type."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Mapping, Tuple
+from uuid import uuid4
+
+LOGGER = logging.getLogger(__name__)
+
+ComplianceRecord = Dict[str, str | None]
+
+_MANIFEST_NAME = "_manifest.json"
+_COLUMNS = ("event_id", "event_type", "actor_id", "occurred_at", "strategy_id", "version_id", "metadata")
+
+
+def _require_pyarrow() -> Tuple[Any, Any, Any]:
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("COMPLIANCE_ARCHIVE_PATH is set but the 'pyarrow' package is not installed") from exc
+    return pa, pc, pq
+
+
+def _parse_timestamp(value: str | None) -> datetime:
+    parsed = datetime.fromisoformat(value) if value else datetime.now(timezone.utc)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class ArchiveFile:
+    """Manifest entry for one Parquet file; the min/max bounds let queries skip it unread."""
+
+    path: str
+    day: str
+    event_type: str
+    rows: int
+    bytes: int
+    min_occurred_at: str
+    max_occurred_at: str
+    min_actor_id: str
+    max_actor_id: str
+    min_strategy_id: str | None
+    max_strategy_id: str | None
+
+    def may_contain(
+        self,
+        *,
+        actor_id: str | None,
+        strategy_id: str | None,
+        event_type: str | None,
+        start: datetime | None,
+        end: datetime | None,
+    ) -> bool:
+        if event_type is not None and self.event_type != event_type:
+            return False
+        if start is not None and self.max_occurred_at < start.isoformat():
+            return False
+        if end is not None and self.min_occurred_at >= end.isoformat():
+            return False
+        if actor_id is not None and not self.min_actor_id <= actor_id <= self.max_actor_id:
+            return False
+        if strategy_id is not None:
+            if self.min_strategy_id is None or self.max_strategy_id is None:
+                return False
+            if not self.min_strategy_id <= strategy_id <= self.max_strategy_id:
+                return False
+        return True
+
+
+class ComplianceArchive:
+    """Buffers compliance records and writes them as zstd Parquet files under
+    ``<root>/day=<YYYY-MM-DD>/event_type=<TYPE>/``.
+
+    Rows are sorted by actor and time inside each file so both the manifest bounds and the
+    Parquet row-group statistics prune well. ``query`` consults the manifest first and only
+    opens files whose bounds overlap the filters, and also matches rows that are still
+    buffered, so queries never force small files out early. ``pyarrow`` is an optional dependency.
+    """
+
+    def __init__(self, root: Path, *, batch_size: int = 10_000, row_group_size: int = 64_000) -> None:
+        self.root = root
+        self.batch_size = batch_size
+        self.row_group_size = row_group_size
+        self._pa, self._pc, self._pq = _require_pyarrow()
+        self._buffer: List[ComplianceRecord] = []
+        # Batches taken from the buffer whose files are not in the manifest yet; still queryable.
+        self._writing: List[List[ComplianceRecord]] = []
+        self._files: List[ArchiveFile] = []
+        self._lock = Lock()
+        self._files_scanned = 0
+        self._files_pruned = 0
+        self._load_manifest()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / _MANIFEST_NAME
+
+    def _load_manifest(self) -> None:
+        if not self.manifest_path.exists():
+            return
+        try:
+            entries = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:  # pragma: no cover - defensive logging
+            LOGGER.warning("Ignoring unreadable compliance archive manifest %s: %s", self.manifest_path, exc)
+            return
+        self._files = [ArchiveFile(**entry) for entry in entries]
+
+    def _write_manifest_locked(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(prefix=f".{_MANIFEST_NAME}.", suffix=".tmp", dir=self.root)
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump([entry.__dict__ for entry in self._files], handle, separators=(",", ":"))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_name, self.manifest_path)
+
+    def append(self, record: Mapping[str, str | None]) -> None:
+        with self._lock:
+            self._buffer.append(dict(record))
+            if len(self._buffer) < self.batch_size:
+                return
+            batch, self._buffer = self._buffer, []
+            self._writing.append(batch)
+        self._write_batch(batch)
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+            if batch:
+                self._writing.append(batch)
+        if batch:
+            self._write_batch(batch)
+
+    def _write_batch(self, records: List[ComplianceRecord]) -> None:
+        partitions: Dict[Tuple[str, str], List[ComplianceRecord]] = {}
+        for record in records:
+            occurred_at = _parse_timestamp(record.get("occurred_at")).astimezone(timezone.utc)
+            key = (occurred_at.date().isoformat(), record.get("event_type") or "UNKNOWN")
+            partitions.setdefault(key, []).append({**record, "occurred_at": occurred_at.isoformat()})
+
+        written: List[ArchiveFile] = []
+        for (day, event_type), rows in partitions.items():
+            written.append(self._write_partition(day, event_type, rows))
+
+        with self._lock:
+            self._files.extend(written)
+            self._writing = [pending for pending in self._writing if pending is not records]
+            self._write_manifest_locked()
+
+    def _write_partition(self, day: str, event_type: str, rows: List[ComplianceRecord]) -> ArchiveFile:
+        pa, _, pq = self._pa, self._pc, self._pq
+        rows.sort(key=lambda row: (row.get("actor_id") or "", row["occurred_at"] or ""))
+        table = pa.table(
+            {
+                "event_id": pa.array([row.get("event_id") for row in rows], pa.string()),
+                "event_type": pa.array([event_type] * len(rows), pa.string()).dictionary_encode(),
+                "actor_id": pa.array([row.get("actor_id") for row in rows], pa.string()),
+                "occurred_at": pa.array(
+                    [_parse_timestamp(row["occurred_at"]) for row in rows],
+                    pa.timestamp("us", tz="UTC"),
+                ),
+                "strategy_id": pa.array([row.get("strategy_id") for row in rows], pa.string()),
+                "version_id": pa.array([row.get("version_id") for row in rows], pa.string()),
+                "metadata": pa.array([row.get("metadata") for row in rows], pa.string()),
+            }
+        )
+
+        directory = self.root / f"day={day}" / f"event_type={event_type}"
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"part-{uuid4().hex}.parquet"
+        temp_path = path.with_suffix(".tmp")
+        pq.write_table(table, temp_path, compression="zstd", row_group_size=self.row_group_size)
+        os.replace(temp_path, path)
+
+        occurred = [row["occurred_at"] or "" for row in rows]
+        actors = [row.get("actor_id") or "" for row in rows]
+        strategies = [row["strategy_id"] for row in rows if row.get("strategy_id")]
+        return ArchiveFile(
+            path=str(path.relative_to(self.root)),
+            day=day,
+            event_type=event_type,
+            rows=len(rows),
+            bytes=path.stat().st_size,
+            min_occurred_at=min(occurred),
+            max_occurred_at=max(occurred),
+            min_actor_id=min(actors),
+            max_actor_id=max(actors),
+            min_strategy_id=min(strategies) if strategies else None,
+            max_strategy_id=max(strategies) if strategies else None,
+        )
+
+    def query(
+        self,
+        *,
+        actor_id: str | None = None,
+        strategy_id: str | None = None,
+        event_type: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> List[ComplianceRecord]:
+        """Return matching records, written or still buffered, ordered by ``occurred_at``; ``end`` is exclusive."""
+
+        pa, pc, pq = self._pa, self._pc, self._pq
+        start = start.astimezone(timezone.utc) if start else None
+        end = end.astimezone(timezone.utc) if end else None
+        with self._lock:
+            files = list(self._files)
+            unwritten = [record for batch in (*self._writing, self._buffer) for record in batch]
+
+        buffered: List[Tuple[datetime, ComplianceRecord]] = []
+        for record in unwritten:
+            occurred_at = _parse_timestamp(record.get("occurred_at")).astimezone(timezone.utc)
+            if (
+                (actor_id is None or record.get("actor_id") == actor_id)
+                and (strategy_id is None or record.get("strategy_id") == strategy_id)
+                and (event_type is None or record.get("event_type") == event_type)
+                and (start is None or occurred_at >= start)
+                and (end is None or occurred_at < end)
+            ):
+                buffered.append((occurred_at, _to_record({**record, "occurred_at": occurred_at})))
+
+        candidates = [
+            entry
+            for entry in files
+            if entry.may_contain(actor_id=actor_id, strategy_id=strategy_id, event_type=event_type, start=start, end=end)
+        ]
+        self._files_pruned += len(files) - len(candidates)
+        self._files_scanned += len(candidates)
+
+        filters: List[Tuple[str, str, Any]] = []
+        if actor_id is not None:
+            filters.append(("actor_id", "=", actor_id))
+        if strategy_id is not None:
+            filters.append(("strategy_id", "=", strategy_id))
+        if start is not None:
+            filters.append(("occurred_at", ">=", pa.scalar(start, pa.timestamp("us", tz="UTC"))))
+        if end is not None:
+            filters.append(("occurred_at", "<", pa.scalar(end, pa.timestamp("us", tz="UTC"))))
+
+        tables = [
+            pq.read_table(self.root / entry.path, filters=filters or None).cast(self._schema())
+            for entry in candidates
+        ]
+        matches: List[Tuple[datetime, ComplianceRecord]] = []
+        if tables:
+            table = pa.concat_tables(tables)
+            table = table.take(pc.sort_indices(table, sort_keys=[("occurred_at", "ascending")]))
+            matches = [(row["occurred_at"], _to_record(row)) for row in table.to_pylist()]
+        if buffered:
+            matches = sorted([*matches, *buffered], key=lambda item: item[0])
+        return [record for _, record in matches]
+
+    def _schema(self) -> Any:
+        pa = self._pa
+        return pa.schema(
+            [
+                ("event_id", pa.string()),
+                ("event_type", pa.string()),
+                ("actor_id", pa.string()),
+                ("occurred_at", pa.timestamp("us", tz="UTC")),
+                ("strategy_id", pa.string()),
+                ("version_id", pa.string()),
+                ("metadata", pa.string()),
+            ]
+        )
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "files": len(self._files),
+            "rows": sum(entry.rows for entry in self._files),
+            "bytes": sum(entry.bytes for entry in self._files),
+            "buffered": len(self._buffer) + sum(len(batch) for batch in self._writing),
+            "filesScanned": self._files_scanned,
+            "filesPruned": self._files_pruned,
+        }
+
+
+def _to_record(row: Dict[str, Any]) -> ComplianceRecord:
+    record: ComplianceRecord = {column: row.get(column) for column in _COLUMNS}
+    occurred_at = row.get("occurred_at")
+    record["occurred_at"] = occurred_at.isoformat() if occurred_at is not None else None
+    return record
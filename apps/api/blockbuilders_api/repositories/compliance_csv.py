@@ -0,0 +1,245 @@
+"""Append-only CSV writer for the compliance export, with rotation into dated segments."""
+
+from __future__ import annotations
+
+import csv
+import io
+import os
+import tempfile
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterator, List, Mapping, Sequence, TextIO
+
+CSV_FIELDNAMES: Sequence[str] = (
+    "event_id",
+    "event_type",
+    "actor_id",
+    "occurred_at",
+    "strategy_id",
+    "version_id",
+    "metadata",
+)
+_HEADER = ",".join(CSV_FIELDNAMES)
+
+
+def _copy_rows(source: Path, output: TextIO) -> int:
+    with source.open("r", encoding="utf-8", newline="") as handle:
+        header = handle.readline().rstrip("\r\n")
+        if header == _HEADER:
+            rows = 0
+            for line in handle:
+                output.write(line)
+                rows += 1
+            return rows
+
+        # Segments from an older column layout are re-mapped onto the current columns.
+        handle.seek(0)
+        writer = csv.DictWriter(output, fieldnames=CSV_FIELDNAMES, extrasaction="ignore")
+        rows = 0
+        for record in csv.DictReader(handle):
+            writer.writerow(record)
+            rows += 1
+        return rows
+
+
+def _read_rows(handle: TextIO) -> Iterator[Dict[str, str]]:
+    with handle:
+        for record in csv.DictReader(handle):
+            yield {column: record.get(column) or "" for column in CSV_FIELDNAMES}
+
+
+def _has_rows(source: Path) -> bool:
+    with source.open("r", encoding="utf-8", newline="") as handle:
+        handle.readline()
+        return bool(handle.readline().strip())
+
+
+class ComplianceCsvWriter:
+    """Keeps the export open in append mode so each event costs one row write.
+
+    The header is written only when a file is started. The active file rolls over to
+    ``<stem>.<YYYY-MM-DD>.<n><suffix>`` once it reaches ``rotate_max_bytes`` or, with
+    ``rotate_daily``, when the UTC date changes. Rows are flushed to the OS on every append and
+    fsynced at most every ``fsync_interval_seconds``.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        rotate_max_bytes: int | None = None,
+        rotate_daily: bool = False,
+        fsync_interval_seconds: float = 1.0,
+    ) -> None:
+        self.path = path
+        self.rotate_max_bytes = rotate_max_bytes
+        self.rotate_daily = rotate_daily
+        self.fsync_interval_seconds = fsync_interval_seconds
+        self._handle: TextIO | None = None
+        self._buffer = io.StringIO()
+        self._row_writer = csv.DictWriter(self._buffer, fieldnames=CSV_FIELDNAMES)
+        self._size = 0
+        self._opened_on: date | None = None
+        self._last_fsync = 0.0
+        self._rotations = 0
+        self._lock = Lock()
+
+    def append(self, record: Mapping[str, str | None]) -> None:
+        with self._lock:
+            self._buffer.seek(0)
+            self._buffer.truncate()
+            self._row_writer.writerow(record)
+            row = self._buffer.getvalue()
+
+            handle = self._ensure_open_locked()
+            if self._should_rotate_locked():
+                self._rotate_locked()
+                handle = self._ensure_open_locked()
+            handle.write(row)
+            handle.flush()
+            self._size += len(row.encode("utf-8"))
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval_seconds:
+                os.fsync(handle.fileno())
+                self._last_fsync = now
+
+    def _ensure_open_locked(self) -> TextIO:
+        if self._handle is not None:
+            return self._handle
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists() and self.path.stat().st_size > 0:
+            with self.path.open("r", encoding="utf-8", newline="") as existing:
+                header = existing.readline().rstrip("\r\n")
+            if header != _HEADER:
+                # Files written with an older column layout are moved aside instead of mixed in.
+                self._move_to_segment_locked(datetime.fromtimestamp(self.path.stat().st_mtime, tz=timezone.utc).date())
+
+        self._handle = self.path.open("a", encoding="utf-8", newline="")
+        self._size = self._handle.tell()
+        if self._size == 0:
+            self._handle.write(_HEADER + "\r\n")
+            self._handle.flush()
+            self._size = self._handle.tell()
+        self._opened_on = datetime.now(timezone.utc).date()
+        return self._handle
+
+    def _should_rotate_locked(self) -> bool:
+        if self.rotate_max_bytes is not None and self._size >= self.rotate_max_bytes:
+            return True
+        return self.rotate_daily and self._opened_on != datetime.now(timezone.utc).date()
+
+    def _rotate_locked(self) -> None:
+        opened_on = self._opened_on or datetime.now(timezone.utc).date()
+        self._close_locked()
+        self._move_to_segment_locked(opened_on)
+        self._rotations += 1
+
+    def _move_to_segment_locked(self, day: date) -> None:
+        index = 0
+        while True:
+            candidate = self.path.with_name(f"{self.path.stem}.{day.isoformat()}.{index}{self.path.suffix}")
+            if not candidate.exists():
+                break
+            index += 1
+        os.replace(self.path, candidate)
+
+    def segments(self) -> List[Path]:
+        """Rotated segments in chronological order, excluding the active file."""
+
+        pattern = f"{self.path.stem}.*{self.path.suffix}"
+        found = [
+            path
+            for path in self.path.parent.glob(pattern)
+            if path != self.path and len(path.name.split(".")) == len(self.path.name.split(".")) + 2
+        ]
+
+        def _order(path: Path) -> tuple[str, int]:
+            _, day, index = path.name[: len(path.name) - len(self.path.suffix)].rsplit(".", 2)
+            return day, int(index)
+
+        return sorted(found, key=_order)
+
+    def write_snapshot(self, destination: Path) -> int:
+        """Concatenate every segment plus the active file into one CSV; returns the line count."""
+
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+            sources = [*self.segments(), self.path]
+
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(prefix=f".{destination.name}.", suffix=".tmp", dir=destination.parent)
+            rows = 0
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8", newline="") as output:
+                    output.write(_HEADER + "\r\n")
+                    for source in sources:
+                        if source.exists():
+                            rows += _copy_rows(source, output)
+                    output.flush()
+                    os.fsync(output.fileno())
+                os.replace(temp_name, destination)
+            except BaseException:
+                try:
+                    os.unlink(temp_name)
+                except OSError:
+                    pass
+                raise
+            return rows
+
+    def has_rows(self) -> bool:
+        """True once any segment or the active file holds a row, including rows from earlier processes."""
+
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+            return any(source.exists() and _has_rows(source) for source in [*self.segments(), self.path])
+
+    def iter_rows(self) -> Iterator[Dict[str, str]]:
+        """Stream every exported row, oldest first, across rotated segments and the active file.
+
+        The file list is fixed when iteration starts; the active file is opened under the lock,
+        so a rotation while the caller is still reading cannot skip or repeat its rows.
+        """
+
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+            segments = self.segments()
+            active = self.path.open("r", encoding="utf-8", newline="") if self.path.exists() else None
+        try:
+            for segment in segments:
+                yield from _read_rows(segment.open("r", encoding="utf-8", newline=""))
+            if active is not None:
+                yield from _read_rows(active)
+        finally:
+            if active is not None:
+                active.close()
+
+    def sync(self) -> None:
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+                os.fsync(self._handle.fileno())
+                self._last_fsync = time.monotonic()
+
+    def _close_locked(self) -> None:
+        if self._handle is None:
+            return
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.close()
+        self._handle = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_locked()
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "activeBytes": self._size,
+            "rotationsTotal": self._rotations,
+        }
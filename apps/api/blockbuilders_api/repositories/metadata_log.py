@@ -0,0 +1,167 @@
+"""Append-only, log-structured store backing the Supabase metadata cache."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+MetadataPayload = Dict[str, Any]
+
+
+def _encode_line(user_id: str, raw: str) -> str:
+    return f"{user_id}\t{raw}\n"
+
+
+class MetadataLogStore:
+    """Keeps per-user metadata as ``<user_id>\\t<json>`` records in a snapshot plus an append-only log.
+
+    Updates cost one small append. Replay only splits lines into an index of raw JSON strings;
+    payloads are parsed when a user is actually looked up. The log is folded into a fresh
+    snapshot once it holds more records than there are users (and at least
+    ``compact_min_records``), so disk usage and replay time track the live user count.
+    """
+
+    def __init__(self, base_path: Path, *, compact_min_records: int = 1000) -> None:
+        self.base_path = base_path
+        self.snapshot_path = base_path.with_name(f"{base_path.stem}.snapshot")
+        self.log_path = base_path.with_name(f"{base_path.stem}.log")
+        self.compact_min_records = compact_min_records
+        self._raw: Dict[str, str] = {}
+        self._log_records = 0
+        self._compactions = 0
+        self._lock = Lock()
+
+    def load(self) -> None:
+        """Replay the snapshot and log tail; migrates a legacy single-blob JSON cache once."""
+
+        with self._lock:
+            self._raw.clear()
+            self._log_records = 0
+            if not self.snapshot_path.exists() and not self.log_path.exists() and self.base_path.exists():
+                self._import_legacy_blob()
+                return
+            self._replay(self.snapshot_path)
+            self._log_records = self._replay(self.log_path)
+
+    def _replay(self, path: Path) -> int:
+        if not path.exists():
+            return 0
+
+        records = 0
+        complete = 0
+        torn = False
+        with path.open("rb") as handle:
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    torn = True
+                    break
+                complete += len(line)
+                user_id, separator, raw = line[:-1].decode("utf-8", errors="replace").partition("\t")
+                if not separator or not user_id:
+                    continue
+                self._raw[user_id] = raw
+                records += 1
+        if torn:
+            # Cut the partial record so the next append starts on a fresh line instead of
+            # gluing itself onto the torn one.
+            LOGGER.warning("Truncating torn trailing record in %s at byte %d", path, complete)
+            with path.open("r+b") as handle:
+                handle.truncate(complete)
+        return records
+
+    def _import_legacy_blob(self) -> None:
+        try:
+            payload = json.loads(self.base_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:  # pragma: no cover - defensive logging
+            LOGGER.warning("Failed to import legacy Supabase metadata cache from %s: %s", self.base_path, exc)
+            return
+        for user_id, metadata_payload in payload.items():
+            self._raw[user_id] = json.dumps(metadata_payload, separators=(",", ":"))
+        self._write_snapshot_locked()
+
+    def get(self, user_id: str) -> Optional[MetadataPayload]:
+        with self._lock:
+            raw = self._raw.get(user_id)
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            LOGGER.warning("Ignoring corrupt Supabase metadata record for %s", user_id)
+            return None
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self._raw
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def keys(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._raw))
+
+    def append(self, records: Iterable[Tuple[str, MetadataPayload]]) -> None:
+        """Append changed records in a single write, compacting when the log outgrows the user set."""
+
+        encoded = [(user_id, json.dumps(payload, separators=(",", ":"))) for user_id, payload in records]
+        if not encoded:
+            return
+
+        with self._lock:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.log_path.open("a", encoding="utf-8") as handle:
+                handle.write("".join(_encode_line(user_id, raw) for user_id, raw in encoded))
+                handle.flush()
+                os.fsync(handle.fileno())
+            for user_id, raw in encoded:
+                self._raw[user_id] = raw
+            self._log_records += len(encoded)
+
+            if self._log_records >= self.compact_min_records and self._log_records > len(self._raw):
+                self._compact_locked()
+
+    def compact(self) -> None:
+        with self._lock:
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        # The snapshot is swapped in atomically before the log is dropped; replaying a stale log
+        # over the new snapshot is harmless because records are last-write-wins.
+        self._write_snapshot_locked()
+        self.log_path.unlink(missing_ok=True)
+        self._log_records = 0
+        self._compactions += 1
+
+    def _write_snapshot_locked(self) -> None:
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(
+            prefix=f".{self.snapshot_path.name}.",
+            suffix=".tmp",
+            dir=self.snapshot_path.parent,
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.writelines(_encode_line(user_id, raw) for user_id, raw in self._raw.items())
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(temp_name, self.snapshot_path)
+        except BaseException:
+            try:
+                os.unlink(temp_name)
+            except OSError:
+                pass
+            raise
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "users": len(self._raw),
+            "logRecords": self._log_records,
+            "compactionsTotal": self._compactions,
+        }
@@ -2,15 +2,25 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
-from typing import Dict, Tuple
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Tuple
 from uuid import uuid4
 
 from blockbuilders_shared import PlanUsage, PlanUsageMetric
 
-# 24 hour rolling window for freemium quota tracking.
-WINDOW_DURATION = timedelta(days=1)
+from .quota_windows import WINDOW_DURATION, FixedWindow, QuotaWindow
+
+UsageKey = Tuple[str, PlanUsageMetric]
+
+DEFAULT_LIMITS: Dict[PlanUsageMetric, int] = {
+    PlanUsageMetric.BACKTESTS: 20,
+    PlanUsageMetric.PAPER_TRADES: 5,
+    PlanUsageMetric.TEMPLATE_PUBLISHES: 3,
+}
 
 
 @dataclass
@@ -18,94 +28,205 @@ class _UsageState:
     usage_id: str
     user_id: str
     metric: PlanUsageMetric
-    window_start: datetime
-    window_end: datetime
-    used: int
-    limit: int
-    updated_at: datetime
+    window: QuotaWindow = field(repr=False, compare=False)
+    window_start: datetime = field(init=False)
+    window_end: datetime = field(init=False)
+    used: int = field(init=False)
+    limit: int = field(init=False)
+    updated_at: datetime = field(init=False)
+    # Engine-specific counters: sliding-window buckets, token-bucket balance.
+    counts: List[int] = field(default_factory=list, init=False, repr=False)
+    head: int = field(default=0, init=False, repr=False)
+    tokens: float = field(default=0.0, init=False, repr=False)
+    refilled_at: datetime | None = field(default=None, init=False, repr=False)
+    _snapshot: PlanUsage | None = field(default=None, init=False, repr=False, compare=False)
 
     @classmethod
-    def new(cls, *, user_id: str, metric: PlanUsageMetric, limit: int, now: datetime) -> "_UsageState":
-        window_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        window_end = window_start + WINDOW_DURATION
-        return cls(
-            usage_id=str(uuid4()),
-            user_id=user_id,
-            metric=metric,
-            window_start=window_start,
-            window_end=window_end,
-            used=0,
-            limit=limit,
-            updated_at=now,
-        )
+    def new(
+        cls,
+        *,
+        user_id: str,
+        metric: PlanUsageMetric,
+        limit: int,
+        now: datetime,
+        window: QuotaWindow | None = None,
+    ) -> "_UsageState":
+        state = cls(usage_id=str(uuid4()), user_id=user_id, metric=metric, window=window or FixedWindow())
+        state.window.reset(state, now=now, limit=limit)
+        return state
 
     def refresh_window(self, *, now: datetime, limit: int) -> None:
-        if now < self.window_end:
-            return
-        self.window_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        self.window_end = self.window_start + WINDOW_DURATION
-        self.used = 0
-        self.limit = limit
+        if self.window.advance(self, now=now, limit=limit):
+            self._snapshot = None
+
+    def add(self, amount: int, *, now: datetime) -> None:
+        self.window.add(self, amount, now=now)
         self.updated_at = now
+        self._snapshot = None
 
     def to_model(self) -> PlanUsage:
-        return PlanUsage.model_validate(
-            {
-                "id": self.usage_id,
-                "userId": self.user_id,
-                "metric": self.metric.value,
-                "windowStart": self.window_start.isoformat(),
-                "windowEnd": self.window_end.isoformat(),
-                "used": self.used,
-                "limit": self.limit,
-                "updatedAt": self.updated_at.isoformat(),
-            }
-        )
+        """Return the current window as a model, reusing it until the state next changes.
+
+        Typed values are passed straight to the constructor; formatting datetimes to ISO strings
+        only for pydantic to parse them back dominated the cost. ``model_construct`` is not used
+        because its pure-Python field loop is slower than core validation of typed input.
+        Callers must treat the result as read-only because repeated reads share one instance.
+        """
+
+        if self._snapshot is None:
+            self._snapshot = PlanUsage(
+                id=self.usage_id,
+                user_id=self.user_id,
+                metric=self.metric,
+                window_start=self.window_start,
+                window_end=self.window_end,
+                used=self.used,
+                limit=self.limit,
+                updated_at=self.updated_at,
+            )
+        return self._snapshot
 
 
 class PlanUsageRepository:
-    """Repository responsible for retrieving and updating plan usage counters."""
-
-    def __init__(self, *, limits: Dict[PlanUsageMetric, int] | None = None) -> None:
-        self._limits = limits or {
-            PlanUsageMetric.BACKTESTS: 20,
-            PlanUsageMetric.PAPER_TRADES: 5,
-            PlanUsageMetric.TEMPLATE_PUBLISHES: 3,
-        }
-        self._store: Dict[Tuple[str, PlanUsageMetric], _UsageState] = {}
+    """Repository responsible for retrieving and updating plan usage counters.
+
+    Each ``(user_id, metric)`` key is guarded by one of ``lock_stripes`` locks, so updates to the
+    same key are serialized while different users rarely contend. ``windows`` picks a quota
+    window engine per metric (see :mod:`.quota_windows`); unlisted metrics use calendar-day
+    fixed windows.
+
+    Every key is scheduled once in a min-heap keyed by when its window expires. :meth:`sweep`
+    pops due entries and drops keys that have gone idle, so dormant users do not accumulate;
+    a key that was used again in the meantime is simply rescheduled.
+    """
+
+    def __init__(
+        self,
+        *,
+        limits: Dict[PlanUsageMetric, int] | None = None,
+        windows: Dict[PlanUsageMetric, QuotaWindow] | None = None,
+        lock_stripes: int = 64,
+    ) -> None:
+        self._limits = dict(limits or DEFAULT_LIMITS)
+        self._windows = dict(windows or {})
+        self._store: Dict[UsageKey, _UsageState] = {}
+        self._stripes: List[Lock] = [Lock() for _ in range(lock_stripes)]
+        self._expiry: List[Tuple[datetime, int, UsageKey, _UsageState]] = []
+        self._expiry_lock = Lock()
+        self._expiry_sequence = itertools.count()
+        self._evicted = 0
 
     def _limit_for(self, metric: PlanUsageMetric) -> int:
         return self._limits.get(metric, 0)
 
-    async def get_active_window(self, *, user_id: str, metric: PlanUsageMetric) -> PlanUsage:
-        now = datetime.now(timezone.utc)
-        key = (user_id, metric)
-        limit = self._limit_for(metric)
+    def _lock_for(self, key: UsageKey) -> Lock:
+        return self._stripes[hash(key) % len(self._stripes)]
 
+    def _state_locked(self, key: UsageKey, now: datetime) -> _UsageState:
+        limit = self._limit_for(key[1])
         state = self._store.get(key)
         if state is None:
-            state = _UsageState.new(user_id=user_id, metric=metric, limit=limit, now=now)
+            state = _UsageState.new(
+                user_id=key[0],
+                metric=key[1],
+                limit=limit,
+                now=now,
+                window=self._windows.get(key[1]),
+            )
             self._store[key] = state
+            self._schedule(key, state)
         else:
             state.refresh_window(now=now, limit=limit)
+        return state
+
+    def _schedule(self, key: UsageKey, state: _UsageState) -> None:
+        entry = (state.window.expires_at(state), next(self._expiry_sequence), key, state)
+        with self._expiry_lock:
+            heapq.heappush(self._expiry, entry)
+
+    def sweep(self, *, now: datetime | None = None, max_entries: int = 10_000) -> int:
+        """Evict keys whose windows expired before ``now``; returns how many were dropped.
+
+        At most ``max_entries`` heap entries are examined per call so a large backlog is
+        worked off in slices rather than in one long pause.
+        """
+
+        now = now or datetime.now(timezone.utc)
+        evicted = 0
+        for _ in range(max_entries):
+            with self._expiry_lock:
+                if not self._expiry or self._expiry[0][0] > now:
+                    break
+                _, _, key, state = heapq.heappop(self._expiry)
+            with self._lock_for(key):
+                if self._store.get(key) is not state:
+                    continue
+                if state.window.expires_at(state) > now:
+                    self._schedule(key, state)
+                    continue
+                del self._store[key]
+                evicted += 1
+        self._evicted += evicted
+        return evicted
+
+    async def get_active_window(self, *, user_id: str, metric: PlanUsageMetric) -> PlanUsage:
+        now = datetime.now(timezone.utc)
+        key = (user_id, metric)
+        with self._lock_for(key):
+            return self._state_locked(key, now).to_model()
 
-        return state.to_model()
+    async def get_active_windows(self, *, user_id: str, metrics: Iterable[PlanUsageMetric]) -> List[PlanUsage]:
+        """Read several metrics at once; mirrors the pipelined Redis implementation."""
+
+        now = datetime.now(timezone.utc)
+        usages: List[PlanUsage] = []
+        for metric in metrics:
+            key = (user_id, metric)
+            with self._lock_for(key):
+                usages.append(self._state_locked(key, now).to_model())
+        return usages
 
     async def increment(self, *, user_id: str, metric: PlanUsageMetric, amount: int = 1, at: datetime | None = None) -> PlanUsage:
         now = at or datetime.now(timezone.utc)
         key = (user_id, metric)
-        limit = self._limit_for(metric)
-
-        state = self._store.get(key)
-        if state is None:
-            state = _UsageState.new(user_id=user_id, metric=metric, limit=limit, now=now)
-            self._store[key] = state
-        else:
-            state.refresh_window(now=now, limit=limit)
+        with self._lock_for(key):
+            state = self._state_locked(key, now)
+            state.add(amount, now=now)
+            return state.to_model()
+
+    async def try_increment(
+        self,
+        *,
+        user_id: str,
+        metric: PlanUsageMetric,
+        amount: int = 1,
+        at: datetime | None = None,
+    ) -> Tuple[bool, PlanUsage]:
+        """Atomically add ``amount`` if it fits within the limit.
+
+        Returns whether the increment was applied together with the resulting window.
+        """
 
-        state.used += amount
-        state.updated_at = now
-        return state.to_model()
+        now = at or datetime.now(timezone.utc)
+        key = (user_id, metric)
+        with self._lock_for(key):
+            state = self._state_locked(key, now)
+            if state.used + amount > state.limit:
+                return False, state.to_model()
+            state.add(amount, now=now)
+            return True, state.to_model()
 
     async def set_limit(self, *, metric: PlanUsageMetric, limit: int) -> None:
         self._limits[metric] = limit
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "windows": {metric.value: self._window_kind(metric) for metric in PlanUsageMetric},
+            "liveKeys": len(self._store),
+            "scheduledExpiries": len(self._expiry),
+            "evictedTotal": self._evicted,
+        }
+
+    def _window_kind(self, metric: PlanUsageMetric) -> str:
+        window = self._windows.get(metric)
+        return window.kind if window is not None else "fixed"
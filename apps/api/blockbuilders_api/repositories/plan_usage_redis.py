@@ -0,0 +1,191 @@
+"""Redis-backed plan usage counters shared by every API replica."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from uuid import uuid4
+
+from blockbuilders_shared import PlanUsage, PlanUsageMetric
+
+from ..services.metadata_cache import BoundedCache
+from .plan_usage import DEFAULT_LIMITS, UsageKey
+from .quota_windows import WINDOW_DURATION
+
+# KEYS[1] usage hash, KEYS[2] limits hash.
+# ARGV: now_ms, window_start_ms, window_end_ms, default_limit, amount, new_id, metric, mode.
+# mode is "read", "force" (always increment) or "check" (increment only if it fits).
+# Millisecond timestamps are passed and stored as strings so Lua never reformats them.
+_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window_end = tonumber(redis.call('HGET', KEYS[1], 'we') or '0')
+if window_end <= now then
+    local limit = redis.call('HGET', KEYS[2], ARGV[7]) or ARGV[4]
+    redis.call('HSET', KEYS[1], 'id', ARGV[6], 'ws', ARGV[2], 'we', ARGV[3], 'used', 0, 'limit', limit, 'updated', ARGV[1])
+    redis.call('PEXPIREAT', KEYS[1], ARGV[3])
+end
+
+local used = tonumber(redis.call('HGET', KEYS[1], 'used'))
+local limit = tonumber(redis.call('HGET', KEYS[1], 'limit'))
+local amount = tonumber(ARGV[5])
+local allowed = 1
+if ARGV[8] == 'check' and used + amount > limit then
+    allowed = 0
+elseif ARGV[8] ~= 'read' then
+    used = redis.call('HINCRBY', KEYS[1], 'used', amount)
+    redis.call('HSET', KEYS[1], 'updated', ARGV[1])
+end
+
+return {allowed, redis.call('HGET', KEYS[1], 'id'), redis.call('HGET', KEYS[1], 'ws'),
+        redis.call('HGET', KEYS[1], 'we'), used, limit, redis.call('HGET', KEYS[1], 'updated')}
+"""
+
+
+def _to_ms(value: datetime) -> int:
+    return int(value.timestamp() * 1000)
+
+
+def _from_ms(value: Any) -> datetime:
+    return datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc)
+
+
+def _text(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+class RedisPlanUsageRepository:
+    """Drop-in replacement for :class:`PlanUsageRepository` that keeps counters in Redis.
+
+    Window rollover, limit lookup and check-and-increment all happen inside one Lua script, so
+    replicas cannot race each other past a limit. Usage hashes expire at ``window_end``. Reads
+    for a single metric are served from a short-TTL local cache that local writes refresh.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        namespace: str = "bb:plan-usage",
+        limits: Dict[PlanUsageMetric, int] | None = None,
+        read_cache_ttl_seconds: float = 1.0,
+        read_cache_max_entries: int = 10_000,
+    ) -> None:
+        self.client = client
+        self.namespace = namespace
+        self._limits = dict(limits or DEFAULT_LIMITS)
+        self._script = client.register_script(_WINDOW_SCRIPT)
+        self._read_cache: BoundedCache[UsageKey, PlanUsage] = BoundedCache(
+            maxsize=read_cache_max_entries if read_cache_ttl_seconds > 0 else 0,
+            ttl_seconds=read_cache_ttl_seconds,
+        )
+
+    @property
+    def limits_key(self) -> str:
+        return f"{self.namespace}:limits"
+
+    def _usage_key(self, user_id: str, metric: PlanUsageMetric) -> str:
+        return f"{self.namespace}:usage:{user_id}:{metric.value}"
+
+    def _script_args(self, metric: PlanUsageMetric, *, now: datetime, amount: int, mode: str) -> Tuple[List[str], List[Any]]:
+        window_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        window_end = window_start + WINDOW_DURATION
+        keys = [self.limits_key]
+        args: List[Any] = [
+            _to_ms(now),
+            _to_ms(window_start),
+            _to_ms(window_end),
+            self._limits.get(metric, 0),
+            amount,
+            str(uuid4()),
+            metric.value,
+            mode,
+        ]
+        return keys, args
+
+    async def _run(self, user_id: str, metric: PlanUsageMetric, *, now: datetime, amount: int, mode: str) -> Tuple[bool, PlanUsage]:
+        keys, args = self._script_args(metric, now=now, amount=amount, mode=mode)
+        result = await self._script(keys=[self._usage_key(user_id, metric), *keys], args=args)
+        usage = self._to_model(user_id, metric, result)
+        self._read_cache.set((user_id, metric), usage)
+        return bool(int(result[0])), usage
+
+    @staticmethod
+    def _to_model(user_id: str, metric: PlanUsageMetric, result: List[Any]) -> PlanUsage:
+        _, usage_id, window_start, window_end, used, limit, updated = result
+        return PlanUsage(
+            id=_text(usage_id),
+            user_id=user_id,
+            metric=metric,
+            window_start=_from_ms(_text(window_start)),
+            window_end=_from_ms(_text(window_end)),
+            used=int(used),
+            limit=int(limit),
+            updated_at=_from_ms(_text(updated)),
+        )
+
+    async def get_active_window(self, *, user_id: str, metric: PlanUsageMetric) -> PlanUsage:
+        cached = self._read_cache.get((user_id, metric))
+        if cached is not None:
+            return cached
+        _, usage = await self._run(user_id, metric, now=datetime.now(timezone.utc), amount=0, mode="read")
+        return usage
+
+    async def get_active_windows(self, *, user_id: str, metrics: Iterable[PlanUsageMetric]) -> List[PlanUsage]:
+        """Read several metrics in one pipelined round-trip."""
+
+        metrics = list(metrics)
+        now = datetime.now(timezone.utc)
+        async with self.client.pipeline(transaction=False) as pipe:
+            for metric in metrics:
+                keys, args = self._script_args(metric, now=now, amount=0, mode="read")
+                await self._script(keys=[self._usage_key(user_id, metric), *keys], args=args, client=pipe)
+            results = await pipe.execute()
+
+        usages = [self._to_model(user_id, metric, result) for metric, result in zip(metrics, results)]
+        for usage in usages:
+            self._read_cache.set((user_id, usage.metric), usage)
+        return usages
+
+    async def increment(self, *, user_id: str, metric: PlanUsageMetric, amount: int = 1, at: datetime | None = None) -> PlanUsage:
+        _, usage = await self._run(user_id, metric, now=at or datetime.now(timezone.utc), amount=amount, mode="force")
+        return usage
+
+    async def try_increment(
+        self,
+        *,
+        user_id: str,
+        metric: PlanUsageMetric,
+        amount: int = 1,
+        at: datetime | None = None,
+    ) -> Tuple[bool, PlanUsage]:
+        return await self._run(user_id, metric, now=at or datetime.now(timezone.utc), amount=amount, mode="check")
+
+    async def set_limit(self, *, metric: PlanUsageMetric, limit: int) -> None:
+        """Store the limit for every replica; it applies from each user's next window."""
+
+        self._limits[metric] = limit
+        await self.client.hset(self.limits_key, metric.value, limit)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"readCache": self._read_cache.metrics()}
+
+
+async def connect_redis_plan_usage_repository(
+    url: str,
+    *,
+    read_cache_ttl_seconds: float,
+    client_factory: Callable[[str], Any] | None = None,
+) -> RedisPlanUsageRepository:
+    """Create the repository from a Redis URL. ``redis`` is an optional dependency."""
+
+    if client_factory is None:
+        try:
+            from redis.asyncio import Redis
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("PLAN_USAGE_BACKEND=redis but the 'redis' package is not installed") from exc
+        client_factory = Redis.from_url
+
+    return RedisPlanUsageRepository(client_factory(url), read_cache_ttl_seconds=read_cache_ttl_seconds)
@@ -0,0 +1,202 @@
+"""Quota window engines deciding how plan usage accrues and drains over time."""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Dict, Literal, Mapping, Protocol
+
+from blockbuilders_shared import PlanUsageMetric
+
+if TYPE_CHECKING:
+    from .plan_usage import _UsageState
+
+# 24 hour window for freemium quota tracking.
+WINDOW_DURATION = timedelta(days=1)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+QuotaWindowKind = Literal["fixed", "sliding", "token_bucket"]
+
+
+def _floor(now: datetime, width: timedelta) -> int:
+    return (now - _EPOCH) // width
+
+
+class QuotaWindow(Protocol):
+    """Strategy applied to one metric's ``_UsageState`` while its stripe lock is held."""
+
+    kind: QuotaWindowKind
+
+    def reset(self, state: "_UsageState", *, now: datetime, limit: int) -> None:
+        """Initialise ``state`` as an empty window at ``now``."""
+
+    def advance(self, state: "_UsageState", *, now: datetime, limit: int) -> bool:
+        """Bring ``state`` up to ``now``; return whether any exposed field changed."""
+
+    def add(self, state: "_UsageState", amount: int, *, now: datetime) -> None:
+        """Record ``amount`` units of usage at ``now``."""
+
+    def expires_at(self, state: "_UsageState") -> datetime:
+        """When ``state`` becomes indistinguishable from a fresh window and can be dropped."""
+
+
+class FixedWindow:
+    """Calendar window: usage resets to zero at every multiple of ``duration`` (UTC midnight)."""
+
+    kind: QuotaWindowKind = "fixed"
+
+    def __init__(self, duration: timedelta = WINDOW_DURATION) -> None:
+        self.duration = duration
+
+    def reset(self, state: "_UsageState", *, now: datetime, limit: int) -> None:
+        state.window_start = _EPOCH + _floor(now, self.duration) * self.duration
+        state.window_end = state.window_start + self.duration
+        state.used = 0
+        state.limit = limit
+        state.updated_at = now
+
+    def advance(self, state: "_UsageState", *, now: datetime, limit: int) -> bool:
+        if now < state.window_end:
+            return False
+        self.reset(state, now=now, limit=limit)
+        return True
+
+    def add(self, state: "_UsageState", amount: int, *, now: datetime) -> None:
+        state.used += amount
+
+    def expires_at(self, state: "_UsageState") -> datetime:
+        return state.window_end
+
+
+class SlidingWindow:
+    """Rolling window over the last ``duration``, counted in ``buckets`` equal slices.
+
+    Each key holds a fixed ring of counters, so memory per key does not grow with traffic.
+    Usage recorded in a slice stops counting one ``duration`` after the slice started, which
+    frees capacity gradually instead of all at once. ``window_end`` is when the oldest slice
+    next drops out.
+    """
+
+    kind: QuotaWindowKind = "sliding"
+
+    def __init__(self, duration: timedelta = WINDOW_DURATION, *, buckets: int = 288) -> None:
+        if buckets <= 0:
+            raise ValueError("Sliding windows need at least one bucket")
+        self.duration = duration
+        self.buckets = buckets
+        self.width = duration / buckets
+
+    def _set_bounds(self, state: "_UsageState") -> None:
+        state.window_end = _EPOCH + (state.head + 1) * self.width
+        state.window_start = state.window_end - self.duration
+
+    def reset(self, state: "_UsageState", *, now: datetime, limit: int) -> None:
+        state.counts = [0] * self.buckets
+        state.head = _floor(now, self.width)
+        state.used = 0
+        state.limit = limit
+        state.updated_at = now
+        self._set_bounds(state)
+
+    def advance(self, state: "_UsageState", *, now: datetime, limit: int) -> bool:
+        changed = state.limit != limit
+        state.limit = limit
+        head = _floor(now, self.width)
+        if head <= state.head:
+            return changed
+        for offset in range(1, min(head - state.head, self.buckets) + 1):
+            slot = (state.head + offset) % self.buckets
+            state.used -= state.counts[slot]
+            state.counts[slot] = 0
+        state.head = head
+        self._set_bounds(state)
+        return True
+
+    def add(self, state: "_UsageState", amount: int, *, now: datetime) -> None:
+        state.counts[state.head % self.buckets] += amount
+        state.used += amount
+
+    def expires_at(self, state: "_UsageState") -> datetime:
+        # Usage is only ever added to the current slice, so the last write's slice drops last.
+        return _EPOCH + _floor(state.updated_at, self.width) * self.width + self.duration
+
+
+class TokenBucket:
+    """Token bucket holding ``limit`` tokens that refills from empty to full over ``period``.
+
+    ``used`` is the number of whole tokens missing from the bucket and ``window_end`` is when it
+    will be full again, so the exposed fields only change when usage is recorded, a whole token
+    comes back or the limit changes.
+    """
+
+    kind: QuotaWindowKind = "token_bucket"
+
+    def __init__(self, period: timedelta = WINDOW_DURATION) -> None:
+        self.period = period
+
+    def _rate(self, limit: int) -> float:
+        return limit / self.period.total_seconds()
+
+    def _set_bounds(self, state: "_UsageState", now: datetime) -> None:
+        rate = self._rate(state.limit)
+        missing = max(state.limit - state.tokens, 0.0)
+        state.window_end = now + timedelta(seconds=missing / rate) if rate > 0 else now
+        state.window_start = state.window_end - self.period
+
+    def _sync_used(self, state: "_UsageState") -> None:
+        # The epsilon keeps float drift from reporting 19.999... refilled tokens as 19.
+        state.used = state.limit - math.floor(state.tokens + 1e-9)
+
+    def reset(self, state: "_UsageState", *, now: datetime, limit: int) -> None:
+        state.tokens = float(limit)
+        state.refilled_at = now
+        state.limit = limit
+        state.updated_at = now
+        self._sync_used(state)
+        self._set_bounds(state, now)
+
+    def advance(self, state: "_UsageState", *, now: datetime, limit: int) -> bool:
+        elapsed = (now - state.refilled_at).total_seconds()
+        if elapsed > 0:
+            state.tokens = min(float(limit), state.tokens + elapsed * self._rate(limit))
+            state.refilled_at = now
+        previous = (state.used, state.limit)
+        limit_changed = state.limit != limit
+        state.limit = limit
+        self._sync_used(state)
+        if limit_changed:
+            self._set_bounds(state, now)
+        return (state.used, state.limit) != previous
+
+    def add(self, state: "_UsageState", amount: int, *, now: datetime) -> None:
+        state.tokens -= amount
+        self._sync_used(state)
+        self._set_bounds(state, now)
+
+    def expires_at(self, state: "_UsageState") -> datetime:
+        return state.window_end
+
+
+def build_quota_windows(
+    kinds: Mapping[str, QuotaWindowKind],
+    *,
+    sliding_buckets: int = 288,
+) -> Dict[PlanUsageMetric, QuotaWindow]:
+    """Map metric names to engines; metrics that are not listed use :class:`FixedWindow`."""
+
+    windows: Dict[PlanUsageMetric, QuotaWindow] = {}
+    for metric in PlanUsageMetric:
+        kind = kinds.get(metric.value, "fixed")
+        if kind == "sliding":
+            windows[metric] = SlidingWindow(buckets=sliding_buckets)
+        elif kind == "token_bucket":
+            windows[metric] = TokenBucket()
+        elif kind == "fixed":
+            windows[metric] = FixedWindow()
+        else:
+            raise ValueError(f"Unknown quota window {kind!r} for metric {metric.value}")
+    unknown = set(kinds) - {metric.value for metric in PlanUsageMetric}
+    if unknown:
+        raise ValueError(f"Unknown plan usage metrics: {', '.join(sorted(unknown))}")
+    return windows
@@ -0,0 +1,47 @@
+"""Audit history endpoints."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from blockbuilders_shared import AuditEventType
+
+from ..dependencies.auth import AuthenticatedUser, get_current_user
+from ..repositories.audit_store import AuditEventQuery, decode_cursor
+from ..schemas import AuditEventPage
+from ..services.audit import AuditService
+
+router = APIRouter(tags=["audit"])
+
+
+@router.get("/audit/events", response_model=AuditEventPage)
+async def list_audit_events(
+    event_type: AuditEventType | None = Query(default=None, alias="eventType"),
+    start: datetime | None = Query(default=None),
+    end: datetime | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=200),
+    user: AuthenticatedUser = Depends(get_current_user),
+    audit: AuditService = Depends(AuditService),
+) -> AuditEventPage:
+    """Return the caller's audit events, newest first. Pass ``nextCursor`` back as ``cursor``."""
+
+    if cursor is not None:
+        try:
+            decode_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+    page = await audit.query_events(
+        AuditEventQuery(
+            actor_id=user.id,
+            event_type=event_type,
+            start=start,
+            end=end,
+            cursor=cursor,
+            limit=limit,
+        )
+    )
+    return AuditEventPage(events=page.events, next_cursor=page.next_cursor)
@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Response, status
+import hashlib
+
+from fastapi import APIRouter, Depends, Header, Response, status
 from pydantic import BaseModel, Field
 
-from blockbuilders_shared import PlanUsage, PlanUsageMetric
+from blockbuilders_shared import PlanUsage, PlanUsageMetric, PlanUsageSummary
 
 from ..dependencies.auth import AuthenticatedUser, get_current_user
 from ..services.plan_usage import (
@@ -23,6 +25,33 @@ class PlanUsageAssertRequest(BaseModel):
     amount: int = Field(default=1, gt=0)
 
 
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+@router.get("/plan-usage", response_model=PlanUsageSummary)
+async def read_plan_usage_summary(
+    user: AuthenticatedUser = Depends(get_current_user),
+    service: PlanUsageService = Depends(get_plan_usage_service),
+    if_none_match: str | None = Header(default=None),
+) -> Response:
+    summary = await service.get_summary(user_id=user.id)
+    body = summary.model_dump_json(by_alias=True).encode("utf-8")
+    etag = _etag(body)
+    # "no-cache" lets browsers keep the body but forces revalidation, which is a cheap 304.
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("/plan-usage/{metric}", response_model=PlanUsage)
 async def read_plan_usage(
     metric: PlanUsageMetric,
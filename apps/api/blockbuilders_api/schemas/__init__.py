@@ -1,5 +1,6 @@
 """Schema exports."""
 
+from .audit import AuditEventPage
 from .auth import AuthSession
 
-__all__ = ["AuthSession"]
+__all__ = ["AuditEventPage", "AuthSession"]
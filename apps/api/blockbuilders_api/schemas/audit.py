@@ -0,0 +1,17 @@
+"""API response contracts for audit history."""
+
+from __future__ import annotations
+
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from blockbuilders_shared import AuditLogEvent
+
+
+class AuditEventPage(BaseModel):
+    events: List[AuditLogEvent]
+    next_cursor: str | None = Field(default=None, alias="nextCursor")
+
+    class Config:
+        populate_by_name = True
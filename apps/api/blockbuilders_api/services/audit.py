@@ -2,29 +2,84 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Dict, List
+from typing import Any, Callable, Dict, Iterator, List, Literal
 from uuid import uuid4
 
 from blockbuilders_shared import AuditEventType, AuditLogEvent
 
+from ..core.ring_buffer import RingBuffer, RingPage
+from ..repositories.audit_journal import AuditJournal
+from ..repositories.audit_store import AuditEventPage, AuditEventQuery, SqliteAuditStore, encode_cursor
 from ..repositories.compliance import ComplianceRepository
+from .audit_sinks import (
+    AuditSink,
+    AuditSinkPipeline,
+    AuditStoreSink,
+    ComplianceAuditSink,
+    DatadogAuditSink,
+    NotificationAuditSink,
+)
 from .datadog import DatadogLogClient
 from .notifications import NotificationService
 
 LOGGER = logging.getLogger(__name__)
 
+DispatchMode = Literal["await", "background"]
+
 
 @dataclass
 class AuditService:
-    """Audit collector that fans out to observability, compliance, and notification sinks."""
+    """Audit collector that fans out to observability, compliance, and notification sinks.
+
+    In ``await`` mode ``record`` returns once every sink has finished or hit its timeout. In
+    ``background`` mode the event is kept in history and handed to the pipeline immediately,
+    so the request does not wait on sink I/O; ``drain`` flushes outstanding deliveries. With a
+    ``journal`` the event is fsynced to it before ``record`` returns, and the compliance and
+    store sinks mark it once their copy is written; :meth:`recover` replays what they never
+    marked on startup, so a crash or an abandoned drain loses nothing (Datadog has its own
+    spool). Once ``max_pending`` deliveries are in flight, ``record`` waits for the sinks like
+    ``await`` mode does.
+
+    History is a ring buffer of the latest ``history_capacity`` events; the sinks hold the
+    durable copy, and ``on_evict`` receives each event as it falls out of memory.
+    """
 
     datadog: DatadogLogClient | None = None
     compliance: ComplianceRepository | None = None
     notifications: NotificationService | None = None
-    _events: List[AuditLogEvent] = field(default_factory=list)
+    store: SqliteAuditStore | None = None
+    journal: AuditJournal | None = None
+    sinks: List[AuditSink] = field(default_factory=list)
+    dispatch_mode: DispatchMode = "await"
+    sink_timeout_seconds: float = 2.0
+    max_pending: int = 1_000
+    history_capacity: int = 10_000
+    on_evict: Callable[[AuditLogEvent], None] | None = None
+    _events: RingBuffer[AuditLogEvent] = field(init=False, repr=False)
+    _pipeline: AuditSinkPipeline = field(init=False, repr=False)
+    _durable_sinks: Dict[str, AuditSink] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._events = RingBuffer(self.history_capacity, on_evict=self.on_evict)
+        sinks: List[AuditSink] = []
+        if self.datadog:
+            sinks.append(DatadogAuditSink(self.datadog))
+        if self.compliance:
+            sinks.append(ComplianceAuditSink(self.compliance, journal=self.journal))
+            self._durable_sinks[sinks[-1].name] = sinks[-1]
+        if self.notifications:
+            sinks.append(NotificationAuditSink(self.notifications))
+        if self.store:
+            sinks.append(AuditStoreSink(self.store, journal=self.journal))
+            self._durable_sinks[sinks[-1].name] = sinks[-1]
+        sinks.extend(self.sinks)
+        self._pipeline = AuditSinkPipeline(
+            sinks=sinks, timeout_seconds=self.sink_timeout_seconds, max_pending=self.max_pending
+        )
 
     async def record(
         self,
@@ -42,24 +97,58 @@ class AuditService:
         )
         self._events.append(event)
 
-        if self.datadog:
-            await self.datadog.send_event(event)
+        if self.dispatch_mode == "background":
+            if self.journal is not None:
+                await asyncio.to_thread(self.journal.append, event, list(self._durable_sinks))
+            await self._pipeline.submit(event)
+        else:
+            await self._pipeline.dispatch(event)
 
-        if self.compliance:
-            try:
-                self.compliance.record(event)
-            except Exception as exc:  # pragma: no cover - defensive logging
-                LOGGER.warning("Failed to persist compliance record: %s", exc)
+        return event
 
-        if self.notifications:
-            try:
-                self.notifications.publish(event)
-            except Exception as exc:  # pragma: no cover - defensive logging
-                LOGGER.warning("Failed to publish audit notification: %s", exc)
+    async def recover(self) -> int:
+        """Replay events an earlier process journaled into the durable sinks that never wrote them."""
 
-        return event
+        if self.journal is None:
+            return 0
+        pending = await asyncio.to_thread(self.journal.recover, list(self._durable_sinks))
+        for event, missing in pending:
+            await self._pipeline.dispatch(event, [self._durable_sinks[name] for name in missing])
+        if pending:
+            LOGGER.info("Replayed %s journaled audit events", len(pending))
+        return len(pending)
+
+    async def drain(self, timeout_seconds: float | None = None) -> None:
+        await self._pipeline.drain(timeout_seconds)
+
+    def metrics(self) -> Dict[str, Any]:
+        metrics = self._pipeline.metrics()
+        if self.journal is not None:
+            metrics["journal"] = self.journal.metrics()
+        return metrics
 
     def history(self) -> List[AuditLogEvent]:
         """Return an immutable snapshot of recorded audit events."""
 
-        return list(self._events)
+        return self._events.to_list()
+
+    async def query_events(self, query: AuditEventQuery) -> AuditEventPage:
+        """Newest-first, keyset-paginated events from the store, or from in-memory history without one."""
+
+        if self.store is not None:
+            return await asyncio.to_thread(self.store.query, query)
+
+        matches = sorted(
+            (event for event in self._events if query.matches(event)),
+            key=lambda event: (event.created_at, event.id),
+            reverse=True,
+        )
+        events = matches[: query.limit]
+        next_cursor = encode_cursor(events[-1].created_at, events[-1].id) if len(matches) > query.limit else None
+        return AuditEventPage(events=events, next_cursor=next_cursor)
+
+    def iter_history(self) -> Iterator[AuditLogEvent]:
+        return iter(self._events)
+
+    def page(self, cursor: int | None = None, limit: int = 100) -> RingPage[AuditLogEvent]:
+        return self._events.page(cursor, limit)
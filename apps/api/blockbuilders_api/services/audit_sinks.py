@@ -0,0 +1,187 @@
+"""Sink pipeline that delivers audit events to every configured destination concurrently."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Protocol, Sequence, Set
+
+from blockbuilders_shared import AuditLogEvent
+
+from ..repositories.audit_journal import AuditJournal
+from ..repositories.audit_store import SqliteAuditStore
+from ..repositories.compliance import ComplianceRepository
+from .datadog import DatadogLogClient
+from .notifications import NotificationService
+
+LOGGER = logging.getLogger(__name__)
+
+
+class AuditSink(Protocol):
+    """Destination for audit events. ``timeout_seconds`` overrides the pipeline default."""
+
+    name: str
+    timeout_seconds: float | None
+
+    async def emit(self, event: AuditLogEvent) -> None: ...
+
+
+@dataclass
+class DatadogAuditSink:
+    client: DatadogLogClient
+    name: str = "datadog"
+    timeout_seconds: float | None = None
+
+    async def emit(self, event: AuditLogEvent) -> None:
+        await self.client.send_event(event)
+
+
+@dataclass
+class ComplianceAuditSink:
+    """Runs the blocking CSV write in a worker thread, one event at a time to keep file order.
+
+    The asyncio lock queues events in arrival order; the thread lock is held by the write itself,
+    because a timed-out ``emit`` is cancelled while its worker thread keeps writing. Written rows
+    are marked in the ``journal``.
+    """
+
+    repository: ComplianceRepository
+    name: str = "compliance"
+    timeout_seconds: float | None = None
+    journal: AuditJournal | None = None
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
+    _write_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    async def emit(self, event: AuditLogEvent) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._record, event)
+
+    def _record(self, event: AuditLogEvent) -> None:
+        with self._write_lock:
+            self.repository.record(event)
+        if self.journal is not None:
+            self.journal.complete(event.id, self.name)
+
+
+@dataclass
+class AuditStoreSink:
+    """Buffers into the store; the ``journal`` is marked only once the row's batch commits."""
+
+    store: SqliteAuditStore
+    name: str = "store"
+    timeout_seconds: float | None = None
+    journal: AuditJournal | None = None
+
+    async def emit(self, event: AuditLogEvent) -> None:
+        journal = self.journal
+        on_persisted = (lambda: journal.complete(event.id, self.name)) if journal is not None else None
+        await asyncio.to_thread(self.store.add, event, on_persisted=on_persisted)
+
+
+@dataclass
+class NotificationAuditSink:
+    service: NotificationService
+    name: str = "notifications"
+    timeout_seconds: float | None = None
+
+    async def emit(self, event: AuditLogEvent) -> None:
+        self.service.publish(event)
+
+
+@dataclass
+class _SinkStats:
+    delivered: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    last_latency_ms: float = 0.0
+
+
+@dataclass
+class AuditSinkPipeline:
+    """Fans each event out to all sinks at once, each bounded by its own timeout.
+
+    A failing or slow sink is logged and counted but never affects the others or the caller.
+    ``submit`` schedules delivery in the background and tracks the task so ``drain`` can wait
+    for in-flight events on shutdown. At most ``max_pending`` deliveries are in flight; once
+    ``saturated``, callers should ``dispatch`` inline so a slow sink pushes back on producers
+    instead of growing the task set without bound.
+    """
+
+    sinks: List[AuditSink] = field(default_factory=list)
+    timeout_seconds: float = 2.0
+    max_pending: int = 1_000
+    _pending: Set[asyncio.Task[None]] = field(default_factory=set, init=False, repr=False)
+    _stats: Dict[str, _SinkStats] = field(default_factory=dict, init=False, repr=False)
+    _backpressured: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        for sink in self.sinks:
+            self._stats.setdefault(sink.name, _SinkStats())
+
+    async def dispatch(self, event: AuditLogEvent, sinks: Sequence[AuditSink] | None = None) -> None:
+        targets = self.sinks if sinks is None else sinks
+        if targets:
+            await asyncio.gather(*(self._emit(sink, event) for sink in targets))
+
+    @property
+    def saturated(self) -> bool:
+        return len(self._pending) >= self.max_pending
+
+    async def submit(self, event: AuditLogEvent) -> None:
+        """Deliver in the background, or inline when ``max_pending`` deliveries are already queued."""
+
+        if self.saturated:
+            self._backpressured += 1
+            await self.dispatch(event)
+            return
+        task = asyncio.create_task(self.dispatch(event))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def drain(self, timeout_seconds: float | None = None) -> None:
+        """Wait for background deliveries; anything still running after the timeout is cancelled."""
+
+        if not self._pending:
+            return
+        pending: Iterable[asyncio.Task[None]] = list(self._pending)
+        done, unfinished = await asyncio.wait(pending, timeout=timeout_seconds)
+        self._pending.difference_update(done)
+        for task in unfinished:
+            task.cancel()
+        if unfinished:
+            LOGGER.warning("Abandoned %s audit deliveries still pending at shutdown", len(unfinished))
+
+    async def _emit(self, sink: AuditSink, event: AuditLogEvent) -> None:
+        stats = self._stats.setdefault(sink.name, _SinkStats())
+        timeout = sink.timeout_seconds if sink.timeout_seconds is not None else self.timeout_seconds
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(sink.emit(event), timeout=timeout)
+        except asyncio.TimeoutError:
+            stats.timed_out += 1
+            LOGGER.warning("Audit sink %s timed out after %ss for %s", sink.name, timeout, event.id)
+        except Exception as exc:  # pragma: no cover - defensive logging
+            stats.failed += 1
+            LOGGER.warning("Audit sink %s failed for %s: %s", sink.name, event.id, exc)
+        else:
+            stats.delivered += 1
+        finally:
+            stats.last_latency_ms = (time.perf_counter() - started) * 1000
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "backpressured": self._backpressured,
+            "sinks": {
+                name: {
+                    "delivered": stats.delivered,
+                    "failed": stats.failed,
+                    "timedOut": stats.timed_out,
+                    "lastLatencyMs": round(stats.last_latency_ms, 3),
+                }
+                for name, stats in self._stats.items()
+            },
+        }
@@ -2,15 +2,22 @@
 
 from __future__ import annotations
 
+import asyncio
+import gzip
+import json
 import logging
+import time
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
+from typing import Any, Deque, Dict, List, Literal
 
 import httpx
 
 from blockbuilders_shared import AuditEventType, AuditLogEvent
 
+from .datadog_spool import DiskSpool
+
 LOGGER = logging.getLogger(__name__)
 
 SERVICE_BY_EVENT: Dict[AuditEventType, str] = {
@@ -20,56 +27,335 @@ SERVICE_BY_EVENT: Dict[AuditEventType, str] = {
     AuditEventType.WORKSPACE_CREATED: "workspace-seeding",
 }
 
+OverflowPolicy = Literal["drop_oldest", "drop_newest", "block"]
+
 
 def _service_for(event: AuditLogEvent) -> str:
     return SERVICE_BY_EVENT.get(event.event_type, "auth-gateway")
 
 
+def _is_retryable(exc: httpx.HTTPError) -> bool:
+    """Transport errors, timeouts, 429 and 5xx are outages; any other 4xx rejects the batch for good."""
+
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return True
+    status = exc.response.status_code
+    return status in (408, 429) or status >= 500
+
+
 @dataclass
 class DatadogLogClient:
-    """Minimal Datadog logs API client."""
+    """Buffered Datadog logs API client.
+
+    ``send_event`` only serializes the event into a bounded in-memory queue. Once ``start`` has
+    been awaited (from the application lifespan) a background task posts JSON arrays whenever
+    ``max_batch_events`` or ``max_batch_bytes`` is reached, or every ``flush_interval_seconds``.
+    Without a running flusher each call flushes inline, which keeps scripts and tests simple.
+
+    When a ``spool`` is configured, batches that fail to post are written to disk instead of
+    being held in memory, and are replayed oldest-first once the endpoint answers again. Retries
+    back off exponentially from ``retry_initial_seconds`` up to ``retry_max_seconds``. A batch the
+    endpoint rejects with a permanent 4xx (400, 413, ...) is logged and dropped instead, so it
+    cannot block the spool behind it.
+    """
 
     endpoint: str | None
     api_key: str | None = None
     transport: httpx.AsyncBaseTransport | None = None
+    max_queue_events: int = 10_000
+    max_batch_events: int = 500
+    max_batch_bytes: int = 1_000_000
+    flush_interval_seconds: float = 2.0
+    compress: bool = True
+    overflow_policy: OverflowPolicy = "drop_oldest"
+    block_timeout_seconds: float = 1.0
+    spool: DiskSpool | None = None
+    retry_initial_seconds: float = 1.0
+    retry_max_seconds: float = 60.0
+    _queue: Deque[bytes] = field(default_factory=deque, init=False, repr=False)
+    _queued_bytes: int = field(default=0, init=False, repr=False)
+    _client: httpx.AsyncClient | None = field(default=None, init=False, repr=False)
+    _task: asyncio.Task[None] | None = field(default=None, init=False, repr=False)
+    _wake: asyncio.Event | None = field(default=None, init=False, repr=False)
+    _space: asyncio.Event | None = field(default=None, init=False, repr=False)
+    _flush_lock: asyncio.Lock | None = field(default=None, init=False, repr=False)
     _retry_after: datetime | None = field(default=None, init=False, repr=False)
+    _retry_delay: float | None = field(default=None, init=False, repr=False)
     _warned: bool = field(default=False, init=False, repr=False)
+    _sent_events: int = field(default=0, init=False, repr=False)
+    _sent_batches: int = field(default=0, init=False, repr=False)
+    _dropped_events: int = field(default=0, init=False, repr=False)
+    _failed_batches: int = field(default=0, init=False, repr=False)
+    _rejected_events: int = field(default=0, init=False, repr=False)
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if not self.endpoint or self.is_running:
+            return
+        self._client = httpx.AsyncClient(timeout=5.0, transport=self.transport)
+        self._wake = asyncio.Event()
+        self._space = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        if self.spool is not None:
+            # Scan any segments left by a previous process before the first flush needs them.
+            await asyncio.to_thread(self.spool.depth)
+        self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        """Stop the background flusher and drain whatever is still queued."""
+
+        if self._task is not None:
+            # Cancel between flushes so a delivered batch is never left unacknowledged in the spool.
+            assert self._flush_lock is not None
+            async with self._flush_lock:
+                self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._has_backlog() and await self.flush():
+            pass
+        if self.spool is not None:
+            await self._spill_queue()
+            self.spool.close()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _has_backlog(self) -> bool:
+        return bool(self._queue) or (self.spool is not None and self.spool.depth() > 0)
 
     async def send_event(self, event: AuditLogEvent) -> None:
-        """Send the audit log event to Datadog if an endpoint is configured."""
+        """Queue the audit log event for Datadog if an endpoint is configured."""
 
         if not self.endpoint:
             return
 
-        now = datetime.now(timezone.utc)
-        if self._retry_after and now < self._retry_after:
+        encoded = json.dumps(self._build_payload(event), separators=(",", ":")).encode("utf-8")
+        if not await self._enqueue(encoded):
             return
 
-        payload = self._build_payload(event)
+        if not self.is_running:
+            while self._has_backlog() and await self.flush():
+                pass
+        elif len(self._queue) >= self.max_batch_events or self._queued_bytes >= self.max_batch_bytes:
+            assert self._wake is not None
+            self._wake.set()
+
+    async def _enqueue(self, encoded: bytes) -> bool:
+        while len(self._queue) >= self.max_queue_events:
+            if self.overflow_policy == "drop_newest":
+                self._dropped_events += 1
+                return False
+            if self.overflow_policy == "block" and self.is_running:
+                assert self._space is not None and self._wake is not None
+                self._space.clear()
+                self._wake.set()
+                try:
+                    await asyncio.wait_for(self._space.wait(), timeout=self.block_timeout_seconds)
+                except asyncio.TimeoutError:
+                    self._dropped_events += 1
+                    return False
+                continue
+            dropped = self._queue.popleft()
+            self._queued_bytes -= len(dropped)
+            self._dropped_events += 1
+
+        self._queue.append(encoded)
+        self._queued_bytes += len(encoded)
+        return True
+
+    def _take_batch(self) -> List[bytes]:
+        batch: List[bytes] = []
+        size = 2
+        while self._queue and len(batch) < self.max_batch_events:
+            candidate = self._queue[0]
+            if batch and size + len(candidate) + 1 > self.max_batch_bytes:
+                break
+            batch.append(self._queue.popleft())
+            size += len(candidate) + 1
+            self._queued_bytes -= len(candidate)
+        if self._space is not None:
+            self._space.set()
+        return batch
+
+    def _requeue(self, batch: List[bytes]) -> None:
+        room = max(self.max_queue_events - len(self._queue), 0)
+        kept = batch[len(batch) - room :] if room < len(batch) else batch
+        self._dropped_events += len(batch) - len(kept)
+        for encoded in reversed(kept):
+            self._queue.appendleft(encoded)
+            self._queued_bytes += len(encoded)
+
+    async def flush(self) -> bool:
+        """Post one batch, replaying spooled events first; returns False when the backlog did not move."""
+
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            if not self.endpoint:
+                return False
+
+            now = datetime.now(timezone.utc)
+            if self._retry_after and now < self._retry_after:
+                return False
+
+            if self.spool is not None and self.spool.depth() > 0:
+                return await self._replay_spool(now)
+            if not self._queue:
+                return False
+
+            batch = self._take_batch()
+            try:
+                await self._post_batch(batch)
+            except httpx.HTTPError as exc:
+                self._failed_batches += 1
+                if not _is_retryable(exc):
+                    self._on_rejected(len(batch), exc)
+                    return True
+                if self.spool is None or not await self._spill(batch):
+                    self._requeue(batch)
+                self._on_failure(now, exc)
+                return False
+
+            self._on_success(len(batch))
+            return True
+
+    async def _replay_spool(self, now: datetime) -> bool:
+        assert self.spool is not None
+        records, cursor = await asyncio.to_thread(
+            self.spool.read_batch,
+            max_events=self.max_batch_events,
+            max_bytes=self.max_batch_bytes,
+        )
+        if not records:
+            return False
+
+        started = time.monotonic()
+        try:
+            await self._post_batch(records)
+        except httpx.HTTPError as exc:
+            self._failed_batches += 1
+            if _is_retryable(exc):
+                self._on_failure(now, exc)
+                return False
+            # Retrying a rejected batch would pin it at the head of the spool forever.
+            await asyncio.to_thread(self.spool.ack, cursor, delivered=0, rejected=len(records))
+            self._on_rejected(len(records), exc)
+            return True
+
+        await asyncio.to_thread(
+            self.spool.ack,
+            cursor,
+            delivered=len(records),
+            elapsed_seconds=time.monotonic() - started,
+        )
+        self._on_success(len(records))
+        return True
+
+    async def _spill(self, batch: List[bytes]) -> bool:
+        assert self.spool is not None
+        try:
+            await asyncio.to_thread(self.spool.append, batch)
+        except OSError as exc:  # pragma: no cover - defensive logging
+            LOGGER.warning("Failed to spool %s audit events to disk: %s", len(batch), exc)
+            return False
+        return True
+
+    async def _spill_queue(self) -> None:
+        """Move queued events to disk while Datadog is unavailable."""
+
+        while self._queue:
+            batch = self._take_batch()
+            if not await self._spill(batch):
+                self._requeue(batch)
+                return
+
+    async def _post_batch(self, batch: List[bytes]) -> None:
+        body = b"[" + b",".join(batch) + b"]"
         headers = {"Content-Type": "application/json"}
+        if self.compress:
+            # Large batches are compressed off the event loop.
+            if len(body) > 64_000:
+                body = await asyncio.to_thread(gzip.compress, body, 6)
+            else:
+                body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
         if self.api_key:
             headers["DD-API-KEY"] = self.api_key
+        await self._post(body, headers)
 
-        try:
+    def _on_success(self, delivered: int) -> None:
+        self._retry_after = None
+        self._retry_delay = None
+        self._warned = False
+        self._sent_events += delivered
+        self._sent_batches += 1
+
+    def _on_rejected(self, rejected: int, exc: Exception) -> None:
+        self._retry_after = None
+        self._retry_delay = None
+        self._rejected_events += rejected
+        LOGGER.error("Datadog rejected a batch of %s audit events; dropping it: %s", rejected, exc)
+
+    async def _post(self, body: bytes, headers: Dict[str, str]) -> None:
+        assert self.endpoint is not None
+        if self._client is not None:
+            response = await self._client.post(self.endpoint, headers=headers, content=body)
+        else:
             async with httpx.AsyncClient(timeout=5.0, transport=self.transport) as client:
-                await client.post(self.endpoint, headers=headers, json=payload)
-        except httpx.HTTPError as exc:
-            retry_delay = timedelta(seconds=60)
-            self._retry_after = now + retry_delay
-            if not self._warned:
-                LOGGER.warning(
-                    "Failed to forward audit event to Datadog: %s. "
-                    "Datadog forwarding will retry in %s seconds. "
-                    "Run `python scripts/mock_datadog_agent.py --port 8282` to capture events locally.",
-                    exc,
-                    int(retry_delay.total_seconds()),
-                )
-                self._warned = True
-            else:
-                LOGGER.debug("Datadog forwarding still unavailable: %s", exc)
+                response = await client.post(self.endpoint, headers=headers, content=body)
+        response.raise_for_status()
+
+    def _on_failure(self, now: datetime, exc: Exception) -> None:
+        if self._retry_delay is None:
+            self._retry_delay = self.retry_initial_seconds
         else:
-            self._retry_after = None
-            self._warned = False
+            self._retry_delay = min(self._retry_delay * 2, self.retry_max_seconds)
+        retry_delay = timedelta(seconds=self._retry_delay)
+        self._retry_after = now + retry_delay
+        if not self._warned:
+            LOGGER.warning(
+                "Failed to forward audit events to Datadog: %s. "
+                "Datadog forwarding will retry with backoff starting at %s seconds. "
+                "Run `python scripts/mock_datadog_agent.py --port 8282` to capture events locally.",
+                exc,
+                retry_delay.total_seconds(),
+            )
+            self._warned = True
+        else:
+            LOGGER.debug("Datadog forwarding still unavailable: %s", exc)
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            backing_off = self._retry_after is not None and datetime.now(timezone.utc) < self._retry_after
+            if backing_off and self.spool is not None:
+                await self._spill_queue()
+                continue
+            while self._has_backlog() and await self.flush():
+                pass
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "queuedBytes": self._queued_bytes,
+            "sentEvents": self._sent_events,
+            "sentBatches": self._sent_batches,
+            "droppedEvents": self._dropped_events,
+            "failedBatches": self._failed_batches,
+            "rejectedEvents": self._rejected_events,
+            "retryDelaySeconds": self._retry_delay or 0.0,
+            "spool": self.spool.metrics() if self.spool is not None else None,
+        }
 
     def _build_payload(self, event: AuditLogEvent) -> Dict[str, Any]:
         metadata = event.metadata or {}
@@ -0,0 +1,275 @@
+"""Durable on-disk spool that keeps Datadog audit events while the intake is unreachable."""
+
+from __future__ import annotations
+
+import logging
+import os
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Any, BinaryIO, Dict, List, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+_FRAME = struct.Struct(">I")
+_SEGMENT_GLOB = "segment-*.spool"
+_CURSOR_FILE = "cursor"
+
+SpoolCursor = Tuple[int, int]
+
+
+def _segment_name(sequence: int) -> str:
+    return f"segment-{sequence:012d}.spool"
+
+
+def _segment_sequence(path: Path) -> int:
+    return int(path.stem.split("-", 1)[1])
+
+
+@dataclass
+class DiskSpool:
+    """Segment-file ring buffer of length-prefixed records.
+
+    Writers append whole batches and fsync once per batch. Readers consume from the oldest
+    segment and commit progress with :meth:`ack`, which persists a cursor and deletes fully
+    replayed segments. When the spool would exceed ``max_bytes`` the oldest segments are
+    discarded so an extended outage cannot fill the disk.
+    """
+
+    directory: Path
+    max_bytes: int = 256 * 1024 * 1024
+    segment_bytes: int = 8 * 1024 * 1024
+    _segments: List[int] = field(default_factory=list, init=False, repr=False)
+    _segment_sizes: Dict[int, int] = field(default_factory=dict, init=False, repr=False)
+    _segment_counts: Dict[int, int] = field(default_factory=dict, init=False, repr=False)
+    _cursor: SpoolCursor = field(default=(0, 0), init=False, repr=False)
+    _cursor_events: int = field(default=0, init=False, repr=False)
+    _writer: BinaryIO | None = field(default=None, init=False, repr=False)
+    _loaded: bool = field(default=False, init=False, repr=False)
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+    _spooled_total: int = field(default=0, init=False, repr=False)
+    _replayed_total: int = field(default=0, init=False, repr=False)
+    _discarded_total: int = field(default=0, init=False, repr=False)
+    _last_replay_rate: float = field(default=0.0, init=False, repr=False)
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.directory.exists():
+            return
+
+        for path in sorted(self.directory.glob(_SEGMENT_GLOB)):
+            sequence = _segment_sequence(path)
+            count, valid_bytes = self._scan_segment(path)
+            if valid_bytes < path.stat().st_size:
+                # A crash mid-write left a torn frame; cut it so it can neither be counted nor
+                # stall replay, and so later appends never land behind it.
+                LOGGER.warning("Truncating torn Datadog spool frame in %s at byte %d", path, valid_bytes)
+                with path.open("r+b") as handle:
+                    handle.truncate(valid_bytes)
+            self._segments.append(sequence)
+            self._segment_sizes[sequence] = valid_bytes
+            self._segment_counts[sequence] = count
+
+        cursor_path = self.directory / _CURSOR_FILE
+        if cursor_path.exists() and self._segments:
+            try:
+                sequence, offset = (int(part) for part in cursor_path.read_text(encoding="utf-8").split())
+            except ValueError:  # pragma: no cover - defensive logging
+                LOGGER.warning("Ignoring corrupt Datadog spool cursor in %s", cursor_path)
+            else:
+                if sequence in self._segment_sizes:
+                    self._cursor = (sequence, offset)
+                    self._cursor_events = self._count_records(self._segment_path(sequence), limit=offset)
+        if self._segments and self._cursor[0] not in self._segment_sizes:
+            self._cursor = (self._segments[0], 0)
+            self._cursor_events = 0
+
+    @staticmethod
+    def _scan_segment(path: Path, *, limit: int | None = None) -> Tuple[int, int]:
+        """Count complete frames (up to byte ``limit``) and return ``(count, bytes they span)``."""
+
+        size = path.stat().st_size
+        count = 0
+        offset = 0
+        with path.open("rb") as handle:
+            while limit is None or offset < limit:
+                header = handle.read(_FRAME.size)
+                if len(header) < _FRAME.size:
+                    break
+                (length,) = _FRAME.unpack(header)
+                if offset + _FRAME.size + length > size:
+                    break
+                handle.seek(length, os.SEEK_CUR)
+                offset += _FRAME.size + length
+                count += 1
+        return count, offset
+
+    @classmethod
+    def _count_records(cls, path: Path, *, limit: int | None = None) -> int:
+        return cls._scan_segment(path, limit=limit)[0]
+
+    def _segment_path(self, sequence: int) -> Path:
+        return self.directory / _segment_name(sequence)
+
+    def _open_writer(self) -> BinaryIO:
+        if self._writer is not None and self._segments and self._segment_sizes[self._segments[-1]] < self.segment_bytes:
+            return self._writer
+
+        if self._writer is not None:
+            self._writer.close()
+        sequence = self._segments[-1] + 1 if self._segments else 1
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._writer = self._segment_path(sequence).open("ab")
+        self._segments.append(sequence)
+        self._segment_sizes[sequence] = 0
+        self._segment_counts[sequence] = 0
+        if len(self._segments) == 1:
+            self._cursor = (sequence, 0)
+            self._cursor_events = 0
+        return self._writer
+
+    def append(self, records: List[bytes]) -> None:
+        """Persist a batch of encoded events with a single fsync."""
+
+        if not records:
+            return
+        with self._lock:
+            self._ensure_loaded()
+            writer = self._open_writer()
+            sequence = self._segments[-1]
+            frame = b"".join(_FRAME.pack(len(record)) + record for record in records)
+            try:
+                writer.write(frame)
+                writer.flush()
+                os.fsync(writer.fileno())
+            except OSError:
+                # Drop any partial frame so the segment stays a clean sequence of records.
+                writer.truncate(self._segment_sizes[sequence])
+                raise
+            self._segment_sizes[sequence] += len(frame)
+            self._segment_counts[sequence] += len(records)
+            self._spooled_total += len(records)
+            self._enforce_capacity_locked()
+
+    def _enforce_capacity_locked(self) -> None:
+        while len(self._segments) > 1 and sum(self._segment_sizes.values()) > self.max_bytes:
+            oldest = self._segments[0]
+            discarded = self._segment_counts[oldest]
+            if self._cursor[0] == oldest:
+                discarded -= self._cursor_events
+            self._drop_segment_locked(oldest)
+            self._discarded_total += discarded
+            self._cursor = (self._segments[0], 0)
+            self._cursor_events = 0
+            LOGGER.warning("Datadog spool exceeded %s bytes; discarded %s oldest events", self.max_bytes, discarded)
+
+    def _drop_segment_locked(self, sequence: int) -> None:
+        self._segments.remove(sequence)
+        self._segment_sizes.pop(sequence, None)
+        self._segment_counts.pop(sequence, None)
+        self._segment_path(sequence).unlink(missing_ok=True)
+
+    def read_batch(self, *, max_events: int, max_bytes: int) -> Tuple[List[bytes], SpoolCursor]:
+        """Return the oldest unacknowledged records and the cursor to ack once they are delivered."""
+
+        with self._lock:
+            self._ensure_loaded()
+            if not self._segments:
+                return [], self._cursor
+
+            while True:
+                sequence, offset = self._cursor
+                records, offset, exhausted = self._read_segment_locked(sequence, offset, max_events, max_bytes)
+                is_active = self._segments[-1] == sequence
+                if records or not exhausted or is_active:
+                    return records, (sequence, offset)
+                # Nothing left in a segment that will never grow again: move on to the next one.
+                self._drop_segment_locked(sequence)
+                self._cursor = (self._segments[0], 0)
+                self._cursor_events = 0
+                self._write_cursor_locked()
+
+    def _read_segment_locked(
+        self, sequence: int, offset: int, max_events: int, max_bytes: int
+    ) -> Tuple[List[bytes], int, bool]:
+        """Read frames from ``offset``; the flag is True once the segment has no more whole frames."""
+
+        records: List[bytes] = []
+        size = 0
+        with self._segment_path(sequence).open("rb") as handle:
+            handle.seek(offset)
+            while len(records) < max_events:
+                header = handle.read(_FRAME.size)
+                (length,) = _FRAME.unpack(header) if len(header) == _FRAME.size else (None,)
+                if length is not None and records and size + length > max_bytes:
+                    break
+                payload = handle.read(length) if length is not None else b""
+                if length is None or len(payload) < length:
+                    # A short frame outside the active segment can never be completed, so it
+                    # ends the segment; point the cursor past it so ``ack`` retires the file.
+                    if self._segments[-1] != sequence:
+                        offset = self._segment_sizes[sequence]
+                    return records, offset, True
+                records.append(payload)
+                size += length
+                offset += _FRAME.size + length
+        return records, offset, offset >= self._segment_sizes[sequence]
+
+    def ack(
+        self, cursor: SpoolCursor, *, delivered: int, rejected: int = 0, elapsed_seconds: float | None = None
+    ) -> None:
+        """Advance past a replayed batch; ``rejected`` events were refused by the endpoint and are dropped."""
+
+        with self._lock:
+            sequence, offset = cursor
+            if sequence not in self._segment_sizes:
+                return
+            self._replayed_total += delivered
+            if elapsed_seconds:
+                self._last_replay_rate = delivered / elapsed_seconds
+
+            is_active = self._segments[-1] == sequence and self._writer is not None
+            if offset >= self._segment_sizes[sequence] and (len(self._segments) > 1 or not is_active):
+                self._drop_segment_locked(sequence)
+                if self._writer is not None and not self._segments:
+                    self._writer.close()
+                    self._writer = None
+                self._cursor = (self._segments[0], 0) if self._segments else (0, 0)
+                self._cursor_events = 0
+            else:
+                self._cursor = (sequence, offset)
+                self._cursor_events += delivered + rejected
+            self._write_cursor_locked()
+
+    def _write_cursor_locked(self) -> None:
+        if not self.directory.exists():
+            return
+        cursor_path = self.directory / _CURSOR_FILE
+        temp_path = cursor_path.with_suffix(".tmp")
+        temp_path.write_text(f"{self._cursor[0]} {self._cursor[1]}", encoding="utf-8")
+        os.replace(temp_path, cursor_path)
+
+    def depth(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return sum(self._segment_counts.values()) - self._cursor_events
+
+    def close(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth(),
+            "bytes": sum(self._segment_sizes.values()),
+            "segments": len(self._segments),
+            "spooledTotal": self._spooled_total,
+            "replayedTotal": self._replayed_total,
+            "discardedTotal": self._discarded_total,
+            "replayEventsPerSecond": round(self._last_replay_rate, 2),
+        }
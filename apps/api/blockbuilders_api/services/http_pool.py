@@ -0,0 +1,112 @@
+"""Long-lived, instrumented HTTP connection pool shared across requests."""
+
+from __future__ import annotations
+
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict
+
+import httpx
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class HttpPoolMetrics:
+    """Counters describing how close the pool runs to saturation."""
+
+    max_connections: int
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    requests_total: int = 0
+    saturated_total: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        utilization = self.in_flight / self.max_connections if self.max_connections else 0.0
+        return {
+            "maxConnections": self.max_connections,
+            "inFlight": self.in_flight,
+            "peakInFlight": self.peak_in_flight,
+            "requestsTotal": self.requests_total,
+            "saturatedTotal": self.saturated_total,
+            "utilization": round(utilization, 4),
+        }
+
+
+@dataclass
+class HttpClientPool:
+    """Owns a single ``httpx.AsyncClient`` for the lifetime of the application.
+
+    The pool is opened and closed from the FastAPI lifespan. Requests issued while every
+    connection is busy are counted as saturated so operators can size ``max_connections``.
+    """
+
+    base_url: str
+    timeout: httpx.Timeout
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    transport: httpx.AsyncBaseTransport | None = None
+    _client: httpx.AsyncClient | None = field(default=None, init=False, repr=False)
+    _metrics: HttpPoolMetrics = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._metrics = HttpPoolMetrics(max_connections=self.max_connections)
+
+    @property
+    def is_open(self) -> bool:
+        return self._client is not None and not self._client.is_closed
+
+    async def start(self) -> None:
+        if self.is_open:
+            return
+
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+        try:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=limits,
+                http2=self.http2,
+                transport=self.transport,
+            )
+        except ImportError:
+            LOGGER.warning("HTTP/2 requested for %s but the h2 package is not installed; using HTTP/1.1", self.base_url)
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=limits,
+                transport=self.transport,
+            )
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @asynccontextmanager
+    async def client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Yield the pooled client while tracking in-flight requests."""
+
+        if self._client is None:
+            raise RuntimeError("HTTP client pool has not been started")
+
+        metrics = self._metrics
+        if metrics.in_flight >= metrics.max_connections:
+            metrics.saturated_total += 1
+        metrics.in_flight += 1
+        metrics.requests_total += 1
+        metrics.peak_in_flight = max(metrics.peak_in_flight, metrics.in_flight)
+        try:
+            yield self._client
+        finally:
+            metrics.in_flight -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return self._metrics.as_dict()
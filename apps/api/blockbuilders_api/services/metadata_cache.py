@@ -0,0 +1,239 @@
+"""Size-bounded in-memory caches with pluggable eviction policies."""
+
+from __future__ import annotations
+
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Protocol, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class EvictionPolicy(Protocol):
+    """Tracks key usage and nominates the next key to evict."""
+
+    def insert(self, key: Hashable) -> None: ...
+
+    def touch(self, key: Hashable) -> None: ...
+
+    def remove(self, key: Hashable) -> None: ...
+
+    def victim(self) -> Hashable: ...
+
+    def clear(self) -> None: ...
+
+
+class LRUPolicy:
+    def __init__(self) -> None:
+        self._order: OrderedDict[Hashable, None] = OrderedDict()
+
+    def insert(self, key: Hashable) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def touch(self, key: Hashable) -> None:
+        self._order.move_to_end(key)
+
+    def remove(self, key: Hashable) -> None:
+        self._order.pop(key, None)
+
+    def victim(self) -> Hashable:
+        return next(iter(self._order))
+
+    def clear(self) -> None:
+        self._order.clear()
+
+
+class LFUPolicy:
+    """O(1) least-frequently-used policy; ties are broken by least recent use."""
+
+    def __init__(self) -> None:
+        self._frequency: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, OrderedDict[Hashable, None]] = {}
+        self._min_frequency = 0
+
+    def insert(self, key: Hashable) -> None:
+        if key in self._frequency:
+            self.touch(key)
+            return
+        self._frequency[key] = 1
+        self._buckets.setdefault(1, OrderedDict())[key] = None
+        self._min_frequency = 1
+
+    def touch(self, key: Hashable) -> None:
+        frequency = self._frequency[key]
+        bucket = self._buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[frequency]
+            if self._min_frequency == frequency:
+                self._min_frequency = frequency + 1
+        self._frequency[key] = frequency + 1
+        self._buckets.setdefault(frequency + 1, OrderedDict())[key] = None
+
+    def remove(self, key: Hashable) -> None:
+        frequency = self._frequency.pop(key, None)
+        if frequency is None:
+            return
+        bucket = self._buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[frequency]
+            if self._min_frequency == frequency:
+                self._min_frequency = min(self._buckets, default=0)
+
+    def victim(self) -> Hashable:
+        return next(iter(self._buckets[self._min_frequency]))
+
+    def clear(self) -> None:
+        self._frequency.clear()
+        self._buckets.clear()
+        self._min_frequency = 0
+
+
+POLICIES: Dict[str, Callable[[], EvictionPolicy]] = {
+    "lru": LRUPolicy,
+    "lfu": LFUPolicy,
+}
+
+
+def deep_sizeof(value: Any, _seen: set[int] | None = None) -> int:
+    """Approximate resident bytes of ``value`` including nested containers and object fields."""
+
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += deep_sizeof(vars(value), seen)
+    return size
+
+
+@dataclass
+class _Entry(Generic[V]):
+    value: V
+    expires_at: float | None
+    size: int = 0
+
+
+class BoundedCache(Generic[K, V]):
+    """Thread-safe cache capped at ``maxsize`` entries with optional per-entry TTL.
+
+    Misses return None so callers can fall through to a slower tier (disk, Redis, Supabase).
+    ``sizeof`` measures each value once on insert so ``metrics()`` can report resident bytes.
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int,
+        policy: str = "lru",
+        ttl_seconds: float | None = None,
+        sizeof: Callable[[Any], int] = deep_sizeof,
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown cache policy {policy!r}; expected one of {sorted(POLICIES)}")
+        self.maxsize = maxsize
+        self.policy_name = policy
+        self.ttl_seconds = ttl_seconds
+        self._policy = POLICIES[policy]()
+        self.sizeof = sizeof
+        self._entries: Dict[K, _Entry[V]] = {}
+        self._bytes = 0
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._discard_locked(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._policy.touch(key)
+            self._hits += 1
+            return entry.value
+
+    def peek(self, key: K) -> Optional[V]:
+        """Like :meth:`get` but without counting a hit or miss or refreshing the entry's rank."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry.expires_at is not None and entry.expires_at <= time.monotonic()):
+                return None
+            return entry.value
+
+    def set(self, key: K, value: V) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        entry = _Entry(value, expires_at, self.sizeof(value))
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None:
+                self._bytes += entry.size - previous.size
+                self._entries[key] = entry
+                self._policy.touch(key)
+                return
+            while len(self._entries) >= self.maxsize:
+                self._discard_locked(self._policy.victim())
+                self._evictions += 1
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self._policy.insert(key)
+
+    __setitem__ = set
+
+    def pop(self, key: K) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._discard_locked(key)
+            return entry.value
+
+    def _discard_locked(self, key: K) -> None:
+        self._bytes -= self._entries.pop(key).size
+        self._policy.remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._policy.clear()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "policy": self.policy_name,
+            "maxSize": self.maxsize,
+            "size": len(self._entries),
+            "residentBytes": self._bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hitRatio": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+        }
@@ -0,0 +1,105 @@
+"""Write-behind persistence for the Supabase metadata cache."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Generic, TypeVar
+
+LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class WriteBehindPersister(Generic[T]):
+    """Coalesces cache mutations and writes them from a background task.
+
+    ``collect`` runs on the event loop and must be cheap (e.g. copy references under a lock);
+    ``write`` runs in a worker thread and owns all file I/O. A flush happens every
+    ``interval_seconds`` when something is dirty, or immediately once ``batch_size`` changes
+    have accumulated.
+    """
+
+    collect: Callable[[], T]
+    write: Callable[[T], None]
+    interval_seconds: float = 1.0
+    batch_size: int = 100
+    _dirty: int = field(default=0, init=False, repr=False)
+    _task: asyncio.Task[None] | None = field(default=None, init=False, repr=False)
+    _wake: asyncio.Event | None = field(default=None, init=False, repr=False)
+    _loop: asyncio.AbstractEventLoop | None = field(default=None, init=False, repr=False)
+    _flush_lock: asyncio.Lock | None = field(default=None, init=False, repr=False)
+    _flushes_total: int = field(default=0, init=False, repr=False)
+    _failures_total: int = field(default=0, init=False, repr=False)
+    _last_flush_seconds: float = field(default=0.0, init=False, repr=False)
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def mark_dirty(self, count: int = 1) -> None:
+        self._dirty += count
+        if self._dirty >= self.batch_size and self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def start(self) -> None:
+        if self.is_running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        """Stop the background task and flush whatever is still pending."""
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        self._loop = None
+        self._wake = None
+
+    async def flush(self) -> None:
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            pending = self._dirty
+            if pending == 0:
+                return
+            self._dirty = 0
+            snapshot = self.collect()
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(self.write, snapshot)
+            except Exception as exc:  # pragma: no cover - defensive logging
+                self._dirty += pending
+                self._failures_total += 1
+                LOGGER.warning("Write-behind flush failed; will retry: %s", exc)
+                return
+            self._flushes_total += 1
+            self._last_flush_seconds = time.perf_counter() - started
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "dirty": self._dirty,
+            "flushesTotal": self._flushes_total,
+            "failuresTotal": self._failures_total,
+            "lastFlushSeconds": round(self._last_flush_seconds, 6),
+        }
@@ -0,0 +1,155 @@
+"""In-process metadata tier behind :class:`~blockbuilders_api.services.supabase.SupabaseService`."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from pydantic import ValidationError
+
+from blockbuilders_shared import AppMetadata
+
+from ..core.config import settings
+from ..repositories.metadata_log import MetadataLogStore
+from .metadata_cache import BoundedCache
+from .metadata_persister import WriteBehindPersister
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LocalMetadataTier:
+    """Bounded cache in front of the on-disk metadata log.
+
+    Writes that differ from the known value are held in ``_pending`` until the write-behind
+    persister appends them, or appended inline when no persister is running. Lookups fall
+    through from the cache to unflushed writes and then to the log, so evicted entries come back.
+    """
+
+    def __init__(self, cache: BoundedCache[str, AppMetadata]) -> None:
+        self.cache = cache
+        self.store: MetadataLogStore | None = None
+        self._pending: Dict[str, AppMetadata] = {}
+        self._persister: WriteBehindPersister[Dict[str, AppMetadata]] | None = None
+        self._loaded = False
+        self._lock = Lock()
+
+    def reset(self) -> None:
+        """Forget everything held in memory; the next lookup reloads the log from ``settings``."""
+
+        with self._lock:
+            self.cache.clear()
+            self._pending.clear()
+            self._loaded = False
+
+    def _ensure_loaded(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+
+            self.store = None
+            cache_path = settings.supabase_metadata_cache_path
+            if cache_path:
+                store = MetadataLogStore(cache_path, compact_min_records=settings.supabase_metadata_compact_min_records)
+                try:
+                    store.load()
+                except OSError as exc:  # pragma: no cover - defensive logging
+                    LOGGER.warning("Failed to load Supabase metadata cache from %s: %s", cache_path, exc)
+                self.store = store
+            self._loaded = True
+
+    def _load_from_store_locked(self, user_id: str) -> Optional[AppMetadata]:
+        if self.store is None:
+            return None
+
+        payload = self.store.get(user_id)
+        if payload is None:
+            return None
+        try:
+            return AppMetadata.model_validate(payload)
+        except ValidationError:
+            LOGGER.warning("Ignoring invalid cached Supabase metadata for %s", user_id)
+            return None
+
+    def _drain_pending(self) -> Dict[str, AppMetadata]:
+        with self._lock:
+            changes, self._pending = self._pending, {}
+            return changes
+
+    def _append(self, changes: Dict[str, AppMetadata]) -> None:
+        store = self.store
+        if store is None or not changes:
+            return
+
+        try:
+            store.append(
+                (user_id, metadata.model_dump(by_alias=True, mode="json")) for user_id, metadata in changes.items()
+            )
+        except Exception:
+            with self._lock:
+                for user_id, metadata in changes.items():
+                    self._pending.setdefault(user_id, metadata)
+            raise
+
+    async def start(self) -> WriteBehindPersister[Dict[str, AppMetadata]]:
+        """Load the log off the event loop and start write-behind persistence."""
+
+        await asyncio.to_thread(self._ensure_loaded)
+        if self._persister is None or not self._persister.is_running:
+            self._persister = WriteBehindPersister(
+                collect=self._drain_pending,
+                write=self._append,
+                interval_seconds=settings.supabase_metadata_flush_interval_seconds,
+                batch_size=settings.supabase_metadata_flush_batch_size,
+            )
+            await self._persister.start()
+        return self._persister
+
+    async def aclose(self) -> None:
+        if self._persister is not None:
+            await self._persister.aclose()
+            self._persister = None
+
+    def get(self, user_id: str) -> Optional[AppMetadata]:
+        self._ensure_loaded()
+        with self._lock:
+            metadata = self.cache.get(user_id)
+            if metadata is None:
+                # Evicted or never loaded: fall through to unflushed writes, then the on-disk log.
+                metadata = self._pending.get(user_id) or self._load_from_store_locked(user_id)
+                if metadata is not None:
+                    self.cache[user_id] = metadata
+            return metadata
+
+    def put(self, user_id: str, metadata: AppMetadata) -> None:
+        self._ensure_loaded()
+        persister = self._persister
+        with self._lock:
+            # peek() keeps the write path out of the hit/miss counters.
+            current = self.cache.peek(user_id) or self._pending.get(user_id) or self._load_from_store_locked(user_id)
+            self.cache[user_id] = metadata
+            if current == metadata:
+                return
+            self._pending[user_id] = metadata
+            if persister is not None and persister.is_running:
+                persister.mark_dirty()
+                return
+
+        try:
+            self._append(self._drain_pending())
+        except OSError as exc:  # pragma: no cover - defensive logging
+            LOGGER.warning(
+                "Failed to persist Supabase metadata cache to %s: %s", settings.supabase_metadata_cache_path, exc
+            )
+
+    def cache_metrics(self) -> Dict[str, Any]:
+        return self.cache.metrics()
+
+    def persister_metrics(self) -> Dict[str, Any]:
+        metrics: Dict[str, Any] = {}
+        if self._persister is not None:
+            metrics.update(self._persister.metrics())
+        if self.store is not None:
+            metrics.update(self.store.metrics())
+        return metrics
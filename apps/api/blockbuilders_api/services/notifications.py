@@ -3,27 +3,61 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Callable, Dict, List
 
 from blockbuilders_shared import AuditLogEvent
 
+from ..core.ring_buffer import RingBuffer, RingPage
+
+
+@dataclass(frozen=True, slots=True)
+class _Notification:
+    channel: str
+    event_id: str
+    event_type: str
+    actor_id: str
+
+    def as_dict(self) -> Dict[str, str]:
+        return {
+            "channel": self.channel,
+            "eventId": self.event_id,
+            "eventType": self.event_type,
+            "actorId": self.actor_id,
+        }
+
 
 @dataclass
 class NotificationService:
-    """Collects audit notifications that would normally be dispatched to admins."""
+    """Collects audit notifications that would normally be dispatched to admins.
+
+    Only the latest ``history_capacity`` notifications are kept in memory.
+    """
 
     channel: str = "audit-alerts"
-    _messages: List[Dict[str, str]] = field(default_factory=list)
+    history_capacity: int = 1_000
+    on_evict: Callable[[Dict[str, str]], None] | None = None
+    _messages: RingBuffer[_Notification] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        on_evict = self.on_evict
+        self._messages = RingBuffer(
+            self.history_capacity,
+            on_evict=(lambda message: on_evict(message.as_dict())) if on_evict else None,
+        )
 
     def publish(self, event: AuditLogEvent) -> Dict[str, str]:
-        message = {
-            "channel": self.channel,
-            "eventId": event.id,
-            "eventType": event.event_type.value,
-            "actorId": event.actor_id,
-        }
+        message = _Notification(
+            channel=self.channel,
+            event_id=event.id,
+            event_type=event.event_type.value,
+            actor_id=event.actor_id,
+        )
         self._messages.append(message)
-        return message
+        return message.as_dict()
 
     def history(self) -> List[Dict[str, str]]:
-        return list(self._messages)
+        return [message.as_dict() for message in self._messages]
+
+    def page(self, cursor: int | None = None, limit: int = 100) -> RingPage[Dict[str, str]]:
+        page = self._messages.page(cursor, limit)
+        return RingPage(items=[message.as_dict() for message in page.items], next_cursor=page.next_cursor)
@@ -2,14 +2,22 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from typing import Any, Dict
 
 from fastapi import HTTPException, status
 
-from blockbuilders_shared import PlanUsage, PlanUsageMetric
+from blockbuilders_shared import PlanUsage, PlanUsageMetric, PlanUsageSummary
 
+from ..core.config import settings
 from ..repositories import PlanUsageRepository
+from ..repositories.plan_usage_redis import RedisPlanUsageRepository, connect_redis_plan_usage_repository
+from ..repositories.quota_windows import build_quota_windows
+
+LOGGER = logging.getLogger(__name__)
 
 
 class QuotaExceededError(Exception):
@@ -21,15 +29,80 @@ class QuotaExceededError(Exception):
         super().__init__(f"Quota exceeded for metric {metric.value}; limit {limit}")
 
 
+def _default_repository() -> PlanUsageRepository:
+    windows = build_quota_windows(settings.plan_usage_windows, sliding_buckets=settings.plan_usage_sliding_buckets)
+    return PlanUsageRepository(windows=windows)
+
+
 @dataclass
 class PlanUsageService:
     """Service coordinating quota checks and updates."""
 
-    repo: PlanUsageRepository = field(default_factory=PlanUsageRepository)
+    repo: PlanUsageRepository | RedisPlanUsageRepository = field(default_factory=_default_repository)
+    _local_repo: PlanUsageRepository | None = field(default=None, init=False, repr=False)
+    _sweeper: asyncio.Task[None] | None = field(default=None, init=False, repr=False)
+
+    async def start(self) -> None:
+        """Called from the lifespan: connect Redis or start sweeping expired in-memory windows."""
+
+        if settings.plan_usage_backend == "redis":
+            await self._connect_redis()
+        elif settings.plan_usage_sweep_interval_seconds > 0 and self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_forever(settings.plan_usage_sweep_interval_seconds))
+
+    async def _sweep_forever(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            if not isinstance(self.repo, PlanUsageRepository):
+                continue
+            try:
+                # Each call is capped; keep slicing through a backlog while keys are still being evicted.
+                while self.repo.sweep() > 0:
+                    await asyncio.sleep(0)
+            except Exception as exc:  # pragma: no cover - defensive logging
+                LOGGER.warning("Plan usage sweep failed: %s", exc)
+
+    async def _connect_redis(self) -> None:
+        if isinstance(self.repo, RedisPlanUsageRepository):
+            return
+        if not settings.redis_url:
+            raise RuntimeError("PLAN_USAGE_BACKEND=redis requires REDIS_URL")
+        if any(kind != "fixed" for kind in settings.plan_usage_windows.values()):
+            raise RuntimeError("PLAN_USAGE_WINDOWS sliding/token_bucket engines require PLAN_USAGE_BACKEND=memory")
+        assert isinstance(self.repo, PlanUsageRepository)
+        self._local_repo = self.repo
+        self.repo = await connect_redis_plan_usage_repository(
+            settings.redis_url,
+            read_cache_ttl_seconds=settings.plan_usage_read_cache_ttl_seconds,
+        )
+
+    async def aclose(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        if isinstance(self.repo, RedisPlanUsageRepository) and self._local_repo is not None:
+            await self.repo.aclose()
+            self.repo = self._local_repo
+            self._local_repo = None
+
+    def metrics(self) -> Dict[str, Any]:
+        if isinstance(self.repo, RedisPlanUsageRepository):
+            return {"backend": "redis", **self.repo.metrics()}
+        return {"backend": "memory", **self.repo.metrics()}
 
     async def get_usage(self, *, user_id: str, metric: PlanUsageMetric) -> PlanUsage:
         return await self.repo.get_active_window(user_id=user_id, metric=metric)
 
+    async def get_summary(self, *, user_id: str) -> PlanUsageSummary:
+        """Every metric for ``user_id`` in one repository round-trip."""
+
+        usages = await self.repo.get_active_windows(user_id=user_id, metrics=list(PlanUsageMetric))
+        return PlanUsageSummary(usages=usages)
+
     async def assert_within_quota(
         self,
         *,
@@ -37,16 +110,15 @@ class PlanUsageService:
         metric: PlanUsageMetric,
         amount: int = 1,
     ) -> PlanUsage:
-        usage = await self.repo.get_active_window(user_id=user_id, metric=metric)
-        if usage.used + amount > usage.limit:
-            raise QuotaExceededError(metric=metric, limit=usage.limit)
-
-        return await self.repo.increment(
+        allowed, usage = await self.repo.try_increment(
             user_id=user_id,
             metric=metric,
             amount=amount,
             at=datetime.now(timezone.utc),
         )
+        if not allowed:
+            raise QuotaExceededError(metric=metric, limit=usage.limit)
+        return usage
 
 
 _plan_usage_service = PlanUsageService()
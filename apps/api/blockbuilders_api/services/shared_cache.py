@@ -0,0 +1,305 @@
+"""Redis-backed L2 cache shared by every API replica for Supabase sessions and metadata."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from blockbuilders_shared import AppMetadata
+
+from ..core.config import settings
+from ..models.auth import AuthenticatedUser
+
+LOGGER = logging.getLogger(__name__)
+
+_COMPACT_PREFIX = b"c1|"
+_JSON_PREFIX = b"j1|"
+# The compact layout only covers the simulation consent; fall back to JSON if AppMetadata grows.
+_COMPACT_SUPPORTED = set(AppMetadata.model_fields) == {"consents"}
+
+
+def encode_metadata(metadata: AppMetadata) -> bytes:
+    """Serialize metadata as ``c1|<acknowledged>|<acknowledgedAt>`` instead of a full JSON document."""
+
+    if not _COMPACT_SUPPORTED:
+        return _JSON_PREFIX + metadata.model_dump_json(by_alias=True).encode("utf-8")
+
+    consent = metadata.consents.simulation_only
+    acknowledged_at = consent.acknowledged_at.isoformat() if consent.acknowledged_at else ""
+    return b"%s%d|%s" % (_COMPACT_PREFIX, consent.acknowledged, acknowledged_at.encode("ascii"))
+
+
+@lru_cache(maxsize=4096)
+def decode_metadata(raw: bytes) -> AppMetadata:
+    """Inverse of :func:`encode_metadata`. Memoized because most users share a handful of values.
+
+    Callers treat ``AppMetadata`` as immutable, so handing out the same instance is safe.
+    """
+
+    if raw.startswith(_JSON_PREFIX):
+        return AppMetadata.model_validate_json(raw[len(_JSON_PREFIX) :])
+    if not raw.startswith(_COMPACT_PREFIX):
+        raise ValueError("Unrecognised metadata encoding")
+
+    acknowledged, _, acknowledged_at = raw[len(_COMPACT_PREFIX) :].partition(b"|")
+    return AppMetadata.model_validate(
+        {
+            "consents": {
+                "simulationOnly": {
+                    "acknowledged": acknowledged == b"1",
+                    "acknowledgedAt": datetime.fromisoformat(acknowledged_at.decode("ascii")) if acknowledged_at else None,
+                }
+            }
+        }
+    )
+
+
+@dataclass(frozen=True)
+class SharedSession:
+    user_id: str
+    email: str
+
+
+InvalidationHandler = Callable[[str, AppMetadata], None]
+
+
+@dataclass
+class RedisMetadataCache:
+    """L2 tier behind the in-process caches.
+
+    Sessions are keyed by token fingerprint and expire with the token (capped by
+    ``session_ttl_seconds``). Metadata writes are published on ``channel`` so other
+    replicas can replace their in-process copy without a Supabase round-trip.
+    """
+
+    client: Any
+    namespace: str = "bb:supabase"
+    session_ttl_seconds: int = 300
+    metadata_ttl_seconds: int = 86_400
+    _listener: asyncio.Task[None] | None = field(default=None, init=False, repr=False)
+    _hits: int = field(default=0, init=False, repr=False)
+    _misses: int = field(default=0, init=False, repr=False)
+    _invalidations_received: int = field(default=0, init=False, repr=False)
+
+    @property
+    def channel(self) -> str:
+        return f"{self.namespace}:metadata-invalidate"
+
+    def _session_key(self, fingerprint: str) -> str:
+        return f"{self.namespace}:session:{fingerprint}"
+
+    def _metadata_key(self, user_id: str) -> str:
+        return f"{self.namespace}:metadata:{user_id}"
+
+    async def get_session_and_metadata(
+        self,
+        *,
+        fingerprint: str,
+        user_id: str,
+    ) -> Tuple[Optional[SharedSession], Optional[AppMetadata]]:
+        """Fetch the cached session and the user's metadata in one pipelined round-trip."""
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.get(self._session_key(fingerprint))
+            pipe.get(self._metadata_key(user_id))
+            raw_session, raw_metadata = await pipe.execute()
+
+        session: Optional[SharedSession] = None
+        if raw_session:
+            session_user_id, _, email = bytes(raw_session).decode("utf-8").partition("\t")
+            session = SharedSession(user_id=session_user_id, email=email)
+
+        metadata: Optional[AppMetadata] = None
+        if raw_metadata:
+            try:
+                metadata = decode_metadata(bytes(raw_metadata))
+            except ValueError:
+                LOGGER.warning("Ignoring undecodable shared metadata for %s", user_id)
+
+        if session is not None:
+            self._hits += 1
+        else:
+            self._misses += 1
+        return session, metadata
+
+    async def put_session(
+        self,
+        *,
+        fingerprint: str,
+        user_id: str,
+        email: str,
+        metadata: AppMetadata,
+        expires_at: float | None,
+    ) -> None:
+        ttl = self.session_ttl_seconds
+        if expires_at is not None:
+            ttl = min(ttl, int(expires_at - time.time()))
+        if ttl <= 0:
+            return
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(self._session_key(fingerprint), f"{user_id}\t{email}".encode("utf-8"), ex=ttl)
+            pipe.set(self._metadata_key(user_id), encode_metadata(metadata), ex=self.metadata_ttl_seconds)
+            await pipe.execute()
+
+    async def publish_metadata(self, *, user_id: str, metadata: AppMetadata) -> None:
+        """Store the new metadata and tell every replica to replace its local copy."""
+
+        encoded = encode_metadata(metadata)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(self._metadata_key(user_id), encoded, ex=self.metadata_ttl_seconds)
+            pipe.publish(self.channel, user_id.encode("utf-8") + b"\t" + encoded)
+            await pipe.execute()
+
+    async def start(self, on_invalidate: InvalidationHandler) -> None:
+        if self._listener is not None and not self._listener.done():
+            return
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.channel)
+        self._listener = asyncio.create_task(self._listen(pubsub, on_invalidate))
+
+    async def _listen(self, pubsub: Any, on_invalidate: InvalidationHandler) -> None:
+        try:
+            while True:
+                try:
+                    message = await pubsub.get_message(timeout=1.0)
+                except Exception as exc:  # pragma: no cover - defensive logging
+                    LOGGER.warning("Shared metadata subscription interrupted, retrying: %s", exc)
+                    await asyncio.sleep(1.0)
+                    continue
+                if not message or message.get("type") != "message":
+                    continue
+                user_id, _, encoded = bytes(message["data"]).partition(b"\t")
+                try:
+                    on_invalidate(user_id.decode("utf-8"), decode_metadata(encoded))
+                except Exception as exc:  # pragma: no cover - defensive logging
+                    LOGGER.warning("Failed to apply shared metadata invalidation: %s", exc)
+                    continue
+                self._invalidations_received += 1
+        finally:
+            await pubsub.aclose()
+
+    async def aclose(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self.client.aclose()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "sessionHits": self._hits,
+            "sessionMisses": self._misses,
+            "invalidationsReceived": self._invalidations_received,
+        }
+
+
+async def connect_redis_metadata_cache(
+    url: str,
+    *,
+    session_ttl_seconds: int,
+    metadata_ttl_seconds: int,
+    on_invalidate: InvalidationHandler,
+    client_factory: Callable[[str], Any] | None = None,
+) -> RedisMetadataCache:
+    """Create the shared cache from a Redis URL. ``redis`` is an optional dependency."""
+
+    if client_factory is None:
+        try:
+            from redis.asyncio import Redis
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("REDIS_URL is set but the 'redis' package is not installed") from exc
+        client_factory = Redis.from_url
+
+    cache = RedisMetadataCache(
+        client=client_factory(url),
+        session_ttl_seconds=session_ttl_seconds,
+        metadata_ttl_seconds=metadata_ttl_seconds,
+    )
+    await cache.start(on_invalidate)
+    return cache
+
+
+class SharedMetadataTier:
+    """Redis L2 tier: sessions validated by one replica and metadata writes seen by all.
+
+    Every call is a no-op until :meth:`start` connects ``cache``, and Redis failures are logged
+    rather than raised so the caller falls back to Supabase. Invalidations published by other
+    replicas are handed to ``on_invalidate``.
+    """
+
+    def __init__(self, on_invalidate: InvalidationHandler) -> None:
+        self.on_invalidate = on_invalidate
+        self.cache: RedisMetadataCache | None = None
+
+    async def start(self) -> RedisMetadataCache | None:
+        """Connect when REDIS_URL is configured."""
+
+        if not settings.redis_url:
+            return None
+        if self.cache is None:
+            self.cache = await connect_redis_metadata_cache(
+                settings.redis_url,
+                session_ttl_seconds=settings.redis_session_ttl_seconds,
+                metadata_ttl_seconds=settings.redis_metadata_ttl_seconds,
+                on_invalidate=self.on_invalidate,
+            )
+        return self.cache
+
+    async def aclose(self) -> None:
+        if self.cache is not None:
+            await self.cache.aclose()
+            self.cache = None
+
+    def metrics(self) -> Dict[str, Any]:
+        if self.cache is None:
+            return {}
+        return self.cache.metrics()
+
+    async def lookup(self, fingerprint: str, user_id: str) -> Tuple[Optional[SharedSession], Optional[AppMetadata]]:
+        """Return the session another replica validated for ``user_id``, with its shared metadata."""
+
+        if self.cache is None:
+            return None, None
+
+        try:
+            session, metadata = await self.cache.get_session_and_metadata(fingerprint=fingerprint, user_id=user_id)
+        except Exception as exc:  # pragma: no cover - defensive logging
+            LOGGER.warning("Shared Supabase cache lookup failed: %s", exc)
+            return None, None
+
+        if session is None or session.user_id != user_id:
+            return None, None
+        return session, metadata
+
+    async def share_session(self, fingerprint: str, user: AuthenticatedUser, *, expires_at: float | None) -> None:
+        if self.cache is None:
+            return
+
+        try:
+            await self.cache.put_session(
+                fingerprint=fingerprint,
+                user_id=user.id,
+                email=user.email,
+                metadata=user.metadata,
+                expires_at=expires_at,
+            )
+        except Exception as exc:  # pragma: no cover - defensive logging
+            LOGGER.warning("Failed to share Supabase session across replicas: %s", exc)
+
+    async def publish(self, user_id: str, metadata: AppMetadata) -> None:
+        if self.cache is None:
+            return
+
+        try:
+            await self.cache.publish_metadata(user_id=user_id, metadata=metadata)
+        except Exception as exc:  # pragma: no cover - defensive logging
+            LOGGER.warning("Failed to publish consent to other replicas: %s", exc)
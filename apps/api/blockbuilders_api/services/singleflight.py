@@ -0,0 +1,62 @@
+"""In-flight request de-duplication for concurrent callers sharing a key."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call(Generic[T]):
+    task: "asyncio.Future[T]"
+    waiters: int = 0
+    abandoned: bool = False
+
+
+class SingleFlight:
+    """Run at most one upstream call per key; concurrent callers await the same result.
+
+    Errors propagate to every waiter. A caller that is cancelled only stops waiting; the shared
+    call is cancelled once its last waiter has gone away.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, _Call[Any]] = {}
+        self.executed_total = 0
+        self.coalesced_total = 0
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None or call.abandoned:
+            call = _Call(task=asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.executed_total += 1
+        else:
+            self.coalesced_total += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.abandoned = True
+                call.task.cancel()
+
+    def _forget(self, key: str, call: _Call[Any]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled():
+            # Mark the outcome as retrieved even when every waiter gave up before it finished.
+            call.task.exception()
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "inFlight": len(self._calls),
+            "executedTotal": self.executed_total,
+            "coalescedTotal": self.coalesced_total,
+        }
@@ -6,8 +6,6 @@ import base64
 import json
 import logging
 from datetime import datetime, timezone
-from pathlib import Path
-from threading import Lock
 from typing import Any, Dict, Optional, Tuple
 
 import httpx
@@ -18,6 +16,20 @@ from blockbuilders_shared import AppMetadata, SimulationConsent
 
 from ..core.config import settings
 from ..models.auth import AuthenticatedUser
+from .http_pool import HttpClientPool
+from .metadata_cache import BoundedCache
+from .metadata_persister import WriteBehindPersister
+from .metadata_tiers import LocalMetadataTier
+from .shared_cache import RedisMetadataCache, SharedMetadataTier
+from .singleflight import SingleFlight
+from .token_cache import (
+    TokenVerificationError,
+    UnsupportedTokenAlgorithmError,
+    VerifiedToken,
+    VerifiedTokenCache,
+    token_fingerprint,
+    verify_supabase_jwt,
+)
 
 USER_ENDPOINT = "/auth/v1/user"
 ADMIN_UPDATE_ENDPOINT = "/auth/v1/admin/users/{user_id}"
@@ -48,62 +60,83 @@ def _metadata_with_consent(metadata: AppMetadata, consent: SimulationConsent) ->
 class SupabaseService:
     """Wrapper around Supabase Auth REST endpoints with local fallbacks for offline development."""
 
-    _metadata_cache: Dict[str, AppMetadata] = {}
-    _cache_loaded: bool = False
-    _cache_lock: Lock = Lock()
+    _http_pool: HttpClientPool | None = None
+    _token_cache: VerifiedTokenCache = VerifiedTokenCache(maxsize=settings.supabase_token_cache_size)
+    _user_lookups: SingleFlight = SingleFlight()
+    _local_metadata: LocalMetadataTier = LocalMetadataTier(
+        BoundedCache(
+            maxsize=settings.supabase_metadata_cache_max_entries,
+            policy=settings.supabase_metadata_cache_policy,
+            ttl_seconds=settings.supabase_metadata_cache_ttl_seconds,
+        )
+    )
+    # Metadata published by other replicas replaces the local copy.
+    _shared_metadata: SharedMetadataTier = SharedMetadataTier(on_invalidate=_local_metadata.put)
 
     @classmethod
-    def _cache_path(cls) -> Path | None:
-        return settings.supabase_metadata_cache_path
+    async def open_http_pool(cls, *, transport: httpx.AsyncBaseTransport | None = None) -> HttpClientPool:
+        """Open the shared Supabase connection pool. Called from the application lifespan."""
+
+        if cls._http_pool is None or not cls._http_pool.is_open:
+            cls._http_pool = HttpClientPool(
+                base_url=str(settings.supabase_url),
+                timeout=cls._build_timeout(),
+                max_connections=settings.supabase_http_max_connections,
+                max_keepalive_connections=settings.supabase_http_max_keepalive_connections,
+                keepalive_expiry=settings.supabase_http_keepalive_expiry_seconds,
+                http2=settings.supabase_http2_enabled,
+                transport=transport,
+            )
+            await cls._http_pool.start()
+        return cls._http_pool
 
     @classmethod
-    def _ensure_cache_loaded(cls) -> None:
-        with cls._cache_lock:
-            if cls._cache_loaded:
-                return
-
-            cache_path = cls._cache_path()
-            if cache_path and cache_path.exists():
-                try:
-                    payload = json.loads(cache_path.read_text(encoding="utf-8"))
-                except (OSError, json.JSONDecodeError) as exc:  # pragma: no cover - defensive logging
-                    LOGGER.warning("Failed to load Supabase metadata cache from %s: %s", cache_path, exc)
-                else:
-                    for user_id, metadata_payload in payload.items():
-                        try:
-                            cls._metadata_cache[user_id] = AppMetadata.model_validate(metadata_payload)
-                        except ValidationError:
-                            LOGGER.warning("Ignoring invalid cached Supabase metadata for %s", user_id)
-            cls._cache_loaded = True
+    async def close_http_pool(cls) -> None:
+        if cls._http_pool is not None:
+            await cls._http_pool.aclose()
+            cls._http_pool = None
 
     @classmethod
-    def _persist_cache_locked(cls) -> None:
-        cache_path = cls._cache_path()
-        if not cache_path:
-            return
+    def http_pool_metrics(cls) -> Dict[str, Any]:
+        if cls._http_pool is None:
+            return {}
+        return cls._http_pool.metrics()
 
-        try:
-            cache_path.parent.mkdir(parents=True, exist_ok=True)
-            serializable = {
-                user_id: metadata.model_dump(by_alias=True, mode="json")
-                for user_id, metadata in cls._metadata_cache.items()
-            }
-            cache_path.write_text(json.dumps(serializable, indent=2), encoding="utf-8")
-        except OSError as exc:  # pragma: no cover - defensive logging
-            LOGGER.warning("Failed to persist Supabase metadata cache to %s: %s", cache_path, exc)
+    @classmethod
+    def user_lookup_metrics(cls) -> Dict[str, int]:
+        return cls._user_lookups.metrics()
+
+    @classmethod
+    async def start_metadata_persister(cls) -> WriteBehindPersister[Dict[str, AppMetadata]]:
+        """Load the metadata log and start write-behind persistence. Called from the lifespan."""
+
+        return await cls._local_metadata.start()
+
+    @classmethod
+    async def stop_metadata_persister(cls) -> None:
+        await cls._local_metadata.aclose()
+
+    @classmethod
+    def metadata_cache_metrics(cls) -> Dict[str, Any]:
+        return cls._local_metadata.cache_metrics()
+
+    @classmethod
+    def metadata_persister_metrics(cls) -> Dict[str, Any]:
+        return cls._local_metadata.persister_metrics()
 
     @classmethod
-    def _cache_metadata(cls, user_id: str, metadata: AppMetadata) -> None:
-        cls._ensure_cache_loaded()
-        with cls._cache_lock:
-            cls._metadata_cache[user_id] = metadata
-            cls._persist_cache_locked()
+    async def start_shared_cache(cls) -> RedisMetadataCache | None:
+        """Connect the Redis L2 tier when REDIS_URL is configured. Called from the lifespan."""
+
+        return await cls._shared_metadata.start()
+
+    @classmethod
+    async def stop_shared_cache(cls) -> None:
+        await cls._shared_metadata.aclose()
 
     @classmethod
-    def _get_cached_metadata(cls, user_id: str) -> Optional[AppMetadata]:
-        cls._ensure_cache_loaded()
-        with cls._cache_lock:
-            return cls._metadata_cache.get(user_id)
+    def shared_cache_metrics(cls) -> Dict[str, Any]:
+        return cls._shared_metadata.metrics()
 
     @staticmethod
     def _should_bypass_remote_lookup() -> bool:
@@ -162,6 +195,11 @@ class SupabaseService:
     async def _perform_user_request(self, access_token: str, timeout: httpx.Timeout) -> httpx.Response:
         """Execute the Supabase user endpoint request."""
 
+        pool = self._http_pool
+        if pool is not None and pool.is_open:
+            async with pool.client() as client:
+                return await client.get(USER_ENDPOINT, headers=self._user_headers(access_token), timeout=timeout)
+
         async with httpx.AsyncClient(base_url=str(settings.supabase_url), timeout=timeout) as client:
             return await client.get(USER_ENDPOINT, headers=self._user_headers(access_token))
 
@@ -174,18 +212,66 @@ class SupabaseService:
             metadata = AppMetadata.model_validate(_empty_metadata())
 
         user = AuthenticatedUser(id=payload["id"], email=payload["email"], metadata=metadata)
-        self._cache_metadata(user.id, metadata)
+        self._local_metadata.put(user.id, metadata)
+        return user
+
+    def _user_from_verified_token(self, access_token: str) -> Optional[AuthenticatedUser]:
+        """Resolve the user from a locally verified JWT, reusing cached verifications until ``exp``.
+
+        Returns None when the token uses an algorithm that must be checked by Supabase.
+        """
+
+        fingerprint = token_fingerprint(access_token)
+        entry = self._token_cache.get(fingerprint)
+        if entry is not None:
+            metadata = self._local_metadata.get(entry.user_id) or entry.metadata
+            return AuthenticatedUser(id=entry.user_id, email=entry.email, metadata=metadata)
+
+        try:
+            claims = verify_supabase_jwt(
+                access_token,
+                secret=settings.supabase_jwt_secret,
+                audience=settings.supabase_api_audience,
+            )
+        except UnsupportedTokenAlgorithmError:
+            return None
+        except TokenVerificationError as exc:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Supabase token") from exc
+
+        user = self._user_from_decoded(*self._claims_fields(claims))
+        if user is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Supabase token")
+
+        self._token_cache.put(
+            fingerprint,
+            VerifiedToken(user_id=user.id, email=user.email, metadata=user.metadata, expires_at=float(claims["exp"])),
+        )
         return user
 
     async def fetch_user(self, access_token: str) -> AuthenticatedUser:
+        if settings.supabase_jwt_local_verification:
+            verified_user = self._user_from_verified_token(access_token)
+            if verified_user is not None:
+                return verified_user
+
         fallback_user = self._user_from_token_with_cache(access_token)
         if fallback_user is not None and self._should_bypass_remote_lookup():
             return fallback_user
 
+        fingerprint = token_fingerprint(access_token)
+        if fallback_user is not None:
+            shared_user = await self._user_from_shared_cache(fingerprint, fallback_user)
+            if shared_user is not None:
+                return shared_user
+
         timeout = self._build_timeout()
 
         try:
-            response = await self._perform_user_request(access_token, timeout)
+            # Concurrent requests carrying the same bearer token share a single upstream lookup.
+            response = await self._user_lookups.run(
+                fingerprint,
+                lambda: self._perform_user_request(access_token, timeout),
+            )
         except httpx.HTTPError as exc:
             LOGGER.warning("Supabase fetch_user failed, falling back to JWT payload: %s", exc)
             return self._resolve_fallback_user(fallback_user, access_token, exc)
@@ -199,9 +285,21 @@ class SupabaseService:
             LOGGER.warning("Supabase fetch_user returned error response: %s", exc)
             return self._resolve_fallback_user(fallback_user, access_token, exc)
 
-        return self._hydrate_user(response.json())
+        user = self._hydrate_user(response.json())
+        expires_at = (self._decode_claims(access_token) or {}).get("exp")
+        await self._shared_metadata.share_session(
+            fingerprint,
+            user,
+            expires_at=float(expires_at) if isinstance(expires_at, (int, float)) else None,
+        )
+        return user
 
     async def persist_simulation_consent(self, *, user_id: str) -> AppMetadata:
+        metadata = await self._persist_consent(user_id=user_id)
+        await self._shared_metadata.publish(user_id, metadata)
+        return metadata
+
+    async def _persist_consent(self, *, user_id: str) -> AppMetadata:
         consent = SimulationConsent(acknowledged=True, acknowledged_at=datetime.now(timezone.utc))
         metadata_payload = self._metadata_payload(consent)
 
@@ -224,7 +322,7 @@ class SupabaseService:
 
         payload = response.json() if response.content else metadata_payload
         metadata = AppMetadata.model_validate(payload.get("app_metadata", metadata_payload["app_metadata"]))
-        self._cache_metadata(user_id, metadata)
+        self._local_metadata.put(user_id, metadata)
         return metadata
 
     @staticmethod
@@ -254,6 +352,16 @@ class SupabaseService:
     ) -> httpx.Response:
         """Submit consent updates to the Supabase admin endpoint."""
 
+        pool = self._http_pool
+        if pool is not None and pool.is_open:
+            async with pool.client() as client:
+                return await client.put(
+                    ADMIN_UPDATE_ENDPOINT.format(user_id=user_id),
+                    headers=self._admin_headers(),
+                    json=payload,
+                    timeout=timeout,
+                )
+
         async with httpx.AsyncClient(base_url=str(settings.supabase_url), timeout=timeout) as client:
             return await client.put(
                 ADMIN_UPDATE_ENDPOINT.format(user_id=user_id),
@@ -264,12 +372,26 @@ class SupabaseService:
     def _persist_consent_locally(self, *, user_id: str, consent: SimulationConsent) -> AppMetadata:
         """Fallback path used when Supabase is unreachable. Keeps metadata cached per user."""
 
-        cached = self._get_cached_metadata(user_id)
+        cached = self._local_metadata.get(user_id)
         baseline = cached or AppMetadata.model_validate(_empty_metadata())
         metadata = _metadata_with_consent(baseline, consent)
-        self._cache_metadata(user_id, metadata)
+        self._local_metadata.put(user_id, metadata)
         return metadata
 
+    async def _user_from_shared_cache(
+        self, fingerprint: str, fallback_user: AuthenticatedUser
+    ) -> Optional[AuthenticatedUser]:
+        """Resolve a session another replica already validated with Supabase."""
+
+        session, metadata = await self._shared_metadata.lookup(fingerprint, fallback_user.id)
+        if session is None:
+            return None
+        if metadata is not None:
+            self._local_metadata.put(session.user_id, metadata)
+        else:
+            metadata = fallback_user.metadata
+        return AuthenticatedUser(id=session.user_id, email=session.email, metadata=metadata)
+
     def _user_from_token_with_cache(self, token: str) -> Optional[AuthenticatedUser]:
         """Decode the JWT locally and merge with any cached metadata."""
 
@@ -277,11 +399,20 @@ class SupabaseService:
         if decoded is None:
             return None
 
-        user_id, email, metadata_payload = decoded
+        return self._user_from_decoded(*decoded)
+
+    def _user_from_decoded(
+        self,
+        user_id: Optional[str],
+        email: Optional[str],
+        metadata_payload: Optional[Dict[str, Any]],
+    ) -> Optional[AuthenticatedUser]:
+        """Build a user from JWT claims, preferring cached metadata over the token copy."""
+
         if user_id is None:
             return None
 
-        cached_metadata = self._get_cached_metadata(user_id)
+        cached_metadata = self._local_metadata.get(user_id)
         metadata: Optional[AppMetadata] = None
 
         if metadata_payload:
@@ -294,16 +425,16 @@ class SupabaseService:
             metadata = cached_metadata
         elif metadata is None:
             metadata = AppMetadata.model_validate(_empty_metadata())
-            self._cache_metadata(user_id, metadata)
+            self._local_metadata.put(user_id, metadata)
         else:
-            self._cache_metadata(user_id, metadata)
+            self._local_metadata.put(user_id, metadata)
 
         resolved_email = email or "unknown@blockbuilders.tech"
         return AuthenticatedUser(id=user_id, email=resolved_email, metadata=metadata)
 
     @staticmethod
-    def _decode_access_token(token: str) -> Optional[Tuple[Optional[str], Optional[str], Optional[Dict[str, Any]]]]:
-        """Decode a Supabase JWT without verification. Used strictly as an offline fallback."""
+    def _decode_claims(token: str) -> Optional[Dict[str, Any]]:
+        """Decode JWT claims without verification."""
 
         parts = token.split(".")
         if len(parts) != 3:
@@ -316,6 +447,20 @@ class SupabaseService:
             payload = json.loads(decoded_bytes.decode("utf-8"))
         except (ValueError, json.JSONDecodeError):
             return None
+        return payload if isinstance(payload, dict) else None
+
+    @staticmethod
+    def _decode_access_token(token: str) -> Optional[Tuple[Optional[str], Optional[str], Optional[Dict[str, Any]]]]:
+        """Decode a Supabase JWT without verification. Used strictly as an offline fallback."""
+
+        payload = SupabaseService._decode_claims(token)
+        if payload is None:
+            return None
+        return SupabaseService._claims_fields(payload)
+
+    @staticmethod
+    def _claims_fields(payload: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Optional[Dict[str, Any]]]:
+        """Extract the user id, email, and app metadata from JWT claims."""
 
         user_id = payload.get("sub")
         email = payload.get("email") or payload.get("user_metadata", {}).get("email")
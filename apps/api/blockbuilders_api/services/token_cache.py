@@ -0,0 +1,117 @@
+"""Local Supabase JWT verification with a bounded cache of verified sessions."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from blockbuilders_shared import AppMetadata
+
+
+class TokenVerificationError(Exception):
+    """Raised when a JWT fails signature, audience, or expiry checks."""
+
+
+class UnsupportedTokenAlgorithmError(TokenVerificationError):
+    """Raised when a JWT is signed with an algorithm we cannot verify locally."""
+
+
+def token_fingerprint(token: str) -> str:
+    """Stable digest used to key caches without retaining raw bearer tokens."""
+
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _b64decode(segment: str) -> bytes:
+    padding = "=" * (-len(segment) % 4)
+    return base64.urlsafe_b64decode(segment + padding)
+
+
+def verify_supabase_jwt(token: str, *, secret: str, audience: str, now: float | None = None) -> Dict[str, Any]:
+    """Verify an HS256 Supabase access token and return its claims."""
+
+    parts = token.split(".")
+    if len(parts) != 3:
+        raise TokenVerificationError("Malformed token")
+
+    header_segment, payload_segment, signature_segment = parts
+    try:
+        header = json.loads(_b64decode(header_segment))
+        claims = json.loads(_b64decode(payload_segment))
+        signature = _b64decode(signature_segment)
+    except (ValueError, json.JSONDecodeError) as exc:
+        raise TokenVerificationError("Malformed token") from exc
+
+    if not isinstance(header, dict) or not isinstance(claims, dict):
+        raise TokenVerificationError("Malformed token")
+
+    if header.get("alg") != "HS256":
+        raise UnsupportedTokenAlgorithmError(f"Unsupported algorithm {header.get('alg')!r}")
+
+    expected = hmac.new(secret.encode("utf-8"), f"{header_segment}.{payload_segment}".encode("ascii"), hashlib.sha256)
+    if not hmac.compare_digest(expected.digest(), signature):
+        raise TokenVerificationError("Invalid signature")
+
+    token_audience = claims.get("aud")
+    audiences = token_audience if isinstance(token_audience, list) else [token_audience]
+    if audience not in audiences:
+        raise TokenVerificationError("Invalid audience")
+
+    expires_at = claims.get("exp")
+    if not isinstance(expires_at, (int, float)):
+        raise TokenVerificationError("Missing exp claim")
+    if expires_at <= (time.time() if now is None else now):
+        raise TokenVerificationError("Token expired")
+
+    return claims
+
+
+@dataclass(frozen=True)
+class VerifiedToken:
+    user_id: str
+    email: str
+    metadata: AppMetadata
+    expires_at: float
+
+
+class VerifiedTokenCache:
+    """LRU of verified tokens keyed by fingerprint; entries expire at the token's ``exp``."""
+
+    def __init__(self, *, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, VerifiedToken] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, fingerprint: str, *, now: float | None = None) -> Optional[VerifiedToken]:
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                return None
+            if entry.expires_at <= (time.time() if now is None else now):
+                del self._entries[fingerprint]
+                return None
+            self._entries.move_to_end(fingerprint)
+            return entry
+
+    def put(self, fingerprint: str, entry: VerifiedToken) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[fingerprint] = entry
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
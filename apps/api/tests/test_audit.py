@@ -1,15 +1,30 @@
 from __future__ import annotations
 
+import asyncio
+import gzip
+import importlib.util
 import json
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import HTTPServer
+from pathlib import Path
 
+import httpx
 import pytest
 
-from blockbuilders_shared import AuditEventType
+from blockbuilders_shared import AuditEventType, AuditLogEvent
 
+from blockbuilders_api.core.ring_buffer import RingBuffer
+from blockbuilders_api.repositories.audit_journal import AuditJournal
+from blockbuilders_api.repositories.audit_store import AuditEventQuery, SqliteAuditStore
 from blockbuilders_api.repositories.compliance import ComplianceRepository
 from blockbuilders_api.services.audit import AuditService
 from blockbuilders_api.services.datadog import DatadogLogClient
+from blockbuilders_api.services.datadog_spool import DiskSpool
 from blockbuilders_api.services.notifications import NotificationService
+from blockbuilders_api.services.supabase import SupabaseService
+from tests.conftest import SupabaseServiceStub
 from tests.utils.datadog_sink import DatadogSink
 
 
@@ -71,3 +86,575 @@ async def test_auth_events_persist_to_compliance(tmp_path):
     contents = compliance_path.read_text().splitlines()
     assert "AUTH_LOGIN" in contents[1]
     assert "CONSENT_ACKNOWLEDGED" in contents[2]
+
+
+def _event(index: int) -> AuditLogEvent:
+    return AuditLogEvent(
+        id=f"evt_{index}",
+        actor_id="user-batch",
+        event_type=AuditEventType.AUTH_LOGIN,
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+@pytest.mark.asyncio
+async def test_datadog_client_ships_gzipped_batches_from_background_flusher():
+    sink = DatadogSink()
+    datadog = DatadogLogClient(
+        endpoint="http://127.0.0.1:8282/logs",
+        transport=sink.as_transport(),
+        max_batch_events=3,
+        flush_interval_seconds=60,
+    )
+    await datadog.start()
+    try:
+        for index in range(3):
+            await datadog.send_event(_event(index))
+        assert datadog.metrics()["queued"] == 3
+
+        for _ in range(100):
+            if sink.records:
+                break
+            await asyncio.sleep(0.01)
+
+        await datadog.send_event(_event(3))
+    finally:
+        await datadog.aclose()
+
+    assert len(sink.records) == 2
+    assert sink.records[0]["headers"]["content-encoding"] == "gzip"
+    assert [entry["event"]["id"] for entry in sink.records[0]["payload"]] == ["evt_0", "evt_1", "evt_2"]
+    assert [entry["event"]["id"] for entry in sink.events()] == ["evt_0", "evt_1", "evt_2", "evt_3"]
+    assert datadog.metrics()["sentBatches"] == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("policy", "expected_ids"), [("drop_oldest", ["evt_2", "evt_3"]), ("drop_newest", ["evt_0", "evt_1"])])
+async def test_datadog_client_applies_overflow_policy_while_endpoint_is_down(policy, expected_ids):
+    healthy = False
+    delivered: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if not healthy:
+            raise httpx.ConnectError("unavailable", request=request)
+        delivered.extend(entry["event"]["id"] for entry in json.loads(gzip.decompress(request.content)))
+        return httpx.Response(200)
+
+    datadog = DatadogLogClient(
+        endpoint="http://127.0.0.1:8282/logs",
+        transport=httpx.MockTransport(handler),
+        max_queue_events=2,
+        overflow_policy=policy,
+    )
+
+    for index in range(4):
+        await datadog.send_event(_event(index))
+
+    assert datadog.metrics()["queued"] == 2
+    assert datadog.metrics()["droppedEvents"] == 2
+
+    healthy = True
+    datadog._retry_after = None
+    await datadog.aclose()
+
+    assert delivered == expected_ids
+
+
+def test_disk_spool_replays_across_restarts_and_caps_its_footprint(tmp_path):
+    spool = DiskSpool(tmp_path / "spool", segment_bytes=64)
+    spool.append([b'{"id":1}', b'{"id":2}'])
+    spool.append([b'{"id":3}'])
+
+    records, cursor = spool.read_batch(max_events=2, max_bytes=1_000)
+    assert records == [b'{"id":1}', b'{"id":2}']
+    spool.ack(cursor, delivered=len(records))
+    spool.close()
+
+    reopened = DiskSpool(tmp_path / "spool", segment_bytes=64)
+    assert reopened.depth() == 1
+    assert reopened.read_batch(max_events=10, max_bytes=1_000)[0] == [b'{"id":3}']
+
+    capped = DiskSpool(tmp_path / "capped", max_bytes=200, segment_bytes=40)
+    for index in range(20):
+        capped.append([json.dumps({"id": index}).encode("utf-8")] * 3)
+
+    metrics = capped.metrics()
+    assert metrics["bytes"] <= 200 + 40 + 3 * 20
+    assert metrics["discardedTotal"] > 0
+    assert metrics["depth"] + metrics["discardedTotal"] == 60
+
+
+def test_disk_spool_truncates_a_torn_frame_left_by_a_crash(tmp_path):
+    spool = DiskSpool(tmp_path / "spool", segment_bytes=8)
+    spool.append([b'{"id":1}'])
+    spool.append([b'{"id":2}'])
+    spool.close()
+
+    first, last = sorted((tmp_path / "spool").glob("segment-*.spool"))
+    with first.open("ab") as handle:
+        handle.write(b"\x00\x00\x00\x40{\"id\"")
+    intact_size = last.stat().st_size
+    with last.open("ab") as handle:
+        handle.write(b"\x00\x00")
+
+    reopened = DiskSpool(tmp_path / "spool", segment_bytes=8)
+    assert reopened.depth() == 2
+    assert last.stat().st_size == intact_size
+
+    delivered = []
+    while reopened.depth():
+        records, cursor = reopened.read_batch(max_events=10, max_bytes=1_000)
+        assert records
+        delivered.extend(records)
+        reopened.ack(cursor, delivered=len(records))
+
+    assert delivered == [b'{"id":1}', b'{"id":2}']
+    reopened.append([b'{"id":3}'])
+    assert reopened.read_batch(max_events=10, max_bytes=1_000)[0] == [b'{"id":3}']
+
+
+def _load_mock_datadog_agent():
+    path = Path(__file__).resolve().parents[3] / "scripts" / "mock_datadog_agent.py"
+    spec = importlib.util.spec_from_file_location("mock_datadog_agent", path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.asyncio
+async def test_datadog_client_spools_to_disk_during_outage_and_replays_to_mock_agent(tmp_path):
+    mock_agent = _load_mock_datadog_agent()
+    received: list[str] = []
+
+    class RecordingHandler(mock_agent.MockDatadogHandler):
+        def do_POST(self) -> None:  # noqa: N802 - required signature
+            raw = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+            received.extend(entry["event"]["id"] for entry in json.loads(gzip.decompress(raw)))
+            self.send_response(200)
+            self.end_headers()
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    spool = DiskSpool(tmp_path / "spool")
+    datadog = DatadogLogClient(
+        endpoint=f"http://127.0.0.1:{port}/logs",
+        max_batch_events=2,
+        flush_interval_seconds=0.01,
+        spool=spool,
+        retry_initial_seconds=0.05,
+        retry_max_seconds=0.2,
+    )
+    await datadog.start()
+    server: HTTPServer | None = None
+    try:
+        for index in range(5):
+            await datadog.send_event(_event(index))
+        for _ in range(200):
+            if spool.depth() == 5:
+                break
+            await asyncio.sleep(0.01)
+        assert spool.depth() == 5
+        assert datadog.metrics()["queued"] == 0
+
+        server = HTTPServer(("127.0.0.1", port), RecordingHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        await datadog.send_event(_event(5))
+
+        for _ in range(300):
+            if len(received) == 6:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await datadog.aclose()
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    assert received == [f"evt_{index}" for index in range(6)]
+    metrics = datadog.metrics()
+    assert metrics["spool"]["depth"] == 0
+    assert metrics["spool"]["replayedTotal"] >= 5
+    assert metrics["retryDelaySeconds"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_datadog_client_drops_a_rejected_batch_instead_of_replaying_it_forever(tmp_path):
+    delivered: list[str] = []
+    attempts: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        ids = [entry["event"]["id"] for entry in json.loads(gzip.decompress(request.content))]
+        attempts.extend(ids)
+        if "evt_0" in ids:
+            return httpx.Response(400)
+        if "evt_1" in ids and attempts.count("evt_1") == 1:
+            return httpx.Response(503)
+        delivered.extend(ids)
+        return httpx.Response(202)
+
+    spool = DiskSpool(tmp_path / "spool")
+    spool.append([b'{"event":{"id":"evt_0"}}'])
+    spool.append([b'{"event":{"id":"evt_1"}}', b'{"event":{"id":"evt_2"}}'])
+    datadog = DatadogLogClient(
+        endpoint="http://127.0.0.1:8282/logs",
+        transport=httpx.MockTransport(handler),
+        max_batch_events=1,
+        spool=spool,
+    )
+
+    assert await datadog.flush() is True
+    assert spool.depth() == 2
+    # A 503 is an outage: the batch stays at the head of the spool for the next attempt.
+    assert await datadog.flush() is False
+    assert spool.depth() == 2
+
+    datadog._retry_after = None
+    await datadog.aclose()
+
+    assert attempts == ["evt_0", "evt_1", "evt_1", "evt_2"]
+    assert delivered == ["evt_1", "evt_2"]
+    metrics = datadog.metrics()
+    assert metrics["rejectedEvents"] == 1
+    assert metrics["spool"]["depth"] == 0
+    assert metrics["spool"]["replayedTotal"] == 2
+
+
+class _SlowSink:
+    def __init__(self, name: str, delay: float, timeout_seconds: float | None = None) -> None:
+        self.name = name
+        self.delay = delay
+        self.timeout_seconds = timeout_seconds
+        self.received: list[str] = []
+
+    async def emit(self, event: AuditLogEvent) -> None:
+        await asyncio.sleep(self.delay)
+        self.received.append(event.id)
+
+
+@pytest.mark.asyncio
+async def test_audit_sinks_run_concurrently_and_time_out_independently():
+    fast = _SlowSink("fast", 0.05)
+    also_fast = _SlowSink("also-fast", 0.05)
+    stuck = _SlowSink("stuck", 5.0, timeout_seconds=0.1)
+    service = AuditService(sinks=[fast, also_fast, stuck], sink_timeout_seconds=1.0)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    event = await service.record(actor_id="user-789", event_type=AuditEventType.AUTH_LOGIN)
+    elapsed = loop.time() - started
+
+    assert elapsed < 0.5
+    assert fast.received == [event.id]
+    assert also_fast.received == [event.id]
+    assert stuck.received == []
+
+    sinks = service.metrics()["sinks"]
+    assert sinks["fast"]["delivered"] == 1
+    assert sinks["stuck"]["timedOut"] == 1
+
+
+@pytest.mark.asyncio
+async def test_background_dispatch_returns_before_sinks_and_drains_on_shutdown(tmp_path):
+    slow = _SlowSink("slow", 0.1)
+    compliance = ComplianceRepository(export_path=tmp_path / "audit.csv")
+    service = AuditService(compliance=compliance, sinks=[slow], dispatch_mode="background")
+
+    event = await service.record(actor_id="user-789", event_type=AuditEventType.AUTH_LOGIN)
+
+    assert service.history() == [event]
+    assert slow.received == []
+    assert service.metrics()["pending"] == 1
+
+    await service.drain(timeout_seconds=1.0)
+
+    assert slow.received == [event.id]
+    assert [record["event_id"] for record in compliance.all()] == [event.id]
+    assert service.metrics()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_background_dispatch_journals_events_and_recovers_them_after_a_crash(tmp_path):
+    def open_service() -> AuditService:
+        return AuditService(
+            compliance=ComplianceRepository(export_path=tmp_path / "audit.csv"),
+            store=SqliteAuditStore(tmp_path / "audit.sqlite3"),
+            journal=AuditJournal(tmp_path / "journal.log"),
+            dispatch_mode="background",
+        )
+
+    crashed = open_service()
+    delivered = await crashed.record(actor_id="user-789", event_type=AuditEventType.AUTH_LOGIN)
+    await crashed.drain(timeout_seconds=1.0)
+    lost = await crashed.record(actor_id="user-789", event_type=AuditEventType.WORKSPACE_CREATED)
+    # Simulate the process dying before the background delivery of ``lost`` ever ran; the
+    # store row for ``delivered`` is still in an uncommitted batch as well.
+    await crashed.drain(timeout_seconds=0)
+    assert crashed.metrics()["journal"]["pending"] == 2
+    assert [record["event_id"] for record in crashed.compliance.all()] == [delivered.id]
+
+    restarted = open_service()
+    assert await restarted.recover() == 2
+    # Only the lost row is replayed into the export; the delivered one is not duplicated.
+    assert [record["event_id"] for record in restarted.compliance.all()] == [lost.id]
+    stored = restarted.store.query(AuditEventQuery(limit=10)).events
+    assert sorted(event.id for event in stored) == sorted([delivered.id, lost.id])
+    assert restarted.metrics()["journal"]["pending"] == 0
+
+    assert await open_service().recover() == 0
+
+
+@pytest.mark.asyncio
+async def test_background_dispatch_pushes_back_once_max_pending_is_reached():
+    slow = _SlowSink("slow", 0.05)
+    service = AuditService(sinks=[slow], dispatch_mode="background", max_pending=2)
+
+    events = [await service.record(actor_id="user-789", event_type=AuditEventType.AUTH_LOGIN) for _ in range(3)]
+
+    metrics = service.metrics()
+    assert metrics["pending"] == 2
+    assert metrics["backpressured"] == 1
+    assert events[2].id in slow.received
+
+    await service.drain(timeout_seconds=1.0)
+    assert sorted(slow.received) == sorted(event.id for event in events)
+
+
+def test_compliance_export_appends_rows_and_rotates_into_dated_segments(tmp_path):
+    export_path = tmp_path / "audit.csv"
+    export_path.write_text("event_id,event_type,actor_id,occurred_at,strategy_id,version_id\nevt_legacy,AUTH_LOGIN,user-0,2024-01-01T00:00:00+00:00,,\n")
+    compliance = ComplianceRepository(export_path=export_path, rotate_max_bytes=400)
+
+    for index in range(10):
+        compliance.record(_event(index))
+    compliance.close()
+
+    segments = sorted(path.name for path in tmp_path.glob("audit.*.csv"))
+    assert len(segments) >= 2
+    assert all(len(name.split(".")) == 4 for name in segments)
+    active = export_path.read_text().splitlines()
+    assert active[0].endswith(",metadata")
+    assert sum(line.startswith("event_id,") for line in active) == 1
+
+    snapshot_path = compliance.export_snapshot()
+    assert snapshot_path == tmp_path / "audit.snapshot.csv"
+    snapshot = snapshot_path.read_text().splitlines()
+    assert snapshot[0].startswith("event_id,")
+    assert [line.split(",", 1)[0] for line in snapshot[1:]] == ["evt_legacy", *(f"evt_{index}" for index in range(10))]
+
+
+def test_compliance_archive_prunes_partitions_and_filters_queries(tmp_path):
+    pytest.importorskip("pyarrow")
+    from blockbuilders_api.repositories.compliance_archive import ComplianceArchive
+
+    archive = ComplianceArchive(tmp_path / "archive", batch_size=4)
+    compliance = ComplianceRepository(archive=archive)
+    for day in (1, 2, 3):
+        for actor in ("user-a", "user-b"):
+            compliance.record(
+                AuditLogEvent(
+                    id=f"evt_{day}_{actor}",
+                    actor_id=actor,
+                    event_type=AuditEventType.WORKSPACE_CREATED,
+                    created_at=datetime(2024, 3, day, 12, tzinfo=timezone.utc),
+                    metadata={"strategyId": f"strategy-{day}"},
+                )
+            )
+        compliance.record(
+            AuditLogEvent(
+                id=f"evt_{day}_login",
+                actor_id="user-a",
+                event_type=AuditEventType.AUTH_LOGIN,
+                created_at=datetime(2024, 3, day, 9, tzinfo=timezone.utc),
+            )
+        )
+    compliance.close()
+
+    assert (tmp_path / "archive" / "day=2024-03-02" / "event_type=WORKSPACE_CREATED").is_dir()
+
+    march_two_onwards = compliance.query(actor_id="user-a", start=datetime(2024, 3, 2, tzinfo=timezone.utc))
+    assert [record["event_id"] for record in march_two_onwards] == [
+        "evt_2_login",
+        "evt_2_user-a",
+        "evt_3_login",
+        "evt_3_user-a",
+    ]
+
+    before = archive.metrics()["filesPruned"]
+    by_strategy = compliance.query(strategy_id="strategy-3", event_type="WORKSPACE_CREATED")
+    assert sorted(record["event_id"] for record in by_strategy) == ["evt_3_user-a", "evt_3_user-b"]
+    assert by_strategy[0]["occurred_at"] == "2024-03-03T12:00:00+00:00"
+    assert archive.metrics()["filesPruned"] > before
+
+    reopened = ComplianceArchive(tmp_path / "archive")
+    assert reopened.metrics()["rows"] == 9
+
+    compliance.record(
+        AuditLogEvent(
+            id="evt_4_login",
+            actor_id="user-a",
+            event_type=AuditEventType.AUTH_LOGIN,
+            created_at=datetime(2024, 3, 4, 9, tzinfo=timezone.utc),
+        )
+    )
+    files = archive.metrics()["files"]
+    logins = compliance.query(actor_id="user-a", event_type="AUTH_LOGIN", start=datetime(2024, 3, 3, tzinfo=timezone.utc))
+    assert [record["event_id"] for record in logins] == ["evt_3_login", "evt_4_login"]
+    assert logins[1]["occurred_at"] == "2024-03-04T09:00:00+00:00"
+    assert archive.metrics()["files"] == files
+    assert archive.metrics()["buffered"] == 1
+
+
+def test_ring_buffer_pages_with_stable_cursors_across_evictions():
+    evicted: list[int] = []
+    ring: RingBuffer[int] = RingBuffer(4, on_evict=evicted.append)
+    for value in range(6):
+        ring.append(value)
+
+    assert list(ring) == [2, 3, 4, 5]
+    assert evicted == [0, 1]
+
+    first = ring.page(limit=2)
+    assert first.items == [2, 3]
+    ring.append(6)
+    ring.append(7)
+    ring.append(8)
+
+    second = ring.page(first.next_cursor, limit=10)
+    assert second.items == [5, 6, 7, 8]
+    assert second.next_cursor is None
+    assert len(ring) == 4 and ring.evicted == 5
+
+
+@pytest.mark.asyncio
+async def test_audit_history_is_bounded_and_evicts_to_durable_sinks(tmp_path):
+    evicted_events: list[str] = []
+    evicted_rows: list[str] = []
+    compliance = ComplianceRepository(
+        export_path=tmp_path / "audit.csv",
+        history_capacity=3,
+        on_evict=lambda row: evicted_rows.append(row["event_id"]),
+    )
+    notifications = NotificationService(history_capacity=2)
+    service = AuditService(
+        compliance=compliance,
+        notifications=notifications,
+        history_capacity=3,
+        on_evict=lambda event: evicted_events.append(event.id),
+    )
+
+    recorded = [await service.record(actor_id=f"user-{index}", event_type=AuditEventType.AUTH_LOGIN) for index in range(5)]
+    ids = [event.id for event in recorded]
+
+    assert [event.id for event in service.history()] == ids[2:]
+    assert evicted_events == ids[:2]
+    assert [record["event_id"] for record in compliance.all()] == ids[2:]
+    assert evicted_rows == ids[:2]
+    assert [message["eventId"] for message in notifications.history()] == ids[3:]
+
+    page = service.page(limit=2)
+    assert [event.id for event in page.items] == ids[2:4]
+    assert [event.id for event in service.page(page.next_cursor).items] == ids[4:]
+
+    # Evicted rows are still found through the export.
+    assert [record["event_id"] for record in compliance.query(event_type="AUTH_LOGIN")] == ids
+    assert compliance.query(actor_id="user-0")[0]["strategy_id"] is None
+
+    compliance.close()
+    assert len(tmp_path.joinpath("audit.csv").read_text().splitlines()) == 6
+
+    # After a restart nothing has been evicted yet, but the export still holds the older rows.
+    restarted = ComplianceRepository(export_path=tmp_path / "audit.csv", history_capacity=3)
+    restarted.record(recorded[0].model_copy(update={"id": "evt_after_restart"}))
+    assert [record["event_id"] for record in restarted.query(actor_id="user-0")] == [ids[0], "evt_after_restart"]
+    restarted.close()
+
+
+def test_sqlite_audit_store_batches_inserts_and_pages_with_keyset_cursors(tmp_path):
+    store = SqliteAuditStore(tmp_path / "audit.sqlite3", batch_size=4, flush_interval_seconds=60)
+    base = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    for index in range(10):
+        store.add(
+            AuditLogEvent(
+                id=f"evt_{index:02d}",
+                actor_id="user-a" if index % 2 == 0 else "user-b",
+                event_type=AuditEventType.AUTH_LOGIN if index < 6 else AuditEventType.WORKSPACE_CREATED,
+                created_at=base + timedelta(minutes=index),
+                metadata={"index": index},
+            )
+        )
+    assert store.metrics() == {"pending": 2, "insertedTotal": 8, "batchesTotal": 2}
+
+    first = store.query(AuditEventQuery(actor_id="user-a", limit=2))
+    assert [event.id for event in first.events] == ["evt_08", "evt_06"]
+    second = store.query(AuditEventQuery(actor_id="user-a", limit=2, cursor=first.next_cursor))
+    assert [event.id for event in second.events] == ["evt_04", "evt_02"]
+    last = store.query(AuditEventQuery(actor_id="user-a", limit=2, cursor=second.next_cursor))
+    assert [event.id for event in last.events] == ["evt_00"]
+    assert last.next_cursor is None
+
+    window = store.query(
+        AuditEventQuery(
+            event_type=AuditEventType.AUTH_LOGIN,
+            start=base + timedelta(minutes=2),
+            end=base + timedelta(minutes=5),
+        )
+    )
+    assert [event.id for event in window.events] == ["evt_04", "evt_03", "evt_02"]
+    assert window.events[0].metadata == {"index": 4}
+    store.close()
+
+    reopened = SqliteAuditStore(tmp_path / "audit.sqlite3")
+    assert len(reopened.query(AuditEventQuery(limit=100)).events) == 10
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_audit_store_flushes_a_trickle_on_its_interval(tmp_path):
+    store = SqliteAuditStore(tmp_path / "audit.sqlite3", batch_size=100, flush_interval_seconds=0.05)
+    await store.start()
+    store.add(
+        AuditLogEvent(
+            id="evt_trickle",
+            actor_id="user-a",
+            event_type=AuditEventType.AUTH_LOGIN,
+            created_at=datetime(2024, 3, 1, tzinfo=timezone.utc),
+        )
+    )
+    assert store.metrics()["pending"] == 1
+
+    await asyncio.sleep(0.2)
+    assert store.metrics() == {"pending": 0, "insertedTotal": 1, "batchesTotal": 1}
+    await store.aclose()
+
+
+@pytest.mark.asyncio
+async def test_audit_events_endpoint_is_scoped_to_the_caller(app, client, tmp_path):
+    store = SqliteAuditStore(tmp_path / "audit.sqlite3")
+    service = AuditService(store=store)
+    app.dependency_overrides[AuditService] = lambda: service
+    app.dependency_overrides[SupabaseService] = lambda: SupabaseServiceStub(acknowledged=True)
+
+    for _ in range(3):
+        await service.record(actor_id="user-123", event_type=AuditEventType.AUTH_LOGIN)
+    await service.record(actor_id="someone-else", event_type=AuditEventType.AUTH_LOGIN)
+
+    response = await client.get("/api/v1/audit/events", params={"limit": 2}, headers={"Authorization": "Bearer stub-token"})
+    assert response.status_code == 200
+    payload = response.json()
+    assert len(payload["events"]) == 2
+    assert {event["actorId"] for event in payload["events"]} == {"user-123"}
+
+    response = await client.get(
+        "/api/v1/audit/events",
+        params={"limit": 2, "cursor": payload["nextCursor"]},
+        headers={"Authorization": "Bearer stub-token"},
+    )
+    assert [event["actorId"] for event in response.json()["events"]] == ["user-123"]
+    assert response.json()["nextCursor"] is None
+
+    invalid = await client.get("/api/v1/audit/events", params={"cursor": "%%%"}, headers={"Authorization": "Bearer stub-token"})
+    assert invalid.status_code == 400
+    store.close()
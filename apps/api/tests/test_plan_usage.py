@@ -1,10 +1,19 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+
+import fakeredis
 import pytest
 
 from blockbuilders_shared import PlanUsageMetric
 
-from blockbuilders_api.services.plan_usage import PlanUsageService
+from blockbuilders_api.core.config import settings
+from blockbuilders_api.repositories.plan_usage import PlanUsageRepository
+from blockbuilders_api.repositories.plan_usage_redis import RedisPlanUsageRepository
+from blockbuilders_api.repositories.quota_windows import SlidingWindow, TokenBucket, build_quota_windows
+from blockbuilders_api.services.plan_usage import PlanUsageService, QuotaExceededError
 from blockbuilders_api.services.supabase import SupabaseService
 
 from .conftest import SupabaseServiceStub
@@ -77,3 +86,224 @@ async def test_strategy_creation_blocks_when_quota_exhausted(app, client, plan_u
     response = await client.post("/api/v1/strategies", headers=AUTH_HEADER)
     assert response.status_code == 403
     assert response.json()["detail"]["error"] == "quota_exceeded"
+
+
+def test_try_increment_never_overshoots_under_thread_contention():
+    repo = PlanUsageRepository(limits={PlanUsageMetric.BACKTESTS: 50})
+    granted = 0
+    granted_lock = threading.Lock()
+
+    def worker() -> None:
+        nonlocal granted
+
+        async def attempt() -> int:
+            results = [await repo.try_increment(user_id="user-hot", metric=PlanUsageMetric.BACKTESTS) for _ in range(25)]
+            return sum(allowed for allowed, _ in results)
+
+        allowed = asyncio.run(attempt())
+        with granted_lock:
+            granted += allowed
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    usage = asyncio.run(repo.get_active_window(user_id="user-hot", metric=PlanUsageMetric.BACKTESTS))
+    assert granted == 50
+    assert usage.used == 50
+
+
+@pytest.mark.asyncio
+async def test_assert_within_quota_raises_once_limit_is_reached():
+    service = PlanUsageService(repo=PlanUsageRepository(limits={PlanUsageMetric.PAPER_TRADES: 2}))
+
+    await service.assert_within_quota(user_id="user-1", metric=PlanUsageMetric.PAPER_TRADES)
+    usage = await service.assert_within_quota(user_id="user-1", metric=PlanUsageMetric.PAPER_TRADES)
+    assert usage.used == 2
+
+    with pytest.raises(QuotaExceededError):
+        await service.assert_within_quota(user_id="user-1", metric=PlanUsageMetric.PAPER_TRADES)
+    assert (await service.get_usage(user_id="user-1", metric=PlanUsageMetric.PAPER_TRADES)).used == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_repository_enforces_limits_across_replicas():
+    server = fakeredis.FakeServer()
+    replica_a = RedisPlanUsageRepository(fakeredis.FakeAsyncRedis(server=server), read_cache_ttl_seconds=0)
+    replica_b = RedisPlanUsageRepository(fakeredis.FakeAsyncRedis(server=server), read_cache_ttl_seconds=0)
+    await replica_a.set_limit(metric=PlanUsageMetric.PAPER_TRADES, limit=3)
+
+    results = await asyncio.gather(
+        *(
+            replica.try_increment(user_id="user-1", metric=PlanUsageMetric.PAPER_TRADES)
+            for replica in (replica_a, replica_b) * 4
+        )
+    )
+
+    assert sum(allowed for allowed, _ in results) == 3
+    usage = await replica_b.get_active_window(user_id="user-1", metric=PlanUsageMetric.PAPER_TRADES)
+    assert usage.used == 3
+    assert usage.limit == 3
+
+    ttl_ms = await replica_a.client.pttl("bb:plan-usage:usage:user-1:paper_trades")
+    expected_ms = (usage.window_end - datetime.now(timezone.utc)).total_seconds() * 1000
+    assert abs(ttl_ms - expected_ms) < 5_000
+
+
+@pytest.mark.asyncio
+async def test_redis_repository_pipelines_multi_metric_reads_and_caches_single_reads():
+    client = fakeredis.FakeAsyncRedis()
+    repo = RedisPlanUsageRepository(client, read_cache_ttl_seconds=60)
+
+    await repo.increment(user_id="user-2", metric=PlanUsageMetric.BACKTESTS, amount=2)
+    usages = await repo.get_active_windows(user_id="user-2", metrics=list(PlanUsageMetric))
+    assert [usage.used for usage in usages] == [2, 0, 0]
+    assert [usage.limit for usage in usages] == [20, 5, 3]
+
+    await client.hset("bb:plan-usage:usage:user-2:backtests", "used", 7)
+    cached = await repo.get_active_window(user_id="user-2", metric=PlanUsageMetric.BACKTESTS)
+    assert cached.used == 2
+    assert repo.metrics()["readCache"]["hits"] == 1
+
+    refreshed = await repo.increment(user_id="user-2", metric=PlanUsageMetric.BACKTESTS)
+    assert refreshed.used == 8
+    assert (await repo.get_active_window(user_id="user-2", metric=PlanUsageMetric.BACKTESTS)).used == 8
+
+
+@pytest.mark.asyncio
+async def test_plan_usage_summary_returns_every_metric_with_etag(app, client):
+    app.dependency_overrides[SupabaseService] = lambda: SupabaseServiceStub(acknowledged=True)
+
+    response = await client.get("/api/v1/plan-usage", headers=AUTH_HEADER)
+
+    assert response.status_code == 200
+    usages = {usage["metric"]: usage for usage in response.json()["usages"]}
+    assert set(usages) == {metric.value for metric in PlanUsageMetric}
+    assert usages["backtests"]["limit"] == 20
+    etag = response.headers["etag"]
+
+    cached = await client.get("/api/v1/plan-usage", headers={**AUTH_HEADER, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    await client.post("/api/v1/plan-usage/assert", headers=AUTH_HEADER, json={"metric": "backtests"})
+    changed = await client.get("/api/v1/plan-usage", headers={**AUTH_HEADER, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert {usage["metric"]: usage["used"] for usage in changed.json()["usages"]}["backtests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_plan_usage_summary_reads_redis_backend():
+    repo = RedisPlanUsageRepository(fakeredis.FakeAsyncRedis(), read_cache_ttl_seconds=0)
+    service = PlanUsageService(repo=repo)
+    await service.assert_within_quota(user_id="user-1", metric=PlanUsageMetric.PAPER_TRADES)
+
+    summary = await service.get_summary(user_id="user-1")
+
+    assert [usage.metric for usage in summary.usages] == list(PlanUsageMetric)
+    assert {usage.metric: usage.used for usage in summary.usages}[PlanUsageMetric.PAPER_TRADES] == 1
+
+
+@pytest.mark.asyncio
+async def test_repository_reuses_snapshot_until_usage_changes():
+    repo = PlanUsageRepository()
+
+    first = await repo.get_active_window(user_id="user-1", metric=PlanUsageMetric.BACKTESTS)
+    again = await repo.get_active_window(user_id="user-1", metric=PlanUsageMetric.BACKTESTS)
+    assert again is first
+
+    incremented = await repo.increment(user_id="user-1", metric=PlanUsageMetric.BACKTESTS)
+    assert incremented is not first
+    assert (first.used, incremented.used) == (0, 1)
+    assert incremented.window_start.tzinfo is not None
+    assert await repo.get_active_window(user_id="user-1", metric=PlanUsageMetric.BACKTESTS) is incremented
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_releases_capacity_bucket_by_bucket():
+    metric = PlanUsageMetric.BACKTESTS
+    repo = PlanUsageRepository(limits={metric: 3}, windows={metric: SlidingWindow(buckets=24)})
+    start = datetime(2024, 1, 1, 10, 15, tzinfo=timezone.utc)
+
+    for hours in (0, 1, 2):
+        allowed, _ = await repo.try_increment(user_id="user-1", metric=metric, at=start + timedelta(hours=hours))
+        assert allowed
+    allowed, usage = await repo.try_increment(user_id="user-1", metric=metric, at=start + timedelta(hours=23))
+    assert not allowed
+    assert usage.window_end == datetime(2024, 1, 2, 10, tzinfo=timezone.utc)
+
+    # Crossing UTC midnight frees nothing; the 10:00 bucket expires a day after it opened.
+    allowed, usage = await repo.try_increment(user_id="user-1", metric=metric, at=start + timedelta(hours=24))
+    assert allowed
+    assert usage.used == 3
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_refills_at_limit_per_period():
+    metric = PlanUsageMetric.PAPER_TRADES
+    repo = PlanUsageRepository(limits={metric: 4}, windows={metric: TokenBucket(period=timedelta(hours=4))})
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    for _ in range(4):
+        assert (await repo.try_increment(user_id="user-1", metric=metric, at=start))[0]
+    allowed, usage = await repo.try_increment(user_id="user-1", metric=metric, at=start + timedelta(minutes=30))
+    assert not allowed
+    assert usage.window_end == start + timedelta(hours=4)
+
+    allowed, usage = await repo.try_increment(user_id="user-1", metric=metric, at=start + timedelta(hours=1))
+    assert allowed
+    assert usage.used == 4
+
+
+def test_build_quota_windows_rejects_unknown_metrics():
+    windows = build_quota_windows({"backtests": "sliding"}, sliding_buckets=12)
+    assert windows[PlanUsageMetric.BACKTESTS].kind == "sliding"
+    assert windows[PlanUsageMetric.PAPER_TRADES].kind == "fixed"
+
+    with pytest.raises(ValueError):
+        build_quota_windows({"exports": "sliding"})
+
+
+@pytest.mark.asyncio
+async def test_sweep_evicts_only_idle_windows():
+    metric = PlanUsageMetric.BACKTESTS
+    repo = PlanUsageRepository(windows={metric: SlidingWindow(buckets=24)})
+    day_one = datetime(2024, 1, 1, 9, 30, tzinfo=timezone.utc)
+
+    await repo.increment(user_id="dormant", metric=metric, at=day_one)
+    await repo.increment(user_id="active", metric=metric, at=day_one)
+    await repo.increment(user_id="active", metric=metric, at=day_one + timedelta(hours=20))
+
+    assert repo.sweep(now=day_one + timedelta(hours=23)) == 0
+    assert repo.sweep(now=day_one + timedelta(hours=24)) == 1
+    assert repo.metrics()["liveKeys"] == 1
+
+    assert repo.sweep(now=day_one + timedelta(hours=44)) == 1
+    metrics = repo.metrics()
+    assert (metrics["liveKeys"], metrics["scheduledExpiries"], metrics["evictedTotal"]) == (0, 0, 2)
+
+    usage = await repo.increment(user_id="active", metric=metric, at=day_one + timedelta(hours=45))
+    assert usage.used == 1
+
+
+@pytest.mark.asyncio
+async def test_service_sweeper_runs_until_closed(monkeypatch):
+    monkeypatch.setattr(settings, "plan_usage_sweep_interval_seconds", 0.01)
+    repo = PlanUsageRepository()
+    service = PlanUsageService(repo=repo)
+    await repo.increment(user_id="user-1", metric=PlanUsageMetric.BACKTESTS, at=datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+    await service.start()
+    try:
+        for _ in range(100):
+            if service.metrics()["liveKeys"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert service.metrics()["evictedTotal"] == 1
+    finally:
+        await service.aclose()
+    assert service._sweeper is None
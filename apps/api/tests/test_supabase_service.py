@@ -1,15 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import hashlib
+import hmac
 import json
+import time
 from datetime import datetime
 from typing import Any, Dict
 
+import fakeredis
 import httpx
 import pytest
+from fastapi import HTTPException
+
+from blockbuilders_shared import AppMetadata
 
 from blockbuilders_api.core.config import settings
+from blockbuilders_api.repositories.metadata_log import MetadataLogStore
+from blockbuilders_api.services.metadata_cache import BoundedCache
+from blockbuilders_api.services.shared_cache import RedisMetadataCache, decode_metadata, encode_metadata
+from blockbuilders_api.services.singleflight import SingleFlight
 from blockbuilders_api.services.supabase import SupabaseService, _empty_metadata
+from blockbuilders_api.services.token_cache import VerifiedToken, VerifiedTokenCache
 
 
 class _DummyResponse:
@@ -68,6 +81,18 @@ def _make_jwt(payload: Dict[str, Any]) -> str:
     return f"{header}.{body}.signature"
 
 
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("utf-8")
+
+
+def _make_signed_jwt(payload: Dict[str, Any], *, secret: str | None = None) -> str:
+    header = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}).encode("utf-8"))
+    body = _b64(json.dumps(payload).encode("utf-8"))
+    key = (secret or settings.supabase_jwt_secret).encode("utf-8")
+    signature = hmac.new(key, f"{header}.{body}".encode("ascii"), hashlib.sha256).digest()
+    return f"{header}.{body}.{_b64(signature)}"
+
+
 @pytest.fixture(autouse=True)
 def _supabase_test_environment(tmp_path, monkeypatch):
     original_timeout = settings.supabase_http_timeout_seconds
@@ -75,13 +100,13 @@ def _supabase_test_environment(tmp_path, monkeypatch):
     cache_path = tmp_path / "metadata-cache.json"
 
     monkeypatch.setattr(settings, "supabase_metadata_cache_path", cache_path, raising=False)
-    SupabaseService._metadata_cache.clear()
-    SupabaseService._cache_loaded = False
+    SupabaseService._local_metadata.reset()
+    SupabaseService._token_cache.clear()
 
     yield
 
-    SupabaseService._metadata_cache.clear()
-    SupabaseService._cache_loaded = False
+    SupabaseService._local_metadata.reset()
+    SupabaseService._token_cache.clear()
     settings.supabase_http_timeout_seconds = original_timeout
     monkeypatch.setattr(settings, "supabase_metadata_cache_path", original_cache_path, raising=False)
 
@@ -178,8 +203,7 @@ async def test_persist_consent_survives_process_restart(monkeypatch):
     service = SupabaseService()
     await service.persist_simulation_consent(user_id="user-disk")
 
-    SupabaseService._metadata_cache.clear()
-    SupabaseService._cache_loaded = False
+    SupabaseService._local_metadata.reset()
 
     monkeypatch.setattr(
         "blockbuilders_api.services.supabase.httpx.AsyncClient",
@@ -207,3 +231,453 @@ async def test_timeout_zero_short_circuits_remote_call(monkeypatch):
     user = await service.fetch_user(token)
     assert user.id == "user-offline"
     assert user.metadata.consents.simulation_only.acknowledged is False
+
+
+@pytest.mark.asyncio
+async def test_pooled_client_is_reused_and_reports_metrics():
+    token = _make_jwt({"sub": "user-pool", "email": "pool@blockbuilders.tech", "app_metadata": _empty_metadata()})
+    seen_connections: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_connections.append(request.headers["authorization"])
+        return httpx.Response(
+            200,
+            json={"id": "user-pool", "email": "pool@blockbuilders.tech", "app_metadata": _empty_metadata()},
+        )
+
+    pool = await SupabaseService.open_http_pool(transport=httpx.MockTransport(handler))
+    try:
+        service = SupabaseService()
+        first = await service.fetch_user(token)
+        second = await service.fetch_user(token)
+
+        assert first.id == second.id == "user-pool"
+        assert len(seen_connections) == 2
+        assert SupabaseService._http_pool is pool
+
+        metrics = SupabaseService.http_pool_metrics()
+        assert metrics["requestsTotal"] == 2
+        assert metrics["inFlight"] == 0
+        assert metrics["peakInFlight"] == 1
+        assert metrics["saturatedTotal"] == 0
+    finally:
+        await SupabaseService.close_http_pool()
+
+    assert SupabaseService.http_pool_metrics() == {}
+
+
+@pytest.mark.asyncio
+async def test_local_verification_serves_repeat_tokens_from_cache(monkeypatch):
+    monkeypatch.setattr(settings, "supabase_jwt_local_verification", True, raising=False)
+    monkeypatch.setattr(
+        "blockbuilders_api.services.supabase.httpx.AsyncClient",
+        lambda *a, **kw: _FailingClient("GET"),
+    )
+    token = _make_signed_jwt(
+        {
+            "sub": "user-verified",
+            "email": "verified@blockbuilders.tech",
+            "aud": settings.supabase_api_audience,
+            "exp": int(time.time()) + 3600,
+            "app_metadata": _empty_metadata(),
+        }
+    )
+
+    service = SupabaseService()
+    first = await service.fetch_user(token)
+    assert first.id == "user-verified"
+    assert len(SupabaseService._token_cache) == 1
+
+    await service.persist_simulation_consent(user_id="user-verified")
+    second = await service.fetch_user(token)
+    assert second.email == "verified@blockbuilders.tech"
+    assert second.metadata.consents.simulation_only.acknowledged is True
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"secret": "wrong-secret"},
+        {"aud": "anon"},
+        {"exp": 1},
+    ],
+)
+async def test_local_verification_rejects_invalid_tokens(monkeypatch, overrides):
+    monkeypatch.setattr(settings, "supabase_jwt_local_verification", True, raising=False)
+    claims = {
+        "sub": "user-invalid",
+        "email": "invalid@blockbuilders.tech",
+        "aud": overrides.get("aud", settings.supabase_api_audience),
+        "exp": overrides.get("exp", int(time.time()) + 3600),
+    }
+    token = _make_signed_jwt(claims, secret=overrides.get("secret"))
+
+    with pytest.raises(HTTPException) as excinfo:
+        await SupabaseService().fetch_user(token)
+
+    assert excinfo.value.status_code == 401
+    assert len(SupabaseService._token_cache) == 0
+
+
+def test_verified_token_cache_evicts_lru_and_expired_entries():
+    metadata = AppMetadata.model_validate(_empty_metadata())
+    cache = VerifiedTokenCache(maxsize=2)
+    entry = lambda user_id, exp: VerifiedToken(user_id=user_id, email="", metadata=metadata, expires_at=exp)  # noqa: E731
+
+    cache.put("a", entry("a", 100.0))
+    cache.put("b", entry("b", 200.0))
+    assert cache.get("a", now=50.0) is not None
+    cache.put("c", entry("c", 300.0))
+
+    assert cache.get("b", now=50.0) is None
+    assert cache.get("a", now=150.0) is None
+    assert cache.get("c", now=150.0) is not None
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetch_user_coalesces_upstream_calls(monkeypatch):
+    token = _make_jwt({"sub": "user-burst", "email": "burst@blockbuilders.tech", "app_metadata": _empty_metadata()})
+    calls = 0
+
+    async def fake_request(self, access_token: str, timeout: httpx.Timeout) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(
+            200,
+            json={"id": "user-burst", "email": "burst@blockbuilders.tech", "app_metadata": _empty_metadata()},
+            request=httpx.Request("GET", "https://example.com"),
+        )
+
+    monkeypatch.setattr(SupabaseService, "_perform_user_request", fake_request)
+
+    users = await asyncio.gather(*(SupabaseService().fetch_user(token) for _ in range(8)))
+
+    assert calls == 1
+    assert {user.id for user in users} == {"user-burst"}
+    assert SupabaseService.user_lookup_metrics()["inFlight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_coalesced_failures_fall_back_for_every_caller(monkeypatch):
+    token = _make_jwt({"sub": "user-down", "email": "down@blockbuilders.tech", "app_metadata": _empty_metadata()})
+    calls = 0
+
+    async def failing_request(self, access_token: str, timeout: httpx.Timeout) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise httpx.ConnectTimeout("timeout", request=httpx.Request("GET", "https://example.com"))
+
+    monkeypatch.setattr(SupabaseService, "_perform_user_request", failing_request)
+
+    users = await asyncio.gather(*(SupabaseService().fetch_user(token) for _ in range(4)))
+
+    assert calls == 1
+    assert all(user.email == "down@blockbuilders.tech" for user in users)
+
+
+@pytest.mark.asyncio
+async def test_singleflight_cancelling_one_waiter_keeps_shared_call_alive():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def upstream() -> str:
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flight.run("key", upstream))
+    second = asyncio.create_task(flight.run("key", upstream))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert flight.metrics() == {"inFlight": 0, "executedTotal": 1, "coalescedTotal": 1}
+
+
+@pytest.mark.asyncio
+async def test_singleflight_cancels_upstream_when_all_waiters_leave():
+    flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def upstream() -> str:
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "never"
+
+    waiter = asyncio.create_task(flight.run("key", upstream))
+    await started.wait()
+    waiter.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert await flight.run("key", lambda: asyncio.sleep(0, result="fresh")) == "fresh"
+
+
+@pytest.mark.asyncio
+async def test_metadata_cache_writes_behind_request_path(monkeypatch):
+    monkeypatch.setattr(settings, "supabase_metadata_flush_interval_seconds", 60.0, raising=False)
+
+    persister = await SupabaseService.start_metadata_persister()
+    try:
+        SupabaseService._local_metadata.put("user-behind", AppMetadata.model_validate(_empty_metadata()))
+        SupabaseService._local_metadata.put("user-behind", AppMetadata.model_validate(_empty_metadata()))
+
+        store = SupabaseService._local_metadata.store
+        assert store is not None
+        assert store.log_path.exists() is False
+        assert persister.metrics()["dirty"] == 1
+    finally:
+        await SupabaseService.stop_metadata_persister()
+
+    assert store.log_path.read_text().splitlines() == [
+        'user-behind\t{"consents":{"simulationOnly":{"acknowledged":false,"acknowledgedAt":null}}}'
+    ]
+
+
+@pytest.mark.asyncio
+async def test_metadata_persister_flushes_when_batch_fills(monkeypatch):
+    monkeypatch.setattr(settings, "supabase_metadata_flush_interval_seconds", 60.0, raising=False)
+    monkeypatch.setattr(settings, "supabase_metadata_flush_batch_size", 2, raising=False)
+
+    persister = await SupabaseService.start_metadata_persister()
+    try:
+        for user_id in ("user-a", "user-b"):
+            SupabaseService._local_metadata.put(user_id, AppMetadata.model_validate(_empty_metadata()))
+
+        for _ in range(50):
+            if persister.metrics()["flushesTotal"]:
+                break
+            await asyncio.sleep(0.01)
+
+        store = SupabaseService._local_metadata.store
+        assert store is not None
+        assert [line.split("\t")[0] for line in store.log_path.read_text().splitlines()] == ["user-a", "user-b"]
+    finally:
+        await SupabaseService.stop_metadata_persister()
+
+
+@pytest.mark.asyncio
+async def test_consent_update_appends_a_single_log_record(monkeypatch):
+    monkeypatch.setattr(
+        "blockbuilders_api.services.supabase.httpx.AsyncClient",
+        lambda *a, **kw: _FailingClient("PUT"),
+    )
+    for user_id in ("user-1", "user-2", "user-3"):
+        SupabaseService._local_metadata.put(user_id, AppMetadata.model_validate(_empty_metadata()))
+    store = SupabaseService._local_metadata.store
+    assert store is not None
+    size_before = store.log_path.stat().st_size
+
+    await SupabaseService().persist_simulation_consent(user_id="user-2")
+
+    lines = store.log_path.read_text().splitlines()
+    assert len(lines) == 4
+    assert lines[-1].startswith("user-2\t")
+    assert store.log_path.stat().st_size - size_before == len(lines[-1]) + 1
+
+
+def test_metadata_log_store_compacts_and_replays(tmp_path):
+    base_path = tmp_path / "cache.json"
+    store = MetadataLogStore(base_path, compact_min_records=4)
+    store.append([("user-a", {"version": 1}), ("user-b", {"version": 1})])
+    store.append([("user-a", {"version": 2})])
+    assert store.metrics() == {"users": 2, "logRecords": 3, "compactionsTotal": 0}
+
+    store.append([("user-a", {"version": 3})])
+    assert store.metrics() == {"users": 2, "logRecords": 0, "compactionsTotal": 1}
+    assert store.log_path.exists() is False
+
+    store.append([("user-b", {"version": 2})])
+    with store.log_path.open("a", encoding="utf-8") as handle:
+        handle.write('user-c\t{"version"')
+
+    replayed = MetadataLogStore(base_path)
+    replayed.load()
+    assert replayed.get("user-a") == {"version": 3}
+    assert replayed.get("user-b") == {"version": 2}
+    assert "user-c" not in replayed
+
+
+def test_metadata_log_store_repairs_torn_tail_before_appending(tmp_path):
+    base_path = tmp_path / "cache.json"
+    store = MetadataLogStore(base_path)
+    store.append([("user-c", {"version": 1})])
+    with store.log_path.open("a", encoding="utf-8") as handle:
+        handle.write('user-c\t{"v')
+
+    recovered = MetadataLogStore(base_path)
+    recovered.load()
+    recovered.append([("user-d", {"version": 9})])
+
+    replayed = MetadataLogStore(base_path)
+    replayed.load()
+    assert replayed.get("user-c") == {"version": 1}
+    assert replayed.get("user-d") == {"version": 9}
+    assert replayed.metrics()["logRecords"] == 2
+
+
+def test_metadata_log_store_imports_legacy_json_blob(tmp_path):
+    base_path = tmp_path / "cache.json"
+    base_path.write_text(json.dumps({"user-legacy": _empty_metadata()}), encoding="utf-8")
+
+    store = MetadataLogStore(base_path)
+    store.load()
+
+    assert store.get("user-legacy") == _empty_metadata()
+    assert store.snapshot_path.exists() is True
+
+
+def test_bounded_cache_lru_evicts_least_recently_used():
+    cache: BoundedCache[str, int] = BoundedCache(maxsize=2, policy="lru")
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1
+    cache["c"] = 3
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    metrics = cache.metrics()
+    assert metrics["size"] == 2
+    assert metrics["evictions"] == 1
+    assert metrics["hits"] == 2
+    assert metrics["misses"] == 1
+    assert metrics["hitRatio"] == round(2 / 3, 4)
+    assert metrics["residentBytes"] > 0
+
+    assert cache.peek("c") == 3
+    assert cache.peek("b") is None
+    assert cache.metrics()["hits"] == 2 and cache.metrics()["misses"] == 1
+    cache.clear()
+    assert cache.metrics()["residentBytes"] == 0
+
+
+def test_bounded_cache_lfu_keeps_hot_entries_and_honours_ttl(monkeypatch):
+    cache: BoundedCache[str, int] = BoundedCache(maxsize=2, policy="lfu", ttl_seconds=30)
+    clock = [1000.0]
+    monkeypatch.setattr("blockbuilders_api.services.metadata_cache.time.monotonic", lambda: clock[0])
+
+    cache["hot"] = 1
+    cache["cold"] = 2
+    for _ in range(3):
+        cache.get("hot")
+    cache.get("cold")
+    cache["new"] = 3
+
+    assert "cold" not in cache
+    assert cache.get("hot") == 1
+
+    clock[0] += 31
+    assert cache.get("hot") is None
+    assert cache.metrics()["expirations"] == 1
+
+
+def test_bounded_cache_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        BoundedCache(maxsize=1, policy="fifo")
+
+
+def test_evicted_metadata_is_reloaded_from_the_log(monkeypatch):
+    monkeypatch.setattr(SupabaseService._local_metadata, "cache", BoundedCache(maxsize=1))
+    consented = AppMetadata.model_validate(
+        {"consents": {"simulationOnly": {"acknowledged": True, "acknowledgedAt": "2024-01-01T00:00:00Z"}}}
+    )
+
+    SupabaseService._local_metadata.put("user-first", consented)
+    SupabaseService._local_metadata.put("user-second", AppMetadata.model_validate(_empty_metadata()))
+    assert "user-first" not in SupabaseService._local_metadata.cache
+
+    # Writes consult the cache without skewing its lookup counters.
+    assert SupabaseService.metadata_cache_metrics()["hits"] == 0
+    assert SupabaseService.metadata_cache_metrics()["misses"] == 0
+    assert SupabaseService.metadata_cache_metrics()["residentBytes"] > 0
+
+    reloaded = SupabaseService._local_metadata.get("user-first")
+    assert reloaded == consented
+    assert SupabaseService.metadata_cache_metrics()["evictions"] == 2
+
+
+def test_shared_metadata_codec_round_trips_compactly():
+    pending = AppMetadata.model_validate(_empty_metadata())
+    consented = AppMetadata.model_validate(
+        {"consents": {"simulationOnly": {"acknowledged": True, "acknowledgedAt": "2024-01-01T00:00:00Z"}}}
+    )
+
+    assert encode_metadata(pending) == b"c1|0|"
+    assert encode_metadata(consented) == b"c1|1|2024-01-01T00:00:00+00:00"
+    assert decode_metadata(encode_metadata(pending)) == pending
+    assert decode_metadata(encode_metadata(consented)) == consented
+    assert decode_metadata(b"c1|0|") is decode_metadata(b"c1|0|")
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_serves_sessions_validated_by_another_replica(monkeypatch):
+    server = fakeredis.FakeServer()
+    token = _make_jwt(
+        {
+            "sub": "user-shared",
+            "email": "shared@blockbuilders.tech",
+            "exp": int(time.time()) + 600,
+            "app_metadata": _empty_metadata(),
+        }
+    )
+    calls = 0
+
+    async def fake_request(self, access_token: str, timeout: httpx.Timeout) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(
+            200,
+            json={"id": "user-shared", "email": "shared@blockbuilders.tech", "app_metadata": _empty_metadata()},
+            request=httpx.Request("GET", "https://example.com"),
+        )
+
+    monkeypatch.setattr(SupabaseService, "_perform_user_request", fake_request)
+    monkeypatch.setattr(SupabaseService._shared_metadata, "cache", RedisMetadataCache(fakeredis.FakeAsyncRedis(server=server)))
+
+    await SupabaseService().fetch_user(token)
+    assert calls == 1
+
+    # A second replica starts with empty in-process caches but the same Redis.
+    SupabaseService._local_metadata.cache.clear()
+    monkeypatch.setattr(SupabaseService._shared_metadata, "cache", RedisMetadataCache(fakeredis.FakeAsyncRedis(server=server)))
+
+    user = await SupabaseService().fetch_user(token)
+
+    assert calls == 1
+    assert user.email == "shared@blockbuilders.tech"
+    assert SupabaseService.shared_cache_metrics()["sessionHits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_consent_is_published_to_other_replicas(monkeypatch):
+    server = fakeredis.FakeServer()
+    received: list[tuple[str, AppMetadata]] = []
+
+    subscriber = RedisMetadataCache(fakeredis.FakeAsyncRedis(server=server))
+    await subscriber.start(lambda user_id, metadata: received.append((user_id, metadata)))
+    monkeypatch.setattr(SupabaseService._shared_metadata, "cache", RedisMetadataCache(fakeredis.FakeAsyncRedis(server=server)))
+    monkeypatch.setattr(settings, "supabase_http_timeout_seconds", 0.0, raising=False)
+
+    try:
+        metadata = await SupabaseService().persist_simulation_consent(user_id="user-replica")
+        for _ in range(100):
+            if received:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await subscriber.aclose()
+
+    assert received == [("user-replica", metadata)]
+    assert received[0][1].consents.simulation_only.acknowledged is True
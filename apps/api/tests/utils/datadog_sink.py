@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import gzip
 import json
 from dataclasses import dataclass, field
 from typing import Dict, List
@@ -15,7 +16,10 @@ class DatadogSink:
 
     def as_transport(self) -> httpx.MockTransport:
         def handler(request: httpx.Request) -> httpx.Response:
-            payload = json.loads(request.content.decode()) if request.content else {}
+            content = request.content
+            if request.headers.get("content-encoding") == "gzip":
+                content = gzip.decompress(content)
+            payload = json.loads(content.decode()) if content else {}
             headers = {key.lower(): value for key, value in request.headers.items()}
             self.records.append(
                 {
@@ -27,7 +31,17 @@ class DatadogSink:
 
         return httpx.MockTransport(handler)
 
+    def events(self) -> List[Dict[str, object]]:
+        """Flatten batched (JSON array) and single-object payloads into individual log entries."""
+
+        entries: List[Dict[str, object]] = []
+        for record in self.records:
+            payload = record["payload"]
+            entries.extend(payload if isinstance(payload, list) else [payload])
+        return entries
+
     def last_payload(self) -> Dict[str, object] | None:
-        if not self.records:
+        events = self.events()
+        if not events:
             return None
-        return self.records[-1]["payload"]
+        return events[-1]
@@ -0,0 +1,310 @@
+"""Vectorized backtest engine for block-built strategies.
+
+A strategy seed is a chain of blocks (data source -> indicator -> signal -> risk -> execution).
+Its compiled :class:`~blockbuilders_shared.ExecutionPlan` is resolved into
+:class:`StrategyParameters`, and :func:`execute_backtest` evaluates
+it over whole OHLCV arrays: indicators, crossover signals, stop-loss exits, the equity curve
+and KPIs are all NumPy operations, with no Python loop over bars.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List
+
+import numpy as np
+
+from blockbuilders_shared import ExecutionPlan, PlanStep, StrategyGraphError
+
+from .indicators import ema
+from .market_data import Candles
+
+if TYPE_CHECKING:
+    from .indicator_cache import IndicatorCache
+
+CHAIN = ("data-source", "indicator", "signal", "risk", "execution")
+SIGNALS = ("bullish_crossover", "bearish_crossover")
+
+EXIT_SIGNAL = 0
+EXIT_STOP = 1
+EXIT_END = 2
+_EXIT_REASONS = {EXIT_SIGNAL: "signal", EXIT_STOP: "stop_loss", EXIT_END: "end_of_data"}
+
+
+@dataclass(frozen=True)
+class StrategyParameters:
+    symbol: str
+    interval: str
+    fast: int
+    slow: int
+    entry: str = "bullish_crossover"
+    exit: str = "bearish_crossover"
+    position_size: float = 1.0
+    stop_loss: float | None = None
+    fee_bps: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not 0 < self.fast < self.slow:
+            raise StrategyGraphError("EMA crossover needs 0 < fast < slow")
+        if self.entry not in SIGNALS or self.exit not in SIGNALS or self.entry == self.exit:
+            raise StrategyGraphError(f"Entry and exit must be distinct signals from {SIGNALS}")
+        if not 0 < self.position_size <= 1:
+            raise StrategyGraphError("positionSize must be in (0, 1]")
+        if self.stop_loss is not None and not 0 < self.stop_loss < 1:
+            raise StrategyGraphError("stopLoss must be in (0, 1)")
+
+    @classmethod
+    def from_plan(cls, plan: ExecutionPlan) -> "StrategyParameters":
+        steps = resolve_chain(plan)
+        data, indicator, signal, risk, execution = (steps[kind].config for kind in CHAIN)
+        try:
+            values: Dict[str, Any] = {
+                "symbol": str(data["symbol"]),
+                "interval": str(data["interval"]),
+                "fast": int(indicator["fast"]),
+                "slow": int(indicator["slow"]),
+                "entry": str(signal.get("entry", "bullish_crossover")),
+                "exit": str(signal.get("exit", "bearish_crossover")),
+                "position_size": float(risk.get("positionSize", 1.0)),
+                "stop_loss": float(risk["stopLoss"]) if risk.get("stopLoss") is not None else None,
+                "fee_bps": float(execution.get("feeBps", 0.0)),
+            }
+        except (KeyError, TypeError, ValueError) as exc:
+            raise StrategyGraphError(f"Invalid block configuration: {exc}") from exc
+        return cls(**values)
+
+
+def resolve_chain(plan: ExecutionPlan) -> Dict[str, PlanStep]:
+    """Check that the plan is exactly the supported linear chain and index its steps by kind."""
+
+    kinds = tuple(step.kind for step in plan.steps)
+    if kinds != CHAIN:
+        raise StrategyGraphError(f"Unsupported strategy layout {' -> '.join(kinds)}; expected {' -> '.join(CHAIN)}")
+    for previous, step in zip(plan.steps, plan.steps[1:]):
+        if step.inputs != (previous.block_id,):
+            raise StrategyGraphError(f"Block {step.block_id!r} must take its only input from {previous.block_id!r}")
+    return {step.kind: step for step in plan.steps}
+
+
+@dataclass(frozen=True)
+class Trades:
+    entry_index: np.ndarray
+    exit_index: np.ndarray
+    entry_price: np.ndarray
+    exit_price: np.ndarray
+    exit_reason: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.entry_index.shape[0])
+
+    @property
+    def returns(self) -> np.ndarray:
+        return self.exit_price / self.entry_price - 1.0
+
+
+@dataclass(frozen=True)
+class BacktestResult:
+    timestamp: np.ndarray
+    equity: np.ndarray
+    trades: Trades
+    kpis: Dict[str, float]
+
+    def to_payload(self, *, max_points: int = 1_000) -> Dict[str, Any]:
+        """JSON-friendly summary; the equity curve is subsampled to ``max_points`` points."""
+
+        size = self.equity.shape[0]
+        points = np.unique(np.linspace(0, size - 1, num=min(size, max_points)).astype(np.int64)) if size else []
+        trades: List[Dict[str, Any]] = [
+            {
+                "entryTime": int(self.timestamp[entry]),
+                "exitTime": int(self.timestamp[exit_]),
+                "entryPrice": float(entry_price),
+                "exitPrice": float(exit_price),
+                "return": float(exit_price / entry_price - 1.0),
+                "exitReason": _EXIT_REASONS[int(reason)],
+            }
+            for entry, exit_, entry_price, exit_price, reason in zip(
+                self.trades.entry_index.tolist(),
+                self.trades.exit_index.tolist(),
+                self.trades.entry_price.tolist(),
+                self.trades.exit_price.tolist(),
+                self.trades.exit_reason.tolist(),
+            )
+        ]
+        return {
+            "kpis": self.kpis,
+            "equityCurve": [
+                {"time": int(self.timestamp[index]), "equity": float(self.equity[index])} for index in points
+            ],
+            "trades": trades,
+        }
+
+
+def crossovers(fast: np.ndarray, slow: np.ndarray, *, warmup: int) -> Dict[str, np.ndarray]:
+    """Indices where ``fast`` crosses above / below ``slow``, ignoring the first ``warmup`` bars."""
+
+    above = fast > slow
+    flips = np.flatnonzero(above[1:] != above[:-1]) + 1
+    flips = flips[flips >= warmup]
+    return {
+        "bullish_crossover": flips[above[flips]],
+        "bearish_crossover": flips[~above[flips]],
+    }
+
+
+def _last_event(indices: np.ndarray, size: int, *, inclusive: bool = True) -> np.ndarray:
+    """For every bar, the position in sorted unique ``indices`` of the latest event at or before it.
+
+    With ``inclusive=False`` an event on the bar itself is not counted. Bars before the first
+    event get -1. A running count of marks is much cheaper than a per-bar ``searchsorted``.
+    """
+
+    marks = np.zeros(size, dtype=np.int32)
+    marks[indices] = 1
+    counts = np.cumsum(marks, dtype=np.int32)
+    if not inclusive:
+        counts -= marks
+    counts -= 1
+    return counts
+
+
+def _build_trades(candles: Candles, entries: np.ndarray, exits: np.ndarray, stop_loss: float | None) -> Trades:
+    """Pair each entry with the next exit signal, cutting it short where the stop is touched.
+
+    Crossover signals alternate, so entries never fall inside an open trade.
+    """
+
+    size = len(candles)
+    entries = entries[entries < size - 1]
+    next_exit = np.searchsorted(exits, entries, side="right")
+    # Trades with no later exit signal are closed on the last bar.
+    exit_index = np.append(exits, size - 1)[next_exit]
+    exit_reason = np.where(next_exit < exits.shape[0], EXIT_SIGNAL, EXIT_END)
+    entry_price = candles.close[entries]
+    exit_price = candles.close[exit_index]
+
+    if stop_loss is not None and entries.shape[0]:
+        # Trade that was open when each bar started: the last entry strictly before it.
+        trade = _last_event(entries, size, inclusive=False)
+        level = entry_price[trade] * (1.0 - stop_loss)
+        hit = (candles.low <= level) & (trade >= 0)
+        hit &= np.arange(size) <= exit_index[trade]
+        hit_bars = np.flatnonzero(hit)
+        hit_trades = trade[hit_bars]
+        first = np.ones(hit_bars.shape[0], dtype=bool)
+        first[1:] = hit_trades[1:] != hit_trades[:-1]
+        stopped, stop_bar = hit_trades[first], hit_bars[first]
+        exit_index[stopped] = stop_bar
+        exit_reason[stopped] = EXIT_STOP
+        # Gaps through the stop fill at the open rather than the stop level.
+        exit_price[stopped] = np.minimum(candles.open[stop_bar], level[stop_bar])
+
+    return Trades(entries, exit_index, entry_price, exit_price, exit_reason)
+
+
+@dataclass(frozen=True)
+class Exposure:
+    """Which trade each bar belongs to; independent of position size and fees."""
+
+    trade: np.ndarray
+    closed: np.ndarray
+    holding: np.ndarray
+    move: np.ndarray
+
+
+def exposure(candles: Candles, trades: Trades) -> Exposure:
+    size = len(candles)
+    trade = _last_event(trades.entry_index, size)
+    return Exposure(
+        trade=trade,
+        closed=_last_event(trades.exit_index, size) + 1,
+        holding=(trade >= 0) & (np.arange(size) < trades.exit_index[trade]),
+        move=candles.close / trades.entry_price[trade] - 1.0,
+    )
+
+
+def _equity_curve(
+    candles: Candles,
+    trades: Trades,
+    *,
+    initial_capital: float,
+    position_size: float,
+    fee: float,
+    held: Exposure | None = None,
+) -> np.ndarray:
+    """Mark-to-market equity with ``position_size`` of equity committed at each entry.
+
+    Pass ``held`` to reuse the bar-to-trade mapping across position sizes and fees.
+    """
+
+    size = len(candles)
+    cost = position_size * fee
+    growth = 1.0 + position_size * trades.returns - 2.0 * cost
+    levels = initial_capital * np.concatenate(([1.0], np.cumprod(growth)))
+    if not len(trades):
+        return np.full(size, initial_capital)
+
+    held = held or exposure(candles, trades)
+    marked = levels[held.trade] * (1.0 - cost + position_size * held.move)
+    return np.where(held.holding, marked, levels[held.closed])
+
+
+def compute_kpis(equity: np.ndarray, trades: Trades, *, initial_capital: float, bars_per_year: float) -> Dict[str, float]:
+    size = equity.shape[0]
+    if size == 0:
+        return {
+            "totalReturn": 0.0,
+            "cagr": 0.0,
+            "maxDrawdown": 0.0,
+            "sharpe": 0.0,
+            "trades": 0,
+            "winRate": 0.0,
+            "averageTradeReturn": 0.0,
+            "exposure": 0.0,
+        }
+    total = float(equity[-1] / initial_capital)
+    bar_returns = np.diff(equity) / equity[:-1]
+    deviation = float(bar_returns.std()) if bar_returns.size else 0.0
+    returns = trades.returns
+    held = float((trades.exit_index - trades.entry_index).sum()) / size
+    return {
+        "totalReturn": total - 1.0,
+        "cagr": total ** (bars_per_year / size) - 1.0 if total > 0 else -1.0,
+        "maxDrawdown": float(np.max(1.0 - equity / np.maximum.accumulate(equity))),
+        "sharpe": float(bar_returns.mean()) / deviation * float(np.sqrt(bars_per_year)) if deviation > 0 else 0.0,
+        "trades": len(trades),
+        "winRate": float((returns > 0).mean()) if len(trades) else 0.0,
+        "averageTradeReturn": float(returns.mean()) if len(trades) else 0.0,
+        "exposure": held,
+    }
+
+
+def execute_backtest(
+    candles: Candles,
+    parameters: StrategyParameters,
+    *,
+    initial_capital: float = 10_000.0,
+    cache: "IndicatorCache | None" = None,
+) -> BacktestResult:
+    """Run the EMA crossover chain over ``candles``; positions open and close at bar closes.
+
+    With a ``cache``, the EMA arrays are shared with other backtests over the same candles.
+    """
+
+    if cache is not None:
+        fast = cache.indicator(candles, "ema", parameters.fast)
+        slow = cache.indicator(candles, "ema", parameters.slow)
+    else:
+        fast = ema(candles.close, parameters.fast)
+        slow = ema(candles.close, parameters.slow)
+    signals = crossovers(fast, slow, warmup=parameters.slow)
+    trades = _build_trades(candles, signals[parameters.entry], signals[parameters.exit], parameters.stop_loss)
+    equity = _equity_curve(
+        candles,
+        trades,
+        initial_capital=initial_capital,
+        position_size=parameters.position_size,
+        fee=parameters.fee_bps / 10_000,
+    )
+    kpis = compute_kpis(equity, trades, initial_capital=initial_capital, bars_per_year=candles.bars_per_year)
+    return BacktestResult(timestamp=candles.timestamp, equity=equity, trades=trades, kpis=kpis)
@@ -0,0 +1,248 @@
+"""Append-only, memory-mapped OHLCV store on local disk.
+
+Each (symbol, interval) series lives in its own directory with one fixed-width little-endian
+file per column (``timestamp.i8``, ``open.f8``, ...) and a ``manifest.json`` holding the
+committed row count. Reads memory-map the columns and binary-search the sorted timestamp
+column, so slicing any time range is O(log n) and returns views into the page cache without
+copying.
+
+Writers append to every column and only then atomically replace the manifest, so readers never
+observe a partially written bar; bytes past the committed row count (left by a writer that
+died) are truncated by the next append. Appends to a series are serialised across processes
+with ``flock`` on a lock file next to the manifest.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+import numpy as np
+
+from .market_data import Candles, interval_seconds, synthetic_candles
+
+COLUMNS: Tuple[Tuple[str, np.dtype], ...] = (
+    ("timestamp", np.dtype("<i8")),
+    ("open", np.dtype("<f8")),
+    ("high", np.dtype("<f8")),
+    ("low", np.dtype("<f8")),
+    ("close", np.dtype("<f8")),
+    ("volume", np.dtype("<f8")),
+)
+_FORMAT_VERSION = 1
+_SAFE_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+MarketDataSource = Callable[[str, str, datetime, datetime], Candles]
+
+# Where fixture-backed series begin; there is no history before the first stored bar.
+FIXTURE_ORIGIN = datetime(2017, 1, 1, tzinfo=timezone.utc)
+
+
+def _epoch_seconds(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def last_closed_bar(interval: str, now: datetime | None = None) -> datetime:
+    """Close time of the last finished ``interval`` bar as of ``now`` (default: the current time)."""
+
+    step = interval_seconds(interval)
+    return datetime.fromtimestamp(_epoch_seconds(now or _utcnow()) // step * step, tz=timezone.utc)
+
+
+def _column_file(column: str, dtype: np.dtype) -> str:
+    return f"{column}.{dtype.kind}{dtype.itemsize}"
+
+
+class CandleStore:
+    """Columnar candle files under ``root``, one directory per ``<symbol>/<interval>``."""
+
+    def __init__(self, root: str | os.PathLike[str]) -> None:
+        self.root = Path(root)
+
+    def _series_dir(self, symbol: str, interval: str) -> Path:
+        interval_seconds(interval)
+        if not _SAFE_NAME.match(symbol):
+            raise ValueError(f"Unsupported symbol {symbol!r} for the candle store")
+        return self.root / symbol / interval
+
+    @staticmethod
+    def _manifest(directory: Path) -> Dict[str, Any]:
+        try:
+            return json.loads((directory / "manifest.json").read_text("utf-8"))
+        except FileNotFoundError:
+            return {"version": _FORMAT_VERSION, "rows": 0, "first": None, "last": None}
+
+    @contextmanager
+    def _locked(self, directory: Path) -> Iterator[None]:
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / ".lock", "a+b") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def bounds(self, symbol: str, interval: str) -> Tuple[int, int] | None:
+        """Epoch seconds of the first and last stored bar, or ``None`` for an empty series."""
+
+        manifest = self._manifest(self._series_dir(symbol, interval))
+        if not manifest["rows"]:
+            return None
+        return int(manifest["first"]), int(manifest["last"])
+
+    def append(self, candles: Candles) -> int:
+        """Append bars newer than the last stored one; returns how many were written.
+
+        Bars at or before the stored tail are skipped, so overlapping fetches are harmless.
+        """
+
+        directory = self._series_dir(candles.symbol, candles.interval)
+        with self._locked(directory):
+            return self._append_locked(directory, candles)
+
+    def _append_locked(self, directory: Path, candles: Candles) -> int:
+        manifest = self._manifest(directory)
+        rows = int(manifest["rows"])
+        timestamps = np.asarray(candles.timestamp, dtype=np.int64)
+        keep = slice(None)
+        if rows:
+            keep = slice(int(np.searchsorted(timestamps, int(manifest["last"]), side="right")), None)
+            timestamps = timestamps[keep]
+        if timestamps.shape[0] == 0:
+            return 0
+        if np.any(timestamps[1:] <= timestamps[:-1]):
+            raise ValueError("Candle timestamps must be strictly increasing")
+
+        for column, dtype in COLUMNS:
+            path = directory / _column_file(column, dtype)
+            values = np.asarray(getattr(candles, column))[keep].astype(dtype, copy=False)
+            with open(path, "ab") as handle:
+                committed = rows * dtype.itemsize
+                if handle.tell() != committed:
+                    # Drop bytes from an append that never reached the manifest.
+                    handle.truncate(committed)
+                values.tofile(handle)
+
+        updated = {
+            "version": _FORMAT_VERSION,
+            "rows": rows + int(timestamps.shape[0]),
+            "first": int(manifest["first"]) if rows else int(timestamps[0]),
+            "last": int(timestamps[-1]),
+        }
+        pending = directory / "manifest.json.tmp"
+        pending.write_text(json.dumps(updated), "utf-8")
+        os.replace(pending, directory / "manifest.json")
+        return int(timestamps.shape[0])
+
+    def ensure(
+        self,
+        symbol: str,
+        interval: str,
+        end: datetime,
+        fetch: MarketDataSource,
+        *,
+        since: datetime,
+        now: datetime | None = None,
+    ) -> int:
+        """Fetch and append whatever is missing up to ``end``; an empty series starts at ``since``.
+
+        The store only grows forward: history before the first stored bar is never backfilled.
+        ``end`` is clamped to the close of the last finished bar as of ``now``, so a bar that is
+        still forming is never committed with partial prices.
+        """
+
+        step = interval_seconds(interval)
+        end = min(end, last_closed_bar(interval, now))
+
+        directory = self._series_dir(symbol, interval)
+        with self._locked(directory):
+            manifest = self._manifest(directory)
+            if manifest["rows"]:
+                start = datetime.fromtimestamp(int(manifest["last"]) + step, tz=timezone.utc)
+            else:
+                start = since
+            if _epoch_seconds(start) >= _epoch_seconds(end):
+                return 0
+            return self._append_locked(directory, fetch(symbol, interval, start, end))
+
+    def read(
+        self,
+        symbol: str,
+        interval: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> Candles:
+        """Bars in ``[start, end)`` as read-only views over the memory-mapped columns."""
+
+        directory = self._series_dir(symbol, interval)
+        rows = int(self._manifest(directory)["rows"])
+        if rows == 0:
+            return Candles(symbol, interval, *(np.empty(0, dtype=dtype) for _, dtype in COLUMNS))
+
+        columns = [
+            np.asarray(np.memmap(directory / _column_file(column, dtype), dtype=dtype, mode="r", shape=(rows,)))
+            for column, dtype in COLUMNS
+        ]
+        timestamps = columns[0]
+        lo = int(np.searchsorted(timestamps, _epoch_seconds(start), side="left")) if start else 0
+        hi = int(np.searchsorted(timestamps, _epoch_seconds(end), side="left")) if end else rows
+        return Candles(symbol, interval, *(values[lo:hi] for values in columns))
+
+
+def fixture_source(store: CandleStore, *, start_price: float = 30_000.0) -> MarketDataSource:
+    """Synthetic stand-in for the upstream market-data service.
+
+    Each fetch continues the series from its last stored close, so incremental appends stay
+    continuous instead of restarting at ``start_price``.
+    """
+
+    def fetch(symbol: str, interval: str, start: datetime, end: datetime) -> Candles:
+        stored = store.read(symbol, interval)
+        price = float(stored.close[-1]) if len(stored) else start_price
+        return synthetic_candles(symbol, interval, start, end, start_price=price)
+
+    return fetch
+
+
+_STORES: Dict[str, CandleStore] = {}
+
+
+def get_candle_store() -> CandleStore:
+    """Store rooted at ``CANDLE_STORE_PATH`` (default ``~/.cache/blockbuilders/candles``)."""
+
+    root = os.environ.get("CANDLE_STORE_PATH") or str(Path.home() / ".cache" / "blockbuilders" / "candles")
+    store = _STORES.get(root)
+    if store is None:
+        store = _STORES[root] = CandleStore(root)
+    return store
+
+
+def load_candles(
+    symbol: str,
+    interval: str,
+    start: datetime,
+    end: datetime,
+    *,
+    store: CandleStore | None = None,
+    source: MarketDataSource | None = None,
+) -> Candles:
+    """Candles for a backtest, fetching missing bars up to ``end`` into the local store first.
+
+    ``source`` defaults to :func:`fixture_source` until workers are connected to real market data.
+    """
+
+    store = store or get_candle_store()
+    store.ensure(symbol, interval, end, source or fixture_source(store), since=FIXTURE_ORIGIN)
+    return store.read(symbol, interval, start, end)
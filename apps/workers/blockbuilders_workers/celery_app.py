@@ -2,7 +2,32 @@
 
 from __future__ import annotations
 
-from celery import Celery
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+from celery import Celery, chord
+from celery.result import AsyncResult
+from celery.signals import worker_process_shutdown
+
+from blockbuilders_shared import ExecutionPlan, StrategySeed, compile_strategy
+
+from .backtest import StrategyParameters, execute_backtest
+from .candle_store import last_closed_bar, load_candles
+from .indicator_cache import get_indicator_cache
+from .sweep import (
+    DEFAULT_METRIC,
+    METRICS,
+    assemble,
+    combination_count,
+    ema_indicators,
+    evaluate,
+    iter_chunks,
+    parse_axes,
+    sweep_parameters,
+    sweep_series,
+)
+
+DEFAULT_LOOKBACK = timedelta(days=365)
 
 app = Celery(
     "blockbuilders",
@@ -11,8 +36,149 @@ app = Celery(
 )
 
 
+def _window(start: str | None, end: str | None) -> Tuple[datetime, datetime]:
+    end_at = datetime.fromisoformat(end) if end else datetime.now(timezone.utc)
+    start_at = datetime.fromisoformat(start) if start else end_at - DEFAULT_LOOKBACK
+    return start_at, end_at
+
+
+@worker_process_shutdown.connect
+def _close_indicator_cache(**_: Any) -> None:
+    """Unlink this child's shared indicator segments; prefork children skip ``atexit`` hooks."""
+
+    get_indicator_cache().close()
+
+
 @app.task(bind=True)
 def sample_task(self, *, strategy_id: str) -> str:
     """Placeholder task to verify pipeline wiring."""
 
     return f"Processed strategy {strategy_id}"
+
+
+@app.task(bind=True)
+def run_backtest(
+    self,
+    *,
+    seed: Dict[str, Any],
+    start: str | None = None,
+    end: str | None = None,
+    initial_capital: float = 10_000.0,
+) -> Dict[str, Any]:
+    """Backtest a strategy seed over ``[start, end)`` (ISO-8601; defaults to the last year)."""
+
+    strategy = StrategySeed.model_validate(seed)
+    parameters = StrategyParameters.from_plan(compile_strategy(strategy))
+    start_at, end_at = _window(start, end)
+    candles = load_candles(parameters.symbol, parameters.interval, start_at, end_at)
+    result = execute_backtest(candles, parameters, initial_capital=initial_capital, cache=get_indicator_cache())
+    return {
+        "strategyId": strategy.strategy_id,
+        "versionId": strategy.version_id,
+        "symbol": parameters.symbol,
+        "interval": parameters.interval,
+        "bars": len(candles),
+        **result.to_payload(),
+    }
+
+
+@app.task(bind=True)
+def sweep_chunk(
+    self,
+    *,
+    seed: Dict[str, Any],
+    ranges: Dict[str, Any],
+    indices: List[int],
+    start: str,
+    end: str,
+    initial_capital: float = 10_000.0,
+) -> List[List[Any]]:
+    """Backtest one slice of a sweep's grid as ``[index, kpis, error]`` rows.
+
+    Chunks running on the same host share candles through the memory-mapped store and EMA
+    arrays through the shared indicator cache.
+    """
+
+    plan = compile_strategy(StrategySeed.model_validate(seed))
+    axes = parse_axes(plan, ranges)
+    resolved = sweep_parameters(plan, axes, indices)
+    symbol, interval = sweep_series(plan)
+    candles = load_candles(symbol, interval, *_window(start, end))
+    valid = [(index, parameters) for index, parameters, _ in resolved if parameters is not None]
+    batch = [parameters for _, parameters in valid]
+    indicators = ema_indicators(candles, batch, get_indicator_cache())
+    kpis = evaluate(candles, batch, indicators, initial_capital=initial_capital)
+    rows: List[List[Any]] = [[index, None, error] for index, parameters, error in resolved if parameters is None]
+    rows.extend([index, values, None] for (index, _), values in zip(valid, kpis))
+    return rows
+
+
+@app.task(bind=True)
+def rank_sweep(
+    self,
+    chunks: List[List[List[Any]]],
+    *,
+    seed: Dict[str, Any],
+    ranges: Dict[str, Any],
+    metric: str = DEFAULT_METRIC,
+    top: int = 50,
+) -> Dict[str, Any]:
+    """Chord callback merging every ``sweep_chunk`` into the ranked result matrix."""
+
+    strategy = StrategySeed.model_validate(seed)
+    axes = parse_axes(compile_strategy(strategy), ranges)
+    result = assemble(axes, metric, [tuple(row) for chunk in chunks for row in chunk])
+    return {
+        "strategyId": strategy.strategy_id,
+        "versionId": strategy.version_id,
+        **result.to_payload(top=top),
+    }
+
+
+def sweep_window(
+    plan: ExecutionPlan, start: str | None, end: str | None, *, now: datetime | None = None
+) -> Tuple[datetime, datetime]:
+    """Backtest window for a sweep, ending no later than the last bar closed as of ``now``.
+
+    Chunks may run after later bars close; a window that ended inside a still-forming bar would
+    give early chunks one bar fewer than late ones.
+    """
+
+    start_at, end_at = _window(start, end)
+    _, interval = sweep_series(plan)
+    return start_at, min(end_at, last_closed_bar(interval, now))
+
+
+def dispatch_sweep(
+    *,
+    seed: Dict[str, Any],
+    ranges: Dict[str, Any],
+    start: str | None = None,
+    end: str | None = None,
+    metric: str = DEFAULT_METRIC,
+    initial_capital: float = 10_000.0,
+    chunk_size: int = 100,
+) -> AsyncResult:
+    """Fan a sweep out as a chord of ``sweep_chunk`` tasks ranked by ``rank_sweep``.
+
+    The seed and ranges are validated here so bad requests fail before anything is queued, and
+    the window is pinned once so every chunk backtests the same bars.
+    """
+
+    if metric not in METRICS:
+        raise ValueError(f"Unknown sweep metric {metric!r}; expected one of {METRICS}")
+    plan = compile_strategy(StrategySeed.model_validate(seed))
+    axes = parse_axes(plan, ranges)
+    start_at, end_at = sweep_window(plan, start, end)
+    header = [
+        sweep_chunk.s(
+            seed=seed,
+            ranges=ranges,
+            indices=indices,
+            start=start_at.isoformat(),
+            end=end_at.isoformat(),
+            initial_capital=initial_capital,
+        )
+        for indices in iter_chunks(combination_count(axes), chunk_size)
+    ]
+    return chord(header)(rank_sweep.s(seed=seed, ranges=ranges, metric=metric))
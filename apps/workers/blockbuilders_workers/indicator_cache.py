@@ -0,0 +1,306 @@
+"""Byte-bounded indicator cache shared between worker processes on one host.
+
+Identical strategies (every user's demo seed, for instance) need identical indicator arrays.
+Each worker process keeps an LRU of arrays bounded by ``max_bytes``; with ``shared=True`` an
+array computed by one process is also published as a named POSIX shared-memory segment, and
+other prefork children attach to it instead of recomputing or copying.
+
+Segments are kept out of ``multiprocessing.resource_tracker``: on Python 3.11 it registers
+attaching processes too, and would unlink a segment as soon as any of them exits. Instead, the
+segment header records the owning PID, and the owner unlinks the segment when it evicts the
+entry or closes the cache; processes still mapping it keep a valid view until they evict it
+themselves. A process that attaches to a segment whose owner has died adopts it, and every new
+cache sweeps away segments whose owner is gone, so a killed worker cannot leak memory. A segment
+whose header has no owner yet is still being created and is left alone for a grace period.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+try:
+    import _posixshmem
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    _posixshmem = None
+
+from .indicators import INDICATORS
+from .market_data import Candles
+
+LOGGER = logging.getLogger(__name__)
+
+IndicatorKey = Tuple[str, str, int, int, int, str, str, Tuple[Any, ...]]
+
+# Segment header: element count, a ready flag written after the payload, and the owning PID.
+_HEADER = np.dtype([("length", "<i8"), ("ready", "<i8"), ("owner", "<i8")])
+_SEGMENT_PREFIX = "bbind"
+_SHM_DIRECTORY = Path("/dev/shm")
+# How long a segment may go without an owner before the sweep treats its publisher as dead.
+_UNOWNED_GRACE_SECONDS = 60.0
+
+
+def indicator_key(candles: Candles, kind: str, *params: Any) -> IndicatorKey:
+    """Identify an indicator by symbol, interval, data range and content, kind and parameters.
+
+    The close-price fingerprint keeps a rewritten candle range from being served stale arrays.
+    """
+
+    if len(candles):
+        first, last = int(candles.timestamp[0]), int(candles.timestamp[-1])
+    else:
+        first = last = 0
+    return (candles.symbol, candles.interval, first, last, len(candles), candles.fingerprint, kind, tuple(params))
+
+
+def _segment_name(key: IndicatorKey) -> str:
+    # Short enough for platforms that cap POSIX shared-memory names at 31 characters.
+    return _SEGMENT_PREFIX + hashlib.blake2b(repr(key).encode("utf-8"), digest_size=10).hexdigest()
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _untrack(segment: shared_memory.SharedMemory) -> None:
+    try:
+        resource_tracker.unregister(segment._name, "shared_memory")  # type: ignore[attr-defined]
+    except Exception as exc:  # pragma: no cover - defensive logging
+        LOGGER.debug("Could not unregister shared memory segment %s: %s", segment.name, exc)
+
+
+def sweep_orphaned_segments(directory: Path = _SHM_DIRECTORY) -> int:
+    """Unlink indicator segments whose owning process has exited; returns how many were removed."""
+
+    if _posixshmem is None or not directory.is_dir():
+        return 0
+    removed = 0
+    for path in directory.glob(f"{_SEGMENT_PREFIX}*"):
+        try:
+            segment = shared_memory.SharedMemory(name=path.name)
+            created_at = path.stat().st_mtime
+        except (FileNotFoundError, OSError):
+            continue
+        _untrack(segment)
+        try:
+            if segment.size >= _HEADER.itemsize:
+                header = np.ndarray((), dtype=_HEADER, buffer=segment.buf)
+                owner = int(header["owner"])
+                del header
+            else:
+                owner = 0
+            if owner == 0:
+                # The publisher has created the segment but not stamped its PID yet.
+                orphaned = time.time() - created_at > _UNOWNED_GRACE_SECONDS
+            else:
+                orphaned = not _pid_alive(owner)
+            if orphaned:
+                _posixshmem.shm_unlink(segment._name)  # type: ignore[attr-defined]
+                removed += 1
+        except FileNotFoundError:
+            pass
+        finally:
+            segment.close()
+    if removed:
+        LOGGER.info("Removed %s orphaned indicator cache segments", removed)
+    return removed
+
+
+@dataclass
+class _Entry:
+    array: np.ndarray
+    segment: shared_memory.SharedMemory | None = None
+    owner: bool = False
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.array.nbytes)
+
+
+class IndicatorCache:
+    """LRU of read-only float64 indicator arrays, bounded by ``max_bytes`` per process."""
+
+    def __init__(self, *, max_bytes: int = 256 * 1024 * 1024, shared: bool = True) -> None:
+        self.max_bytes = max_bytes
+        self.shared = shared and _posixshmem is not None
+        self._entries: "OrderedDict[IndicatorKey, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        # Segments whose close() failed because callers still hold views; retried later.
+        self._retired: List[shared_memory.SharedMemory] = []
+        self._hits = 0
+        self._shared_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def indicator(self, candles: Candles, kind: str, *params: Any) -> np.ndarray:
+        """Return ``INDICATORS[kind](candles.close, *params)``, computing it at most once per host."""
+
+        compute = INDICATORS[kind]
+        return self.get_or_compute(indicator_key(candles, kind, *params), lambda: compute(candles.close, *params))
+
+    def get_or_compute(self, key: IndicatorKey, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry.array
+
+        entry = self._attach(key) if self.shared else None
+        attached = entry is not None
+        if entry is None:
+            array = np.ascontiguousarray(compute(), dtype=np.float64)
+            entry = self._publish(key, array) if self.shared else None
+            if entry is None:
+                array.setflags(write=False)
+                entry = _Entry(array)
+
+        with self._lock:
+            if attached:
+                self._shared_hits += 1
+            else:
+                self._misses += 1
+            existing = self._entries.get(key)
+            if existing is not None:
+                # Another thread filled the slot first; keep theirs and drop ours.
+                self._release_locked(entry)
+                return existing.array
+            self._entries[key] = entry
+            self._bytes += entry.nbytes
+            self._evict_locked()
+        return entry.array
+
+    def _attach(self, key: IndicatorKey) -> _Entry | None:
+        try:
+            segment = shared_memory.SharedMemory(name=_segment_name(key))
+        except (FileNotFoundError, OSError):
+            return None
+        _untrack(segment)
+        header = np.ndarray((), dtype=_HEADER, buffer=segment.buf)
+        if not header["ready"]:
+            # Still being written by its publisher; compute locally rather than wait.
+            del header
+            with self._lock:
+                self._close_locked(segment)
+            return None
+        length = int(header["length"])
+        owner = not _pid_alive(int(header["owner"]))
+        if owner:
+            # The publisher died without unlinking; adopt the segment so it is cleaned up.
+            header["owner"] = os.getpid()
+        del header
+        array = np.ndarray((length,), dtype=np.float64, buffer=segment.buf, offset=_HEADER.itemsize)
+        array.setflags(write=False)
+        return _Entry(array, segment, owner=owner)
+
+    def _publish(self, key: IndicatorKey, array: np.ndarray) -> _Entry | None:
+        try:
+            segment = shared_memory.SharedMemory(
+                name=_segment_name(key),
+                create=True,
+                size=_HEADER.itemsize + max(array.nbytes, 1),
+            )
+        except FileExistsError:
+            return self._attach(key)
+        except OSError as exc:  # pragma: no cover - defensive logging
+            LOGGER.warning("Shared indicator cache unavailable, keeping arrays local: %s", exc)
+            self.shared = False
+            return None
+        _untrack(segment)
+        header = np.ndarray((), dtype=_HEADER, buffer=segment.buf)
+        header["owner"] = os.getpid()
+        view = np.ndarray((array.shape[0],), dtype=np.float64, buffer=segment.buf, offset=_HEADER.itemsize)
+        view[:] = array
+        view.setflags(write=False)
+        header["length"] = array.shape[0]
+        header["ready"] = 1
+        del header
+        return _Entry(view, segment, owner=True)
+
+    def _evict_locked(self) -> None:
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.nbytes
+            self._evictions += 1
+            self._release_locked(entry)
+
+    def _release_locked(self, entry: _Entry) -> None:
+        segment = entry.segment
+        entry.array = np.empty(0)
+        if segment is None:
+            return
+        if entry.owner:
+            try:
+                # SharedMemory.unlink() would also unregister from the tracker we never joined.
+                _posixshmem.shm_unlink(segment._name)  # type: ignore[attr-defined]
+            except FileNotFoundError:
+                pass
+        self._close_locked(segment)
+
+    def _close_locked(self, segment: shared_memory.SharedMemory) -> None:
+        pending, self._retired = self._retired + [segment], []
+        for candidate in pending:
+            try:
+                candidate.close()
+            except BufferError:
+                self._retired.append(candidate)
+
+    def close(self) -> None:
+        """Drop every entry and unlink the segments this process published."""
+
+        with self._lock:
+            entries, self._entries = list(self._entries.values()), OrderedDict()
+            self._bytes = 0
+            for entry in entries:
+                self._release_locked(entry)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "maxBytes": self.max_bytes,
+            "hits": self._hits,
+            "sharedHits": self._shared_hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "retiredSegments": len(self._retired),
+        }
+
+
+_CACHE: IndicatorCache | None = None
+_CACHE_PID: int | None = None
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """Per-process cache, created lazily so each prefork child gets its own after the fork."""
+
+    global _CACHE, _CACHE_PID
+    if _CACHE is None or _CACHE_PID != os.getpid():
+        _CACHE = IndicatorCache(
+            max_bytes=int(os.environ.get("INDICATOR_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+            shared=os.environ.get("INDICATOR_CACHE_SHARED", "true").lower() not in {"0", "false", "no"},
+        )
+        _CACHE_PID = os.getpid()
+        if _CACHE.shared:
+            sweep_orphaned_segments()
+        atexit.register(_CACHE.close)
+    return _CACHE
@@ -0,0 +1,93 @@
+"""Vectorized technical indicators over NumPy price arrays."""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+# Largest factor the blockwise recurrence rescales by; bounds the float64 rounding error to
+# roughly 1e-10 relative to the values involved.
+_MAX_SCALE = 1e6
+
+
+def linear_recurrence(values: np.ndarray, decay: float, initial: float = 0.0) -> np.ndarray:
+    """Solve ``y[t] = decay * y[t - 1] + values[t]`` with ``y[-1] = initial``.
+
+    The series is cut into blocks short enough that ``decay ** -block`` stays below
+    ``_MAX_SCALE``. Inside each block the recurrence becomes a rescaled cumulative sum, and the
+    value carried from one block into the next follows the same recurrence over block ends,
+    which is solved recursively. Every step is a whole-array NumPy operation.
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    size = values.shape[0]
+    if size == 0:
+        return values.copy()
+    if decay == 0.0:
+        return values.copy()
+    if not 0.0 < decay < 1.0:
+        raise ValueError("decay must be in [0, 1)")
+
+    block = min(size, max(2, int(math.log(_MAX_SCALE) / -math.log(decay)) + 1))
+    blocks = -(-size // block)
+    padded = np.zeros(blocks * block)
+    padded[:size] = values
+    grid = padded.reshape(blocks, block)
+
+    steps = np.arange(block)
+    powers = decay**steps
+    local = np.cumsum(grid / powers, axis=1)
+    local *= powers
+
+    carries = np.empty(blocks)
+    carries[0] = initial
+    if blocks > 1:
+        # carries[i] is y at the end of block i - 1.
+        carries[1:] = linear_recurrence(local[:-1, -1], decay**block, initial)
+    local += carries[:, None] * (powers * decay)
+    return local.reshape(-1)[:size]
+
+
+def ema(close: np.ndarray, period: int) -> np.ndarray:
+    """Exponential moving average seeded with the first close, ``alpha = 2 / (period + 1)``."""
+
+    if period <= 0:
+        raise ValueError("EMA period must be positive")
+    close = np.asarray(close, dtype=np.float64)
+    if close.shape[0] == 0:
+        return close.copy()
+    alpha = 2.0 / (period + 1)
+    return linear_recurrence(alpha * close, 1.0 - alpha, initial=float(close[0]))
+
+
+def sma(close: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average; the first ``period - 1`` values average the bars seen so far."""
+
+    if period <= 0:
+        raise ValueError("SMA period must be positive")
+    close = np.asarray(close, dtype=np.float64)
+    totals = np.cumsum(close)
+    totals[period:] = totals[period:] - totals[:-period]
+    counts = np.minimum(np.arange(1, close.shape[0] + 1), period)
+    return totals / counts
+
+
+def rsi(close: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's relative strength index (smoothing ``alpha = 1 / period``), 50 on the first bar."""
+
+    if period <= 0:
+        raise ValueError("RSI period must be positive")
+    close = np.asarray(close, dtype=np.float64)
+    if close.shape[0] == 0:
+        return close.copy()
+    change = np.diff(close, prepend=close[0])
+    alpha = 1.0 / period
+    gains = linear_recurrence(alpha * np.maximum(change, 0.0), 1.0 - alpha)
+    losses = linear_recurrence(alpha * np.maximum(-change, 0.0), 1.0 - alpha)
+    total = gains + losses
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, 100.0 * gains / total, 50.0)
+
+
+INDICATORS = {"ema": ema, "sma": sma, "rsi": rsi}
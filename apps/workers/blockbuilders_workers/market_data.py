@@ -0,0 +1,97 @@
+"""OHLCV candle arrays and a deterministic synthetic market-data source."""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from functools import cached_property
+from datetime import datetime, timezone
+
+import numpy as np
+
+_INTERVAL_UNITS = {"m": 60, "h": 3_600, "d": 86_400, "w": 604_800}
+
+
+def interval_seconds(interval: str) -> int:
+    """Parse ``1m``/``15m``/``4h``/``1d``-style intervals into seconds."""
+
+    try:
+        count, unit = int(interval[:-1]), _INTERVAL_UNITS[interval[-1]]
+    except (KeyError, ValueError, IndexError) as exc:
+        raise ValueError(f"Unsupported candle interval {interval!r}") from exc
+    if count <= 0:
+        raise ValueError(f"Unsupported candle interval {interval!r}")
+    return count * unit
+
+
+@dataclass(frozen=True)
+class Candles:
+    """Column arrays for one symbol and interval; ``timestamp`` is epoch seconds (int64)."""
+
+    symbol: str
+    interval: str
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.timestamp.shape[0])
+
+    @property
+    def bars_per_year(self) -> float:
+        return 365 * 86_400 / interval_seconds(self.interval)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Digest of the close prices, so data derived from them can be keyed by content."""
+
+        return hashlib.blake2b(np.ascontiguousarray(self.close).data, digest_size=8).hexdigest()
+
+
+def _epoch_seconds(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def synthetic_candles(
+    symbol: str,
+    interval: str,
+    start: datetime,
+    end: datetime,
+    *,
+    start_price: float = 30_000.0,
+    annual_volatility: float = 0.6,
+) -> Candles:
+    """Geometric Brownian motion candles covering ``[start, end)``.
+
+    The random stream is seeded from the symbol, interval and first bar, so the same request
+    always yields the same prices. :func:`~blockbuilders_workers.candle_store.fixture_source`
+    serves it in place of the market-data service until real history is wired up.
+    """
+
+    step = interval_seconds(interval)
+    first = -(-_epoch_seconds(start) // step) * step
+    timestamps = np.arange(first, _epoch_seconds(end), step, dtype=np.int64)
+    if timestamps.shape[0] == 0:
+        empty = np.empty(0)
+        return Candles(symbol, interval, timestamps, empty, empty, empty, empty, empty)
+
+    sigma = annual_volatility * np.sqrt(step / (365 * 86_400))
+    digest = hashlib.blake2b(f"{symbol}|{interval}|{first}".encode("utf-8"), digest_size=8).digest()
+    rng = np.random.default_rng(int.from_bytes(digest, "big"))
+    shocks = rng.standard_normal(timestamps.shape[0] * 3)
+    returns = shocks[0::3] * sigma
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.empty_like(close)
+    open_[0] = start_price
+    open_[1:] = close[:-1]
+    spread = np.abs(shocks[1::3]) * sigma * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - np.abs(shocks[2::3]) * sigma * close
+    volume = 10.0 + np.abs(shocks[1::3]) * 100.0
+    return Candles(symbol, interval, timestamps, open_, high, low, close, volume)
+
@@ -0,0 +1,341 @@
+"""Grid-search backtests over ranges of block ``config`` values.
+
+A sweep takes ranges keyed ``"<block id or kind>.<config key>"`` (``{"indicator.fast": [8, 12],
+"risk.stopLoss": {"start": 0.01, "stop": 0.05, "step": 0.01}}``), expands their cartesian
+product and backtests every combination over one set of candles.
+
+Work that combinations have in common is done once: every distinct EMA period is computed a
+single time (through the :class:`~blockbuilders_workers.indicator_cache.IndicatorCache`, so
+parallel workers on a host share the arrays), crossover signals are reused across risk and
+execution settings, and trades are reused across position sizes and fees. Only the equity
+curve and KPIs are computed per combination. Combinations can be spread over a local fork
+process pool, which inherits the candles and indicators without copying them, or over Celery
+tasks (see :mod:`blockbuilders_workers.celery_app`).
+"""
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from blockbuilders_shared import ExecutionPlan, StrategyGraphError
+
+from .backtest import (
+    StrategyParameters,
+    _build_trades,
+    _equity_curve,
+    compute_kpis,
+    crossovers,
+    exposure,
+    resolve_chain,
+)
+from .indicator_cache import IndicatorCache
+from .market_data import Candles
+
+MAX_COMBINATIONS = 20_000
+DEFAULT_METRIC = "sharpe"
+METRICS = ("totalReturn", "cagr", "maxDrawdown", "sharpe", "trades", "winRate", "averageTradeReturn", "exposure")
+# Metrics where a smaller value ranks higher.
+_ASCENDING = frozenset({"maxDrawdown"})
+
+
+@dataclass(frozen=True)
+class SweepAxis:
+    name: str
+    block_id: str
+    key: str
+    values: Tuple[Any, ...]
+
+
+def _expand_range(name: str, spec: Mapping[str, Any]) -> Tuple[Any, ...]:
+    try:
+        start, stop, step = spec["start"], spec["stop"], spec["step"]
+    except KeyError as exc:
+        raise ValueError(f"Range for {name!r} needs start, stop and step") from exc
+    if not step or step <= 0:
+        raise ValueError(f"Range step for {name!r} must be positive")
+    if all(isinstance(value, int) for value in (start, stop, step)):
+        return tuple(range(start, stop + 1, step))
+    # Inclusive of ``stop`` when it falls on a step, without float drift in the values.
+    count = int(math.floor((stop - start) / step + 1e-9)) + 1
+    return tuple(round(start + step * index, 12) for index in range(max(count, 0)))
+
+
+def parse_axes(plan: ExecutionPlan, ranges: Mapping[str, Any]) -> Tuple[SweepAxis, ...]:
+    """Resolve ``ranges`` against the plan's blocks, in the order given.
+
+    A range is a list of values, a ``{"start", "stop", "step"}`` mapping (inclusive) or a
+    single value. Raises :class:`ValueError` for unknown blocks, the data-source block, empty
+    ranges and grids larger than ``MAX_COMBINATIONS``.
+    """
+
+    axes: List[SweepAxis] = []
+    for name, spec in ranges.items():
+        target, _, key = name.rpartition(".")
+        if not target or not key:
+            raise ValueError(f"Sweep key {name!r} must look like '<block id or kind>.<config key>'")
+        matches = [step for step in plan.steps if step.block_id == target] or list(plan.by_kind(target))
+        if len(matches) != 1:
+            problem = "matches no block" if not matches else "is ambiguous"
+            raise ValueError(f"Sweep key {name!r} {problem}")
+        if matches[0].kind == "data-source":
+            # Every combination must run over the same candles; sweep one series at a time.
+            raise ValueError(f"Sweep key {name!r} targets the data source, which cannot be swept")
+        if isinstance(spec, Mapping):
+            values = _expand_range(name, spec)
+        elif isinstance(spec, (list, tuple)):
+            values = tuple(spec)
+        else:
+            values = (spec,)
+        if not values:
+            raise ValueError(f"Sweep range for {name!r} is empty")
+        axes.append(SweepAxis(name=name, block_id=matches[0].block_id, key=key, values=values))
+
+    total = math.prod(len(axis.values) for axis in axes)
+    if total > MAX_COMBINATIONS:
+        raise ValueError(f"Sweep expands to {total} combinations; the limit is {MAX_COMBINATIONS}")
+    return tuple(axes)
+
+
+def combination_count(axes: Sequence[SweepAxis]) -> int:
+    return math.prod(len(axis.values) for axis in axes)
+
+
+def combination(axes: Sequence[SweepAxis], index: int) -> Tuple[Any, ...]:
+    """Values of combination ``index`` in row-major grid order (last axis varies fastest)."""
+
+    coordinates = np.unravel_index(index, tuple(len(axis.values) for axis in axes)) if axes else ()
+    return tuple(axis.values[int(position)] for axis, position in zip(axes, coordinates))
+
+
+def apply_overrides(plan: ExecutionPlan, axes: Sequence[SweepAxis], values: Sequence[Any]) -> ExecutionPlan:
+    """Copy of ``plan`` with each axis' config key set; ``graph_hash`` still names the base graph."""
+
+    overrides: Dict[str, Dict[str, Any]] = {}
+    for axis, value in zip(axes, values):
+        overrides.setdefault(axis.block_id, {})[axis.key] = value
+    steps = tuple(
+        replace(step, config=MappingProxyType({**step.config, **overrides[step.block_id]}))
+        if step.block_id in overrides
+        else step
+        for step in plan.steps
+    )
+    return replace(plan, steps=steps)
+
+
+def sweep_parameters(
+    plan: ExecutionPlan, axes: Sequence[SweepAxis], indices: Sequence[int]
+) -> List[Tuple[int, StrategyParameters | None, str | None]]:
+    """Strategy parameters per combination, or the validation error that rules it out."""
+
+    resolved: List[Tuple[int, StrategyParameters | None, str | None]] = []
+    for index in indices:
+        try:
+            parameters = StrategyParameters.from_plan(apply_overrides(plan, axes, combination(axes, index)))
+        except StrategyGraphError as exc:
+            resolved.append((index, None, str(exc)))
+        else:
+            resolved.append((index, parameters, None))
+    return resolved
+
+
+def evaluate(
+    candles: Candles,
+    parameters: Sequence[StrategyParameters],
+    indicators: Mapping[int, np.ndarray],
+    *,
+    initial_capital: float,
+) -> List[Dict[str, float]]:
+    """KPIs per parameter set, in input order, reusing signals and trades between sets that share them.
+
+    Sets are grouped by EMA pair and then by trade rules, so only the current group's signals,
+    trades and exposure are held at once, however many distinct groups the grid has.
+    """
+
+    groups: Dict[Tuple[int, int], Dict[Tuple[Any, ...], List[int]]] = {}
+    for position, item in enumerate(parameters):
+        rules = (item.entry, item.exit, item.stop_loss)
+        groups.setdefault((item.fast, item.slow), {}).setdefault(rules, []).append(position)
+
+    results: List[Dict[str, float]] = [{}] * len(parameters)
+    for (fast, slow), by_rules in groups.items():
+        crossings = crossovers(indicators[fast], indicators[slow], warmup=slow)
+        for (entry, exit_, stop_loss), positions in by_rules.items():
+            trades = _build_trades(candles, crossings[entry], crossings[exit_], stop_loss)
+            held = exposure(candles, trades) if len(trades) else None
+            for position in positions:
+                item = parameters[position]
+                equity = _equity_curve(
+                    candles,
+                    trades,
+                    initial_capital=initial_capital,
+                    position_size=item.position_size,
+                    fee=item.fee_bps / 10_000,
+                    held=held,
+                )
+                results[position] = compute_kpis(
+                    equity, trades, initial_capital=initial_capital, bars_per_year=candles.bars_per_year
+                )
+    return results
+
+
+def sweep_series(plan: ExecutionPlan) -> Tuple[str, str]:
+    """Symbol and interval every combination of a sweep over ``plan`` runs on."""
+
+    config = resolve_chain(plan)["data-source"].config
+    try:
+        return str(config["symbol"]), str(config["interval"])
+    except KeyError as exc:
+        raise StrategyGraphError(f"Invalid block configuration: {exc}") from exc
+
+
+def ema_indicators(
+    candles: Candles, parameters: Sequence[StrategyParameters | None], cache: IndicatorCache
+) -> Dict[int, np.ndarray]:
+    """Every distinct EMA period the parameter sets need, each computed once."""
+
+    periods = sorted({period for item in parameters if item is not None for period in (item.fast, item.slow)})
+    return {period: cache.indicator(candles, "ema", period) for period in periods}
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    axes: Tuple[SweepAxis, ...]
+    metric: str
+    kpis: Tuple[Dict[str, float] | None, ...]
+    errors: Mapping[int, str]
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return tuple(len(axis.values) for axis in self.axes)
+
+    def matrix(self, metric: str | None = None) -> np.ndarray:
+        """``metric`` for every combination shaped like the grid; NaN where it was invalid."""
+
+        metric = metric or self.metric
+        values = [np.nan if kpis is None else float(kpis[metric]) for kpis in self.kpis]
+        return np.asarray(values, dtype=np.float64).reshape(self.shape)
+
+    def ranking(self) -> List[int]:
+        """Valid combination indices, best first; ties keep grid order."""
+
+        scores = self.matrix().reshape(-1)
+        valid = np.flatnonzero(~np.isnan(scores))
+        keys = scores[valid] if self.metric in _ASCENDING else -scores[valid]
+        return valid[np.argsort(keys, kind="stable")].tolist()
+
+    def to_payload(self, *, top: int = 50) -> Dict[str, Any]:
+        """JSON-friendly ranked summary; ``matrix`` holds ``metric`` with ``None`` for invalid cells."""
+
+        matrix = self.matrix()
+        ranked = [
+            {
+                "rank": position + 1,
+                "index": index,
+                "parameters": {axis.name: value for axis, value in zip(self.axes, combination(self.axes, index))},
+                "kpis": self.kpis[index],
+            }
+            for position, index in enumerate(self.ranking()[:top])
+        ]
+        return {
+            "metric": self.metric,
+            "axes": [{"name": axis.name, "values": list(axis.values)} for axis in self.axes],
+            "combinations": len(self.kpis),
+            "invalid": len(self.errors),
+            "matrix": np.where(np.isnan(matrix), None, matrix).tolist(),
+            "ranked": ranked,
+            "errors": {str(index): message for index, message in sorted(self.errors.items())[:top]},
+        }
+
+
+def assemble(
+    axes: Tuple[SweepAxis, ...],
+    metric: str,
+    rows: Sequence[Tuple[int, Dict[str, float] | None, str | None]],
+) -> SweepResult:
+    """Build a :class:`SweepResult` from ``(index, kpis, error)`` rows in any order."""
+
+    kpis: List[Dict[str, float] | None] = [None] * combination_count(axes)
+    errors: Dict[int, str] = {}
+    for index, values, error in rows:
+        kpis[index] = values
+        if error is not None:
+            errors[index] = error
+    return SweepResult(axes=axes, metric=metric, kpis=tuple(kpis), errors=errors)
+
+
+# Inherited by forked pool workers; never pickled.
+_POOL_STATE: Dict[str, Any] = {}
+
+
+def _init_pool(candles: Candles, indicators: Dict[int, np.ndarray], initial_capital: float) -> None:
+    _POOL_STATE.update(candles=candles, indicators=indicators, initial_capital=initial_capital)
+
+
+def _evaluate_chunk(parameters: List[StrategyParameters]) -> List[Dict[str, float]]:
+    return evaluate(
+        _POOL_STATE["candles"],
+        parameters,
+        _POOL_STATE["indicators"],
+        initial_capital=_POOL_STATE["initial_capital"],
+    )
+
+
+def run_sweep(
+    candles: Candles,
+    plan: ExecutionPlan,
+    ranges: Mapping[str, Any],
+    *,
+    metric: str = DEFAULT_METRIC,
+    initial_capital: float = 10_000.0,
+    workers: int = 1,
+    cache: IndicatorCache | None = None,
+) -> SweepResult:
+    """Backtest every combination of ``ranges`` over ``candles``, optionally in a fork pool."""
+
+    if metric not in METRICS:
+        raise ValueError(f"Unknown sweep metric {metric!r}; expected one of {METRICS}")
+    axes = parse_axes(plan, ranges)
+    resolved = sweep_parameters(plan, axes, range(combination_count(axes)))
+    valid = [(index, parameters) for index, parameters, _ in resolved if parameters is not None]
+
+    own_cache = cache is None
+    cache = cache or IndicatorCache(max_bytes=1 << 62, shared=False)
+    try:
+        indicators = ema_indicators(candles, [parameters for _, parameters in valid], cache)
+        batch = [parameters for _, parameters in valid]
+        if workers > 1 and len(batch) > workers and "fork" in multiprocessing.get_all_start_methods():
+            size = -(-len(batch) // (workers * 4))
+            chunks = [batch[offset : offset + size] for offset in range(0, len(batch), size)]
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_pool,
+                initargs=(candles, indicators, initial_capital),
+            ) as pool:
+                kpis = [row for chunk in pool.map(_evaluate_chunk, chunks) for row in chunk]
+        else:
+            kpis = evaluate(candles, batch, indicators, initial_capital=initial_capital)
+    finally:
+        if own_cache:
+            cache.close()
+
+    rows: List[Tuple[int, Dict[str, float] | None, str | None]] = [
+        (index, None, error) for index, parameters, error in resolved if parameters is None
+    ]
+    rows.extend((index, values, None) for (index, _), values in zip(valid, kpis))
+    return assemble(axes, metric, rows)
+
+
+def iter_chunks(total: int, size: int) -> List[List[int]]:
+    """Combination indices split into chunks of at most ``size`` for task fan-out."""
+
+    if size <= 0:
+        raise ValueError("Chunk size must be positive")
+    return [list(range(offset, min(offset + size, total))) for offset in range(0, total, size)]
@@ -0,0 +1,12 @@
+"""Shared pytest fixtures for the worker tests."""
+
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _candle_store_path(tmp_path, monkeypatch) -> None:
+    """Keep the task-level candle store out of the developer's home directory."""
+
+    monkeypatch.setenv("CANDLE_STORE_PATH", str(tmp_path / "candles"))
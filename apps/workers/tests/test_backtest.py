@@ -0,0 +1,139 @@
+"""Tests for the vectorized backtest engine and task."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from blockbuilders_workers.backtest import EXIT_STOP, StrategyParameters, execute_backtest
+from blockbuilders_workers.celery_app import app, run_backtest
+from blockbuilders_workers.indicators import ema
+from blockbuilders_workers.market_data import Candles, synthetic_candles
+
+from blockbuilders_shared import StrategyGraphError, StrategySeed, compile_strategy
+
+
+def _parameters(seed: dict) -> StrategyParameters:
+    return StrategyParameters.from_plan(compile_strategy(StrategySeed.model_validate(seed)))
+
+
+def _demo_seed(**overrides: dict) -> dict:
+    configs = {
+        "data-source": {"symbol": "BTC-USD", "interval": "1h"},
+        "indicator": {"fast": 12, "slow": 26},
+        "signal": {"entry": "bullish_crossover", "exit": "bearish_crossover"},
+        "risk": {"positionSize": 0.5, "stopLoss": 0.03},
+        "execution": {"adapter": "paper-trading", "mode": "simulation", "feeBps": 10},
+    }
+    configs.update(overrides)
+    kinds = list(configs)
+    return {
+        "strategyId": "demo-user",
+        "name": "Quickstart Momentum",
+        "versionId": "demo-v1",
+        "versionLabel": "v1",
+        "blocks": [
+            {"id": f"node-{kind}", "kind": kind, "label": kind, "position": {"x": 0, "y": 0}, "config": configs[kind]}
+            for kind in kinds
+        ],
+        "edges": [
+            {"id": f"edge-{index}", "source": f"node-{source}", "target": f"node-{target}"}
+            for index, (source, target) in enumerate(zip(kinds, kinds[1:]))
+        ],
+        "callouts": [],
+    }
+
+
+def _reference_backtest(candles: Candles, parameters: StrategyParameters, initial_capital: float) -> np.ndarray:
+    """Straightforward bar-by-bar simulation the vectorized engine must agree with."""
+
+    fast, slow = ema(candles.close, parameters.fast), ema(candles.close, parameters.slow)
+    fee = parameters.fee_bps / 10_000 * parameters.position_size
+    cash_level = initial_capital
+    equity = np.empty(len(candles))
+    entry_price = None
+    for index in range(len(candles)):
+        crossed = index >= parameters.slow and (fast[index] > slow[index]) != (fast[index - 1] > slow[index - 1])
+        bullish = crossed and fast[index] > slow[index]
+        if entry_price is not None:
+            level = entry_price * (1 - parameters.stop_loss)
+            exit_price = None
+            if candles.low[index] <= level:
+                exit_price = min(candles.open[index], level)
+            elif (crossed and not bullish) or index == len(candles) - 1:
+                exit_price = candles.close[index]
+            if exit_price is not None:
+                cash_level *= 1 + parameters.position_size * (exit_price / entry_price - 1) - 2 * fee
+                entry_price = None
+                equity[index] = cash_level
+                continue
+            equity[index] = cash_level * (1 - fee + parameters.position_size * (candles.close[index] / entry_price - 1))
+            continue
+        if bullish and index < len(candles) - 1:
+            entry_price = candles.close[index]
+            equity[index] = cash_level * (1 - fee)
+            continue
+        equity[index] = cash_level
+    return equity
+
+
+def test_ema_matches_recursive_definition() -> None:
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(3).normal(0, 0.01, 5_000)))
+    for period in (1, 12, 26, 500):
+        alpha = 2 / (period + 1)
+        expected = np.empty_like(close)
+        previous = close[0]
+        for index, value in enumerate(close):
+            previous = alpha * value + (1 - alpha) * previous
+            expected[index] = previous
+        np.testing.assert_allclose(ema(close, period), expected, rtol=1e-12)
+
+
+def test_vectorized_engine_matches_bar_by_bar_reference() -> None:
+    candles = synthetic_candles(
+        "BTC-USD",
+        "1h",
+        datetime(2023, 1, 1, tzinfo=timezone.utc),
+        datetime(2023, 7, 1, tzinfo=timezone.utc),
+    )
+    parameters = _parameters(_demo_seed())
+
+    result = execute_backtest(candles, parameters, initial_capital=10_000.0)
+
+    np.testing.assert_allclose(result.equity, _reference_backtest(candles, parameters, 10_000.0), rtol=1e-9)
+    assert (result.trades.exit_reason == EXIT_STOP).any()
+    assert result.kpis["trades"] == len(result.trades) > 0
+    assert result.kpis["totalReturn"] == pytest.approx(result.equity[-1] / 10_000.0 - 1)
+
+
+def test_empty_window_reports_the_same_kpis_as_a_full_one() -> None:
+    end = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    parameters = _parameters(_demo_seed())
+    full = execute_backtest(synthetic_candles("BTC-USD", "1h", datetime(2022, 12, 1, tzinfo=timezone.utc), end), parameters)
+    empty = execute_backtest(synthetic_candles("BTC-USD", "1h", end, end), parameters)
+
+    assert set(empty.kpis) == set(full.kpis)
+    assert all(value == 0 for value in empty.kpis.values())
+
+
+def test_parameters_reject_unsupported_layouts_and_configs() -> None:
+    seed = _demo_seed()
+    seed["edges"] = seed["edges"][:-1]
+    with pytest.raises(StrategyGraphError):
+        _parameters(seed)
+
+    with pytest.raises(StrategyGraphError):
+        _parameters(_demo_seed(indicator={"fast": 30, "slow": 10}))
+
+
+def test_run_backtest_task_returns_payload() -> None:
+    payload = run_backtest.run(seed=_demo_seed(), start="2024-01-01T00:00:00+00:00", end="2024-03-01T00:00:00+00:00")
+
+    assert run_backtest.name in app.tasks
+    assert payload["strategyId"] == "demo-user"
+    assert payload["bars"] == 60 * 24
+    assert payload["equityCurve"][0] == {"time": 1704067200, "equity": 10_000.0}
+    assert set(payload["kpis"]) >= {"totalReturn", "cagr", "maxDrawdown", "sharpe", "trades", "winRate"}
+    assert len(payload["trades"]) == payload["kpis"]["trades"]
@@ -0,0 +1,124 @@
+"""Tests for the memory-mapped candle store."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from blockbuilders_workers.candle_store import CandleStore, fixture_source, load_candles
+from blockbuilders_workers.market_data import synthetic_candles
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def store(tmp_path) -> CandleStore:
+    return CandleStore(tmp_path)
+
+
+def test_read_slices_time_ranges_as_read_only_views(store: CandleStore) -> None:
+    candles = synthetic_candles("BTC-USD", "1m", START, START + timedelta(days=2))
+    assert store.append(candles) == len(candles)
+
+    window = store.read("BTC-USD", "1m", START + timedelta(hours=1), START + timedelta(hours=2, seconds=30))
+
+    assert len(window) == 61
+    assert window.timestamp[0] == int((START + timedelta(hours=1)).timestamp())
+    np.testing.assert_array_equal(window.close, candles.close[60:121])
+    assert not window.close.flags.writeable
+    assert not window.close.flags.owndata
+    assert len(store.read("BTC-USD", "1m")) == len(candles)
+    assert len(store.read("BTC-USD", "1m", START - timedelta(days=1), START)) == 0
+
+
+def test_append_is_incremental_and_skips_stored_bars(store: CandleStore) -> None:
+    full = synthetic_candles("BTC-USD", "1h", START, START + timedelta(days=3))
+    head = store.read("BTC-USD", "1h")
+    assert len(head) == 0 and store.bounds("BTC-USD", "1h") is None
+
+    store.append(synthetic_candles("BTC-USD", "1h", START, START + timedelta(days=2)))
+    written = store.append(full)
+
+    assert written == 24
+    stored = store.read("BTC-USD", "1h")
+    np.testing.assert_array_equal(stored.timestamp, full.timestamp)
+    np.testing.assert_array_equal(stored.close, full.close)
+    assert store.bounds("BTC-USD", "1h") == (int(full.timestamp[0]), int(full.timestamp[-1]))
+
+
+def test_append_discards_bytes_beyond_the_manifest(store: CandleStore, tmp_path) -> None:
+    candles = synthetic_candles("ETH-USD", "1d", START, START + timedelta(days=10))
+    store.append(candles)
+    # Simulate a writer that died after writing a column but before committing the manifest.
+    with open(tmp_path / "ETH-USD" / "1d" / "close.f8", "ab") as handle:
+        handle.write(b"\x00" * 24)
+
+    assert len(store.read("ETH-USD", "1d")) == 10
+    store.append(synthetic_candles("ETH-USD", "1d", START, START + timedelta(days=12)))
+
+    stored = store.read("ETH-USD", "1d")
+    assert len(stored) == 12
+    assert (tmp_path / "ETH-USD" / "1d" / "close.f8").stat().st_size == 12 * 8
+    manifest = json.loads((tmp_path / "ETH-USD" / "1d" / "manifest.json").read_text())
+    assert manifest["rows"] == 12
+
+
+def test_append_rejects_unsorted_bars_and_unsafe_symbols(store: CandleStore) -> None:
+    candles = synthetic_candles("BTC-USD", "1d", START, START + timedelta(days=3))
+    shuffled = type(candles)(
+        candles.symbol,
+        candles.interval,
+        candles.timestamp[::-1].copy(),
+        candles.open,
+        candles.high,
+        candles.low,
+        candles.close,
+        candles.volume,
+    )
+
+    with pytest.raises(ValueError, match="strictly increasing"):
+        store.append(shuffled)
+    with pytest.raises(ValueError, match="symbol"):
+        store.read("../etc", "1d")
+    with pytest.raises(ValueError, match="interval"):
+        store.read("BTC-USD", "1x")
+
+
+def test_load_candles_fetches_only_missing_bars_and_stays_continuous(store: CandleStore) -> None:
+    calls = []
+    fixture = fixture_source(store)
+
+    def source(symbol, interval, start, end):
+        calls.append((start, end))
+        return fixture(symbol, interval, start, end)
+
+    end = START + timedelta(days=30)
+    first = load_candles("BTC-USD", "1h", START, end, store=store, source=source)
+    again = load_candles("BTC-USD", "1h", START, end, store=store, source=source)
+    later = load_candles("BTC-USD", "1h", end, end + timedelta(days=1), store=store, source=source)
+
+    assert len(first) == len(again) == 30 * 24
+    assert len(later) == 24
+    assert len(calls) == 2
+    assert calls[1][0] == end
+    # The fixture continues from the last stored close instead of restarting the price path.
+    assert later.open[0] == pytest.approx(first.close[-1])
+
+
+def test_ensure_never_commits_a_bar_that_is_still_forming(store: CandleStore) -> None:
+    now = START + timedelta(days=2, minutes=30)
+    fetched = []
+
+    def source(symbol, interval, start, end):
+        fetched.append(end)
+        return synthetic_candles(symbol, interval, start, end)
+
+    appended = store.ensure("BTC-USD", "1h", now + timedelta(hours=5), source, since=START, now=now)
+
+    assert fetched == [START + timedelta(days=2)]
+    assert appended == 48
+    assert store.ensure("BTC-USD", "1h", now, source, since=START, now=now) == 0
+    assert store.ensure("BTC-USD", "1h", now, source, since=START, now=now + timedelta(hours=1)) == 1
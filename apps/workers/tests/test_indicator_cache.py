@@ -0,0 +1,208 @@
+"""Tests for the shared indicator cache."""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from blockbuilders_workers.backtest import StrategyParameters, execute_backtest
+from blockbuilders_workers.indicator_cache import IndicatorCache, indicator_key, sweep_orphaned_segments
+from blockbuilders_workers.indicators import ema, rsi, sma
+from blockbuilders_workers.market_data import Candles, synthetic_candles
+
+
+def _candles(bars: int = 2_000):
+    # A fresh symbol per test keeps shared segment names from colliding between runs.
+    symbol = f"T{uuid.uuid4().hex[:8]}-USD"
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = datetime.fromtimestamp(start.timestamp() + bars * 60, tz=timezone.utc)
+    return synthetic_candles(symbol, "1m", start, end)
+
+
+@pytest.fixture
+def cache():
+    cache = IndicatorCache(max_bytes=1 << 20)
+    yield cache
+    cache.close()
+
+
+def test_indicators_match_reference_loops() -> None:
+    close = np.array([10.0, 11.0, 10.5, 12.0, 12.0, 11.0])
+
+    expected_sma = [np.mean(close[max(0, index - 2) : index + 1]) for index in range(close.shape[0])]
+    assert sma(close, 3) == pytest.approx(expected_sma)
+
+    gains = losses = 0.0
+    expected_rsi = []
+    for previous, current in zip(np.concatenate(([close[0]], close[:-1])), close):
+        gains = 0.5 * gains + 0.5 * max(current - previous, 0.0)
+        losses = 0.5 * losses + 0.5 * max(previous - current, 0.0)
+        expected_rsi.append(100.0 * gains / (gains + losses) if gains + losses else 50.0)
+    assert rsi(close, 2) == pytest.approx(expected_rsi)
+
+
+def test_cache_hits_return_the_same_read_only_array(cache: IndicatorCache) -> None:
+    candles = _candles()
+
+    first = cache.indicator(candles, "ema", 12)
+    second = cache.indicator(candles, "ema", 12)
+
+    assert second is first
+    assert not first.flags.writeable
+    np.testing.assert_allclose(first, ema(candles.close, 12))
+    assert cache.metrics()["hits"] == 1
+    assert cache.metrics()["misses"] == 1
+
+
+def test_cache_keys_include_parameters_and_data_range(cache: IndicatorCache) -> None:
+    candles = _candles()
+
+    cache.indicator(candles, "ema", 12)
+    cache.indicator(candles, "ema", 26)
+    cache.indicator(candles, "sma", 12)
+    cache.indicator(synthetic_candles(candles.symbol, "1m", datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 1, 2, tzinfo=timezone.utc)), "ema", 12)
+
+    assert cache.metrics()["misses"] == 4
+    assert cache.metrics()["hits"] == 0
+
+
+def test_cache_keys_change_when_the_same_range_is_rewritten(cache: IndicatorCache) -> None:
+    candles = _candles()
+    rewritten = Candles(**{**candles.__dict__, "close": candles.close * 1.01})
+
+    assert indicator_key(rewritten, "ema", 12) != indicator_key(candles, "ema", 12)
+    np.testing.assert_allclose(cache.indicator(rewritten, "ema", 12), ema(rewritten.close, 12))
+    assert cache.metrics()["misses"] == 1
+    np.testing.assert_allclose(cache.indicator(candles, "ema", 12), ema(candles.close, 12))
+    assert cache.metrics()["misses"] == 2
+
+
+def test_cache_evicts_least_recently_used_entries_by_bytes() -> None:
+    candles = _candles(bars=1_000)
+    cache = IndicatorCache(max_bytes=2 * candles.close.nbytes)
+    try:
+        cache.indicator(candles, "ema", 5)
+        cache.indicator(candles, "ema", 6)
+        cache.indicator(candles, "ema", 5)
+        cache.indicator(candles, "ema", 7)
+
+        metrics = cache.metrics()
+        assert metrics["entries"] == 2
+        assert metrics["evictions"] == 1
+        assert metrics["bytes"] <= cache.max_bytes
+
+        cache.indicator(candles, "ema", 5)
+        assert cache.metrics()["hits"] == 2
+        cache.indicator(candles, "ema", 6)
+        assert cache.metrics()["misses"] == 4
+    finally:
+        cache.close()
+
+
+def _attach_in_child(candles, queue) -> None:
+    cache = IndicatorCache()
+    values = cache.indicator(candles, "ema", 12)
+    queue.put((cache.metrics()["sharedHits"], float(values.sum())))
+    cache.close()
+
+
+def test_other_processes_attach_to_published_arrays(cache: IndicatorCache) -> None:
+    try:
+        context = multiprocessing.get_context("fork")
+    except ValueError:  # pragma: no cover - platform without fork
+        pytest.skip("fork start method unavailable")
+    candles = _candles()
+    values = cache.indicator(candles, "ema", 12)
+
+    queue = context.Queue()
+    child = context.Process(target=_attach_in_child, args=(candles, queue))
+    child.start()
+    shared_hits, total = queue.get(timeout=10)
+    child.join(timeout=10)
+
+    assert shared_hits == 1
+    assert total == pytest.approx(float(values.sum()))
+    # The child closing its cache must not unlink the segment this process published.
+    assert cache.indicator(candles, "ema", 12) is values
+
+
+def _publish_and_die(candles) -> None:
+    IndicatorCache().indicator(candles, "ema", 12)
+    os._exit(0)
+
+
+def test_segments_left_by_a_killed_worker_are_adopted_or_swept() -> None:
+    try:
+        context = multiprocessing.get_context("fork")
+    except ValueError:  # pragma: no cover - platform without fork
+        pytest.skip("fork start method unavailable")
+    shm = Path("/dev/shm")
+    if not shm.is_dir():  # pragma: no cover - platform without /dev/shm
+        pytest.skip("/dev/shm unavailable")
+
+    def orphan(candles) -> set[str]:
+        before = {path.name for path in shm.glob("bbind*")}
+        child = context.Process(target=_publish_and_die, args=(candles,))
+        child.start()
+        child.join(timeout=10)
+        return {path.name for path in shm.glob("bbind*")} - before
+
+    adopted_candles = _candles()
+    adopted = orphan(adopted_candles)
+    assert len(adopted) == 1
+    cache = IndicatorCache()
+    cache.indicator(adopted_candles, "ema", 12)
+    assert cache.metrics()["sharedHits"] == 1
+    cache.close()
+    assert not any((shm / name).exists() for name in adopted)
+
+    swept = orphan(_candles())
+    assert len(swept) == 1
+    assert sweep_orphaned_segments() >= 1
+    assert not any((shm / name).exists() for name in swept)
+
+
+def test_sweep_leaves_segments_that_are_still_being_published() -> None:
+    shm = Path("/dev/shm")
+    if not shm.is_dir():  # pragma: no cover - platform without /dev/shm
+        pytest.skip("/dev/shm unavailable")
+
+    # A publisher that has created its segment but not yet written the header.
+    segment = shared_memory.SharedMemory(name=f"bbind{uuid.uuid4().hex[:20]}", create=True, size=64)
+    resource_tracker.unregister(segment._name, "shared_memory")
+    path = shm / segment.name
+    try:
+        sweep_orphaned_segments()
+        assert path.exists()
+
+        stale = time.time() - 3600
+        os.utime(path, (stale, stale))
+        sweep_orphaned_segments()
+        assert not path.exists()
+    finally:
+        segment.close()
+        if path.exists():
+            segment.unlink()
+
+
+def test_local_only_cache_and_backtest_results_match() -> None:
+    candles = _candles(bars=5_000)
+    parameters = StrategyParameters(symbol=candles.symbol, interval="1m", fast=12, slow=26, stop_loss=0.01)
+    cache = IndicatorCache(shared=False)
+    try:
+        cached = execute_backtest(candles, parameters, cache=cache)
+        again = execute_backtest(candles, parameters, cache=cache)
+    finally:
+        cache.close()
+    plain = execute_backtest(candles, parameters)
+
+    assert cached.kpis == plain.kpis == again.kpis
+    assert cache.metrics()["hits"] == 2
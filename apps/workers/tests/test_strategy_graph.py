@@ -0,0 +1,80 @@
+"""Tests for the shared strategy graph compiler."""
+
+from __future__ import annotations
+
+import pytest
+
+from blockbuilders_shared import StrategyGraphError, StrategySeed, compile_strategy
+from blockbuilders_shared.strategy_graph import PlanCache, build_plan
+
+
+def _seed(user_id: str, *, edges: list[tuple[str, str]] | None = None, label: str = "EMA Crossover") -> StrategySeed:
+    blocks = [
+        ("node-risk", "risk", {"positionSize": 0.02, "stopLoss": 0.03}),
+        ("node-data", "data-source", {"symbol": "BTC-USD", "interval": "1d"}),
+        ("node-signal", "signal", {"entry": "bullish_crossover", "exit": "bearish_crossover"}),
+        ("node-indicator", "indicator", {"fast": 12, "slow": 26}),
+    ]
+    edges = edges or [("node-data", "node-indicator"), ("node-indicator", "node-signal"), ("node-signal", "node-risk")]
+    return StrategySeed.model_validate(
+        {
+            "strategyId": f"demo-{user_id}",
+            "name": "Quickstart Momentum",
+            "versionId": "demo-v1",
+            "versionLabel": "v1",
+            "blocks": [
+                {"id": block_id, "kind": kind, "label": label, "position": {"x": 0, "y": 0}, "config": config}
+                for block_id, kind, config in blocks
+            ],
+            "edges": [
+                {"id": f"{user_id}-{index}", "source": source, "target": target}
+                for index, (source, target) in enumerate(edges)
+            ],
+            "callouts": [],
+        }
+    )
+
+
+def test_plan_orders_blocks_topologically() -> None:
+    plan = build_plan(_seed("a").blocks, _seed("a").edges)
+
+    assert [step.block_id for step in plan.steps] == ["node-data", "node-indicator", "node-signal", "node-risk"]
+    assert plan.step("node-signal").inputs == ("node-indicator",)
+    with pytest.raises(TypeError):
+        plan.step("node-indicator").config["fast"] = 5  # type: ignore[index]
+
+
+def test_identical_graphs_share_one_cached_plan() -> None:
+    cache = PlanCache(maxsize=2)
+
+    first = cache.compile(_seed("alice"))
+    second = cache.compile(_seed("bob", label="Renamed"))
+
+    assert second is first
+    assert (cache.hits, cache.misses) == (1, 1)
+    changed = _seed("carol", edges=[("node-data", "node-indicator"), ("node-indicator", "node-signal")])
+    assert cache.compile(changed).graph_hash != first.graph_hash
+
+
+def test_plan_order_depends_only_on_what_is_hashed() -> None:
+    seed = _seed("a", edges=[("node-data", "node-risk"), ("node-indicator", "node-risk"), ("node-data", "node-signal")])
+    plan = build_plan(seed.blocks, seed.edges)
+    shuffled = build_plan(list(reversed(seed.blocks)), list(reversed(seed.edges)))
+
+    assert shuffled.graph_hash == plan.graph_hash
+    assert shuffled.steps == plan.steps
+    assert [step.block_id for step in plan.steps] == ["node-data", "node-indicator", "node-risk", "node-signal"]
+    assert plan.step("node-risk").inputs == ("node-data", "node-indicator")
+
+
+@pytest.mark.parametrize(
+    ("edges", "message"),
+    [
+        ([("node-data", "node-indicator"), ("node-indicator", "node-missing")], "unknown block"),
+        ([("node-data", "node-indicator"), ("node-indicator", "node-signal"), ("node-signal", "node-indicator")], "cycle"),
+        ([("node-data", "node-indicator"), ("node-data", "node-indicator")], "Duplicate edge"),
+    ],
+)
+def test_invalid_graphs_are_rejected(edges: list[tuple[str, str]], message: str) -> None:
+    with pytest.raises(StrategyGraphError, match=message):
+        compile_strategy(_seed("x", edges=edges))
@@ -0,0 +1,197 @@
+"""Tests for parameter sweeps."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from blockbuilders_workers import candle_store
+from blockbuilders_workers.backtest import execute_backtest
+from blockbuilders_workers.candle_store import FIXTURE_ORIGIN
+from blockbuilders_workers.celery_app import dispatch_sweep, rank_sweep, sweep_chunk, sweep_window
+from blockbuilders_workers.indicator_cache import IndicatorCache
+from blockbuilders_workers.market_data import synthetic_candles
+from blockbuilders_workers.sweep import (
+    apply_overrides,
+    ema_indicators,
+    evaluate,
+    iter_chunks,
+    parse_axes,
+    run_sweep,
+    sweep_parameters,
+)
+
+from blockbuilders_shared import StrategySeed, compile_strategy
+
+from test_backtest import _demo_seed
+
+RANGES = {
+    "indicator.fast": {"start": 4, "stop": 12, "step": 4},
+    "indicator.slow": [8, 20],
+    "risk.stopLoss": [None, 0.02],
+    "risk.positionSize": {"start": 0.5, "stop": 1.0, "step": 0.25},
+}
+
+
+@pytest.fixture(scope="module")
+def plan():
+    return compile_strategy(StrategySeed.model_validate(_demo_seed()))
+
+
+@pytest.fixture(scope="module")
+def candles():
+    return synthetic_candles(
+        "BTC-USD", "1h", datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 4, 1, tzinfo=timezone.utc)
+    )
+
+
+@pytest.fixture
+def cache():
+    cache = IndicatorCache(shared=False)
+    yield cache
+    cache.close()
+
+
+def test_parse_axes_expands_ranges_and_resolves_blocks(plan) -> None:
+    axes = parse_axes(plan, {**RANGES, "execution.feeBps": 5})
+
+    assert [axis.values for axis in axes] == [(4, 8, 12), (8, 20), (None, 0.02), (0.5, 0.75, 1.0), (5,)]
+    assert axes[0].block_id == plan.by_kind("indicator")[0].block_id
+    assert parse_axes(plan, {f"{axes[0].block_id}.fast": [5]})[0].block_id == axes[0].block_id
+    assert parse_axes(plan, {"risk.stopLoss": {"start": 0.01, "stop": 0.03, "step": 0.01}})[0].values == (
+        0.01,
+        0.02,
+        0.03,
+    )
+
+
+@pytest.mark.parametrize(
+    ("ranges", "message"),
+    [
+        ({"fast": [1]}, "must look like"),
+        ({"portfolio.fast": [1]}, "matches no block"),
+        ({"data-source.interval": ["1h", "4h"]}, "data source"),
+        ({"indicator.fast": []}, "empty"),
+        ({"indicator.fast": {"start": 1, "stop": 5}}, "start, stop and step"),
+        ({"indicator.fast": list(range(200)), "indicator.slow": list(range(200))}, "limit"),
+    ],
+)
+def test_parse_axes_rejects_invalid_ranges(plan, ranges, message) -> None:
+    with pytest.raises(ValueError, match=message):
+        parse_axes(plan, ranges)
+
+
+def test_sweep_matches_individual_backtests_and_ranks_them(plan, candles) -> None:
+    result = run_sweep(candles, plan, RANGES)
+
+    assert result.shape == (3, 2, 2, 3)
+    matrix = result.matrix()
+    # fast=8 and fast=12 are not below slow=8, so those cells are invalid rather than failing the sweep.
+    assert np.isnan(matrix[1:, 0]).all()
+    assert len(result.errors) == 12
+    assert "fast < slow" in next(iter(result.errors.values()))
+
+    axes = parse_axes(plan, RANGES)
+    for index, parameters, error in sweep_parameters(plan, axes, range(len(result.kpis))):
+        if error is None:
+            assert result.kpis[index] == execute_backtest(candles, parameters).kpis
+
+    ranking = result.ranking()
+    scores = matrix.reshape(-1)[ranking]
+    assert len(ranking) == len(result.kpis) - 12
+    assert np.all(np.diff(scores) <= 0)
+
+    payload = result.to_payload(top=3)
+    assert [row["rank"] for row in payload["ranked"]] == [1, 2, 3]
+    assert payload["ranked"][0]["kpis"]["sharpe"] == scores[0]
+    assert set(payload["ranked"][0]["parameters"]) == set(RANGES)
+    assert payload["matrix"][2][0] == [[None] * 3] * 2
+
+
+def test_evaluate_returns_kpis_in_input_order_when_trade_groups_interleave(plan, candles, cache) -> None:
+    axes = parse_axes(plan, RANGES)
+    valid = [parameters for _, parameters, error in sweep_parameters(plan, axes, range(36)) if error is None]
+    shuffled = valid[::2] + valid[1::2]
+
+    indicators = ema_indicators(candles, shuffled, cache)
+
+    assert evaluate(candles, shuffled, indicators, initial_capital=10_000.0) == [
+        execute_backtest(candles, parameters).kpis for parameters in shuffled
+    ]
+
+
+def test_sweep_ranks_drawdown_ascending_and_rejects_unknown_metrics(plan, candles) -> None:
+    result = run_sweep(candles, plan, {"indicator.fast": [4, 8], "risk.positionSize": [0.25, 1.0]}, metric="maxDrawdown")
+    scores = result.matrix().reshape(-1)[result.ranking()]
+    assert np.all(np.diff(scores) >= 0)
+
+    with pytest.raises(ValueError, match="metric"):
+        run_sweep(candles, plan, RANGES, metric="alpha")
+
+
+@pytest.mark.parametrize("metric", ["exposure", "averageTradeReturn"])
+def test_sweep_over_an_empty_window_scores_every_metric(plan, metric) -> None:
+    end = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    empty = synthetic_candles("BTC-USD", "1d", end, end)
+
+    result = run_sweep(empty, plan, {"indicator.fast": [4, 8], "risk.stopLoss": [None, 0.02]}, metric=metric)
+
+    assert result.matrix().tolist() == [[0.0, 0.0], [0.0, 0.0]]
+    assert len(result.to_payload(top=1)["ranked"]) == 1
+
+
+def test_process_pool_sweep_matches_sequential(plan, candles) -> None:
+    sequential = run_sweep(candles, plan, RANGES)
+    pooled = run_sweep(candles, plan, RANGES, workers=2)
+
+    assert pooled.kpis == sequential.kpis
+    assert pooled.errors == sequential.errors
+
+
+def test_overrides_leave_the_base_plan_untouched(plan) -> None:
+    axes = parse_axes(plan, {"indicator.fast": [5]})
+    overridden = apply_overrides(plan, axes, (5,))
+
+    assert overridden.by_kind("indicator")[0].config["fast"] == 5
+    assert plan.by_kind("indicator")[0].config["fast"] == 12
+
+
+def test_chunk_tasks_and_ranking_callback_cover_the_grid(plan) -> None:
+    seed = _demo_seed()
+    window = {"start": "2024-01-01T00:00:00+00:00", "end": "2024-02-01T00:00:00+00:00"}
+    chunks = [
+        sweep_chunk.run(seed=seed, ranges=RANGES, indices=indices, **window) for indices in iter_chunks(36, 10)
+    ]
+    payload = rank_sweep.run(chunks, seed=seed, ranges=RANGES)
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 10, 6]
+    assert payload["strategyId"] == "demo-user"
+    assert payload["combinations"] == 36
+    assert payload["invalid"] == 12
+    assert len(payload["ranked"]) == 24
+
+
+def test_pinned_window_gives_early_and_late_chunks_the_same_bars(monkeypatch) -> None:
+    seed = _demo_seed(**{"data-source": {"symbol": "BTC-USD", "interval": "1m"}})
+    ranges = {"indicator.fast": [4, 8], "indicator.slow": [20]}
+    dispatched_at = FIXTURE_ORIGIN + timedelta(days=1, seconds=30)
+    start, end = sweep_window(compile_strategy(StrategySeed.model_validate(seed)), None, None, now=dispatched_at)
+    assert end == FIXTURE_ORIGIN + timedelta(days=1)
+    window = {"start": (end - timedelta(hours=2)).isoformat(), "end": end.isoformat()}
+
+    chunks = []
+    # The first chunk runs while the dispatch-time bar is still forming, the second after it closed.
+    for ran_at in (dispatched_at + timedelta(seconds=5), dispatched_at + timedelta(seconds=50)):
+        monkeypatch.setattr(candle_store, "_utcnow", lambda ran_at=ran_at: ran_at)
+        chunks.append(sweep_chunk.run(seed=seed, ranges=ranges, indices=[0, 1], **window))
+
+    assert chunks[0] == chunks[1]
+
+
+def test_dispatch_validates_before_queueing() -> None:
+    with pytest.raises(ValueError, match="metric"):
+        dispatch_sweep(seed=_demo_seed(), ranges=RANGES, metric="alpha")
+    with pytest.raises(ValueError, match="matches no block"):
+        dispatch_sweep(seed=_demo_seed(), ranges={"portfolio.size": [1]})
@@ -9,11 +9,13 @@ from .schemas import (
     OnboardingCallout,
     PlanUsage,
     PlanUsageMetric,
+    PlanUsageSummary,
     SimulationConsent,
     StrategyBlock,
     StrategyEdge,
     StrategySeed,
 )
+from .strategy_graph import ExecutionPlan, PlanStep, StrategyGraphError, compile_strategy
 
 __all__ = [
     "SimulationConsent",
@@ -23,10 +25,15 @@ __all__ = [
     "StrategyBlock",
     "StrategyEdge",
     "StrategySeed",
+    "ExecutionPlan",
+    "PlanStep",
+    "StrategyGraphError",
+    "compile_strategy",
     "OnboardingCallout",
     "CalloutAction",
     "PlanUsage",
     "PlanUsageMetric",
+    "PlanUsageSummary",
     "ONBOARDING_CALLOUTS",
     "ONBOARDING_CALLOUT_MAP",
     "ONBOARDING_CALLOUT_ORDER",
@@ -116,3 +116,7 @@ class PlanUsage(BaseModel):
 
     class Config:
         populate_by_name = True
+
+
+class PlanUsageSummary(BaseModel):
+    usages: List[PlanUsage]
@@ -0,0 +1,165 @@
+"""Validate strategy graphs and compile them into cached, immutable execution plans."""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Tuple
+
+from .schemas import StrategyBlock, StrategyEdge, StrategySeed
+
+
+class StrategyGraphError(ValueError):
+    """Raised when a strategy graph cannot be compiled into an execution plan."""
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    block_id: str
+    kind: str
+    config: Mapping[str, Any]
+    inputs: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """Blocks in dependency order. Identical graphs share one plan, keyed by ``graph_hash``.
+
+    Only what affects execution is hashed (block ids, kinds and configs, and edge endpoints);
+    labels, canvas positions, edge ids and the owning strategy are ignored.
+    """
+
+    graph_hash: str
+    steps: Tuple[PlanStep, ...]
+
+    def step(self, block_id: str) -> PlanStep:
+        for step in self.steps:
+            if step.block_id == block_id:
+                return step
+        raise KeyError(block_id)
+
+    def by_kind(self, kind: str) -> Tuple[PlanStep, ...]:
+        return tuple(step for step in self.steps if step.kind == kind)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def graph_hash(blocks: List[StrategyBlock], edges: List[StrategyEdge]) -> str:
+    canonical = {
+        "blocks": sorted(([block.id, block.kind, block.config] for block in blocks), key=lambda item: item[0]),
+        "edges": sorted([edge.source, edge.target] for edge in edges),
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def build_plan(blocks: List[StrategyBlock], edges: List[StrategyEdge], *, digest: str | None = None) -> ExecutionPlan:
+    """Validate the graph and order it topologically (Kahn's algorithm, ties broken by block id).
+
+    The order and each step's ``inputs`` depend only on what :func:`graph_hash` covers, so a
+    cached plan is valid for every seed with the same hash, whatever its block or edge order.
+
+    Raises :class:`StrategyGraphError` for duplicate block ids, edges that reference unknown
+    blocks, duplicate edges and cycles.
+    """
+
+    index: Dict[str, StrategyBlock] = {}
+    for block in blocks:
+        if block.id in index:
+            raise StrategyGraphError(f"Duplicate block id {block.id!r}")
+        index[block.id] = block
+
+    successors: Dict[str, List[str]] = {block_id: [] for block_id in index}
+    predecessors: Dict[str, List[str]] = {block_id: [] for block_id in index}
+    seen = set()
+    for edge in edges:
+        missing = [endpoint for endpoint in (edge.source, edge.target) if endpoint not in index]
+        if missing:
+            raise StrategyGraphError(f"Edge {edge.id!r} references unknown block {missing[0]!r}")
+        if (edge.source, edge.target) in seen:
+            raise StrategyGraphError(f"Duplicate edge {edge.source!r} -> {edge.target!r}")
+        seen.add((edge.source, edge.target))
+        successors[edge.source].append(edge.target)
+        predecessors[edge.target].append(edge.source)
+
+    remaining = {block_id: len(sources) for block_id, sources in predecessors.items()}
+    ready = [block_id for block_id, count in remaining.items() if count == 0]
+    heapq.heapify(ready)
+    ordered: List[str] = []
+    while ready:
+        block_id = heapq.heappop(ready)
+        ordered.append(block_id)
+        for target in successors[block_id]:
+            remaining[target] -= 1
+            if remaining[target] == 0:
+                heapq.heappush(ready, target)
+
+    if len(ordered) != len(index):
+        cyclic = sorted(block_id for block_id, count in remaining.items() if count > 0)
+        raise StrategyGraphError(f"Strategy graph contains a cycle through {', '.join(cyclic)}")
+
+    steps = tuple(
+        PlanStep(
+            block_id=block_id,
+            kind=index[block_id].kind,
+            config=_freeze(index[block_id].config),
+            inputs=tuple(sorted(predecessors[block_id])),
+        )
+        for block_id in ordered
+    )
+    return ExecutionPlan(graph_hash=digest or graph_hash(blocks, edges), steps=steps)
+
+
+class PlanCache:
+    """Thread-safe LRU of compiled plans keyed by graph hash."""
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._plans: "OrderedDict[str, ExecutionPlan]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, seed: StrategySeed) -> ExecutionPlan:
+        digest = graph_hash(seed.blocks, seed.edges)
+        with self._lock:
+            plan = self._plans.get(digest)
+            if plan is not None:
+                self._plans.move_to_end(digest)
+                self.hits += 1
+                return plan
+            self.misses += 1
+        # Compile outside the lock; a concurrent duplicate compile yields an equal plan.
+        plan = build_plan(seed.blocks, seed.edges, digest=digest)
+        with self._lock:
+            self._plans[digest] = plan
+            while len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+        return plan
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+
+_PLAN_CACHE = PlanCache()
+
+
+def compile_strategy(seed: StrategySeed) -> ExecutionPlan:
+    """Compile ``seed`` into an execution plan, reusing the cached plan for identical graphs."""
+
+    return _PLAN_CACHE.compile(seed)
@@ -13,5 +13,10 @@ export const planUsageSchema = z.object({
   updatedAt: z.string().datetime({ offset: true })
 });
 
+export const planUsageSummarySchema = z.object({
+  usages: z.array(planUsageSchema)
+});
+
 export type PlanUsageMetric = z.infer<typeof planUsageMetricSchema>;
 export type PlanUsage = z.infer<typeof planUsageSchema>;
+export type PlanUsageSummary = z.infer<typeof planUsageSummarySchema>;
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Time the vectorized backtest engine on the Quickstart Momentum demo seed at 1-minute bars."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+for path in (
+    PROJECT_ROOT / "apps" / "api",
+    PROJECT_ROOT / "apps" / "workers",
+    PROJECT_ROOT / "packages" / "shared" / "python",
+):
+    sys.path.insert(0, str(path))
+
+from blockbuilders_shared import compile_strategy  # noqa: E402
+
+from blockbuilders_api.services.workspace import _build_demo_seed  # noqa: E402
+from blockbuilders_workers.backtest import StrategyParameters, execute_backtest  # noqa: E402
+from blockbuilders_workers.indicator_cache import IndicatorCache  # noqa: E402
+from blockbuilders_workers.market_data import synthetic_candles  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    seed = _build_demo_seed("bench-user")
+    for block in seed.blocks:
+        if block.kind == "data-source":
+            block.config["interval"] = args.interval
+    parameters = StrategyParameters.from_plan(compile_strategy(seed))
+
+    end = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    start = end.replace(year=end.year - args.years)
+    started = time.perf_counter()
+    candles = synthetic_candles(parameters.symbol, parameters.interval, start, end)
+    print(f"generated {len(candles):,} {parameters.interval} bars in {time.perf_counter() - started:.2f}s")
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        result = execute_backtest(candles, parameters)
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    print(
+        f"backtest: best {best:.3f}s, median {sorted(timings)[len(timings) // 2]:.3f}s "
+        f"({len(candles) / best / 1e6:.1f}M bars/s), {result.kpis['trades']:,} trades"
+    )
+    print({key: round(value, 4) for key, value in result.kpis.items()})
+
+    cache = IndicatorCache(max_bytes=1 << 30)
+    try:
+        started = time.perf_counter()
+        execute_backtest(candles, parameters, cache=cache)
+        cold = time.perf_counter() - started
+        started = time.perf_counter()
+        execute_backtest(candles, parameters, cache=cache)
+        warm = time.perf_counter() - started
+        print(f"indicator cache: cold {cold:.3f}s, warm {warm:.3f}s, {cache.metrics()}")
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Populate a decade of 1-minute candles in a scratch candle store and time reads from it."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+for path in (
+    PROJECT_ROOT / "apps" / "workers",
+    PROJECT_ROOT / "packages" / "shared" / "python",
+):
+    sys.path.insert(0, str(path))
+
+import numpy as np  # noqa: E402
+
+from blockbuilders_workers.backtest import StrategyParameters, execute_backtest  # noqa: E402
+from blockbuilders_workers.candle_store import CandleStore, fixture_source  # noqa: E402
+
+
+def _best(callable_, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        callable_()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--chunk-days", type=int, default=90, help="size of each incremental append")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    end = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    start = end.replace(year=end.year - args.years)
+    with tempfile.TemporaryDirectory() as root:
+        store = CandleStore(root)
+        source = fixture_source(store)
+        started = time.perf_counter()
+        cursor = start
+        while cursor < end:
+            upper = min(cursor + timedelta(days=args.chunk_days), end)
+            store.ensure("BTC-USD", "1m", upper, source, since=start)
+            cursor = upper
+        size = sum(path.stat().st_size for path in Path(root).rglob("*.?8"))
+        print(f"appended {args.years}y of 1m bars in {args.chunk_days}-day chunks: {time.perf_counter() - started:.2f}s, {size / 1e6:.0f} MB")
+
+        candles = store.read("BTC-USD", "1m")
+        print(f"{len(candles):,} bars; close column is a view: {not candles.close.flags.owndata}")
+        full = _best(lambda: store.read("BTC-USD", "1m"), args.repeat)
+        month = _best(lambda: store.read("BTC-USD", "1m", end - timedelta(days=30), end), args.repeat)
+        print(f"read full decade: {full * 1e3:.3f} ms; read last 30 days: {month * 1e3:.3f} ms")
+
+        scan = _best(lambda: float(np.sum(store.read("BTC-USD", "1m").close)), 3)
+        print(f"full scan of the close column (page cache warm): {scan * 1e3:.1f} ms")
+
+        parameters = StrategyParameters(symbol="BTC-USD", interval="1m", fast=12, slow=26, stop_loss=0.03)
+        backtest = _best(lambda: execute_backtest(store.read("BTC-USD", "1m"), parameters), 3)
+        print(f"read + backtest over the stored decade: {backtest:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Compare disk usage and query latency of the Parquet compliance archive against the CSV export."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+for path in (PROJECT_ROOT / "apps" / "api", PROJECT_ROOT / "packages" / "shared" / "python"):
+    sys.path.insert(0, str(path))
+
+from blockbuilders_shared import AuditEventType, AuditLogEvent  # noqa: E402
+
+from blockbuilders_api.repositories.compliance import ComplianceRepository  # noqa: E402
+from blockbuilders_api.repositories.compliance_archive import ComplianceArchive  # noqa: E402
+
+EVENT_TYPES = list(AuditEventType)
+
+
+def _events(count: int, days: int):
+    rng = random.Random(7)
+    origin = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    step = timedelta(days=days) / count
+    for index in range(count):
+        event_type = rng.choice(EVENT_TYPES)
+        metadata = {}
+        if event_type is AuditEventType.WORKSPACE_CREATED:
+            metadata = {"strategyId": f"strategy-{rng.randrange(5_000)}", "versionId": "v1"}
+        yield AuditLogEvent(
+            id=f"evt_{index}",
+            actor_id=f"user-{rng.randrange(2_000)}",
+            event_type=event_type,
+            created_at=origin + step * index,
+            metadata=metadata,
+        )
+
+
+def _directory_size(path: Path) -> int:
+    return sum(item.stat().st_size for item in path.rglob("*") if item.is_file())
+
+
+def _scan_csv(export_path: Path, actor_id: str, start: datetime, end: datetime) -> int:
+    matches = 0
+    sources = sorted(export_path.parent.glob(f"{export_path.stem}.*{export_path.suffix}")) + [export_path]
+    for source in sources:
+        with source.open("r", encoding="utf-8", newline="") as handle:
+            for row in csv.DictReader(handle):
+                if row["actor_id"] != actor_id:
+                    continue
+                occurred_at = datetime.fromisoformat(row["occurred_at"])
+                if start <= occurred_at < end:
+                    matches += 1
+    return matches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=180)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        archive = ComplianceArchive(root / "archive", batch_size=250_000)
+        repository = ComplianceRepository(export_path=root / "csv" / "audit.csv", archive=archive)
+
+        started = time.perf_counter()
+        for event in _events(args.records, args.days):
+            repository.record(event)
+        repository.close()
+        print(f"ingest: {args.records} events in {time.perf_counter() - started:.1f}s")
+
+        csv_bytes = _directory_size(root / "csv")
+        archive_bytes = _directory_size(root / "archive")
+        print(f"disk: csv {csv_bytes / 1e6:.1f} MB, parquet {archive_bytes / 1e6:.1f} MB ({csv_bytes / archive_bytes:.1f}x smaller)")
+
+        actor_id = "user-42"
+        start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        end = datetime(2024, 4, 1, tzinfo=timezone.utc)
+
+        started = time.perf_counter()
+        csv_matches = _scan_csv(root / "csv" / "audit.csv", actor_id, start, end)
+        csv_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        archive_matches = len(archive.query(actor_id=actor_id, start=start, end=end))
+        archive_seconds = time.perf_counter() - started
+
+        assert csv_matches == archive_matches, (csv_matches, archive_matches)
+        print(f"query actor={actor_id} in March: csv {csv_seconds:.2f}s, parquet {archive_seconds:.3f}s ({csv_matches} rows)")
+        print(f"archive metrics: {archive.metrics()}")
+
+
+if __name__ == "__main__":
+    main()
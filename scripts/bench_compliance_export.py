@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Benchmark the append-only compliance CSV export against the legacy full rewrite per event."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+for path in (PROJECT_ROOT / "apps" / "api", PROJECT_ROOT / "packages" / "shared" / "python"):
+    sys.path.insert(0, str(path))
+
+from blockbuilders_shared import AuditEventType, AuditLogEvent  # noqa: E402
+
+from blockbuilders_api.repositories.compliance import ComplianceRepository  # noqa: E402
+from blockbuilders_api.repositories.compliance_csv import CSV_FIELDNAMES  # noqa: E402
+
+
+def _events(count: int):
+    created_at = datetime.now(timezone.utc)
+    for index in range(count):
+        yield AuditLogEvent(
+            id=f"evt_{index}",
+            actor_id=f"user-{index % 1000}",
+            event_type=AuditEventType.WORKSPACE_CREATED,
+            created_at=created_at,
+            metadata={"strategyId": f"strategy-{index % 50}", "versionId": "v1"},
+        )
+
+
+def bench_legacy(directory: Path, records: int) -> float:
+    """Rewrites the whole export after every event, as ``export_snapshot`` used to."""
+
+    export_path = directory / "legacy.csv"
+    rows = []
+    started = time.perf_counter()
+    for event in _events(records):
+        metadata = event.metadata or {}
+        rows.append(
+            {
+                "event_id": event.id,
+                "event_type": event.event_type.value,
+                "actor_id": event.actor_id,
+                "occurred_at": event.created_at.isoformat(),
+                "strategy_id": metadata.get("strategyId"),
+                "version_id": metadata.get("versionId"),
+                "metadata": json.dumps(metadata, sort_keys=True),
+            }
+        )
+        with export_path.open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=CSV_FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(rows)
+    return time.perf_counter() - started
+
+
+def bench_append(directory: Path, records: int, window: int) -> None:
+    repository = ComplianceRepository(export_path=directory / "audit.csv", rotate_max_bytes=64 * 1024 * 1024)
+    print(f"{'records':>10} {'us/event (window)':>18}")
+    started = window_started = time.perf_counter()
+    for index, event in enumerate(_events(records), start=1):
+        repository.record(event)
+        if index % window == 0:
+            now = time.perf_counter()
+            print(f"{index:>10} {(now - window_started) / window * 1e6:>18.2f}")
+            window_started = now
+    repository.close()
+    total = time.perf_counter() - started
+    print(f"append: {records} events in {total:.2f}s ({total / records * 1e6:.2f} us/event)")
+
+    snapshot_started = time.perf_counter()
+    repository.export_snapshot()
+    print(f"full snapshot: {time.perf_counter() - snapshot_started:.2f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--window", type=int, default=100_000)
+    parser.add_argument("--legacy-records", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy = bench_legacy(Path(directory), args.legacy_records)
+        print(
+            f"legacy rewrite: {args.legacy_records} events in {legacy:.2f}s "
+            f"({legacy / args.legacy_records * 1e6:.2f} us/event, grows linearly with history)"
+        )
+        bench_append(Path(directory), args.records, args.window)
+
+
+if __name__ == "__main__":
+    main()
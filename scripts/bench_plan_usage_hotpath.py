@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Microbenchmark the in-memory quota hot path: per-call latency and allocations.
+
+Each operation is measured twice, with the current ``_UsageState.to_model`` and with the old
+isoformat -> ``model_validate`` round-trip patched back in, so the two can be compared.
+"Peak bytes" is the transient high-water mark of a single call; "retained blocks" is what
+each call leaves allocated while its results are kept alive.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+for path in (PROJECT_ROOT / "apps" / "api", PROJECT_ROOT / "packages" / "shared" / "python"):
+    sys.path.insert(0, str(path))
+
+from blockbuilders_shared import PlanUsage, PlanUsageMetric  # noqa: E402
+
+from blockbuilders_api.repositories.plan_usage import PlanUsageRepository, _UsageState  # noqa: E402
+from blockbuilders_api.services.plan_usage import PlanUsageService  # noqa: E402
+
+METRIC = PlanUsageMetric.BACKTESTS
+USER_ID = "user-bench"
+
+Operation = Callable[[PlanUsageService], Awaitable[Any]]
+
+
+def _legacy_to_model(self: _UsageState) -> PlanUsage:
+    return PlanUsage.model_validate(
+        {
+            "id": self.usage_id,
+            "userId": self.user_id,
+            "metric": self.metric.value,
+            "windowStart": self.window_start.isoformat(),
+            "windowEnd": self.window_end.isoformat(),
+            "used": self.used,
+            "limit": self.limit,
+            "updatedAt": self.updated_at.isoformat(),
+        }
+    )
+
+
+OPERATIONS: dict[str, Operation] = {
+    "get_active_window": lambda service: service.repo.get_active_window(user_id=USER_ID, metric=METRIC),
+    "increment": lambda service: service.repo.increment(user_id=USER_ID, metric=METRIC),
+    "assert_within_quota": lambda service: service.assert_within_quota(user_id=USER_ID, metric=METRIC),
+}
+
+
+def _service() -> PlanUsageService:
+    # A limit no run can reach keeps assert_within_quota on its success path.
+    return PlanUsageService(repo=PlanUsageRepository(limits={METRIC: 1 << 62}))
+
+
+async def _measure(operation: Operation, iterations: int) -> tuple[float, float, float]:
+    service = _service()
+    for _ in range(1_000):
+        await operation(service)
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await operation(service)
+    latency = (time.perf_counter() - started) / iterations
+
+    samples = min(iterations, 10_000)
+    kept: List[Any] = [None] * samples
+    tracemalloc.start()
+    peak_total = 0
+    for index in range(samples):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        kept[index] = await operation(service)
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - current
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for index in range(samples):
+        kept[index] = await operation(service)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return latency, peak_total / samples, retained / samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    current_to_model = _UsageState.to_model
+    print(f"{'operation':<22} {'variant':<8} {'us/call':>9} {'peak bytes':>11} {'retained blocks':>16}")
+    for name, operation in OPERATIONS.items():
+        for variant, to_model in (("legacy", _legacy_to_model), ("current", current_to_model)):
+            _UsageState.to_model = to_model  # type: ignore[method-assign]
+            latency, peak, retained = asyncio.run(_measure(operation, args.iterations))
+            print(f"{name:<22} {variant:<8} {latency * 1e6:>9.2f} {peak:>11.0f} {retained:>16.2f}")
+    _UsageState.to_model = current_to_model  # type: ignore[method-assign]
+
+
+if __name__ == "__main__":
+    main()
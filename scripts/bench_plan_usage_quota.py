@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Stress the plan usage quota check-and-increment across many concurrent users and threads.
+
+Every user fires more requests than their limit allows; the run fails if any user's counter
+ends above the limit or if the number of granted requests differs from the limits' total.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+for path in (PROJECT_ROOT / "apps" / "api", PROJECT_ROOT / "packages" / "shared" / "python"):
+    sys.path.insert(0, str(path))
+
+from blockbuilders_shared import PlanUsageMetric  # noqa: E402
+
+from blockbuilders_api.repositories.plan_usage import PlanUsageRepository  # noqa: E402
+
+METRIC = PlanUsageMetric.BACKTESTS
+
+
+def _hammer(repo: PlanUsageRepository, users: range, attempts: int) -> int:
+    async def run() -> int:
+        granted = 0
+        for _ in range(attempts):
+            for user in users:
+                allowed, _ = await repo.try_increment(user_id=f"user-{user}", metric=METRIC)
+                granted += allowed
+        return granted
+
+    return asyncio.run(run())
+
+
+def bench(*, users: int, threads: int, limit: int, attempts: int, stripes: int) -> None:
+    repo = PlanUsageRepository(limits={METRIC: limit}, lock_stripes=stripes)
+    # Every thread targets every user, so each key is contended by all threads at once.
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        granted = sum(pool.map(lambda _: _hammer(repo, range(users), attempts), range(threads)))
+    elapsed = time.perf_counter() - started
+
+    overshoot = 0
+    for user in range(users):
+        usage = asyncio.run(repo.get_active_window(user_id=f"user-{user}", metric=METRIC))
+        overshoot += max(usage.used - limit, 0)
+
+    operations = users * threads * attempts
+    expected = users * min(limit, threads * attempts)
+    status = "ok" if overshoot == 0 and granted == expected else "FAILED"
+    print(
+        f"{users:>7} users {threads:>3} threads {stripes:>4} stripes: "
+        f"{operations / elapsed:>10.0f} ops/s, granted {granted} (expected {expected}), overshoot {overshoot} [{status}]"
+    )
+    if status != "ok":
+        raise SystemExit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--attempts", type=int, default=30, help="requests per user per thread")
+    args = parser.parse_args()
+
+    for users in (100, 1_000, 5_000):
+        for threads in (1, 4, 16):
+            for stripes in (1, 64):
+                bench(users=users, threads=threads, limit=args.limit, attempts=args.attempts, stripes=stripes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Simulate two days of backtest submissions under each quota window engine.
+
+Users want more backtests than their quota allows, following a daily demand curve. A blocked
+request is retried every minute until it is accepted, which is what produces the midnight
+thundering herd under calendar-day windows. The second simulated day is reported, once
+every engine has reached a steady state: accepted submissions per hour plus the peak minute.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import random
+import statistics
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+for path in (PROJECT_ROOT / "apps" / "api", PROJECT_ROOT / "packages" / "shared" / "python"):
+    sys.path.insert(0, str(path))
+
+from blockbuilders_shared import PlanUsageMetric  # noqa: E402
+
+from blockbuilders_api.repositories.plan_usage import PlanUsageRepository  # noqa: E402
+from blockbuilders_api.repositories.quota_windows import (  # noqa: E402
+    FixedWindow,
+    QuotaWindow,
+    SlidingWindow,
+    TokenBucket,
+)
+
+METRIC = PlanUsageMetric.BACKTESTS
+MINUTES_PER_DAY = 24 * 60
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+ENGINES: Dict[str, Callable[[], QuotaWindow]] = {
+    "fixed": FixedWindow,
+    "sliding/24": lambda: SlidingWindow(buckets=24),
+    "sliding/96": lambda: SlidingWindow(buckets=96),
+    "sliding/288": lambda: SlidingWindow(buckets=288),
+    "token_bucket": TokenBucket,
+}
+
+
+def _demand_rate(minute: int, per_day: float) -> float:
+    """Per-minute request probability, peaking mid-afternoon UTC and lowest before dawn."""
+
+    phase = 2 * math.pi * ((minute % MINUTES_PER_DAY) / MINUTES_PER_DAY - 15 / 24)
+    return per_day / MINUTES_PER_DAY * (1 + 0.8 * math.cos(phase))
+
+
+async def simulate(window: QuotaWindow, *, users: int, limit: int, demand: float, seed: int) -> List[int]:
+    repo = PlanUsageRepository(limits={METRIC: limit}, windows={METRIC: window})
+    rng = random.Random(seed)
+    pending = [0] * users
+    accepted: List[int] = []
+    for minute in range(2 * MINUTES_PER_DAY):
+        at = START + timedelta(minutes=minute)
+        rate = _demand_rate(minute, demand)
+        granted = 0
+        for user in range(users):
+            if rng.random() < rate:
+                pending[user] += 1
+            if pending[user]:
+                allowed, _ = await repo.try_increment(user_id=f"user-{user}", metric=METRIC, at=at)
+                if allowed:
+                    pending[user] -= 1
+                    granted += 1
+        accepted.append(granted)
+    return accepted[MINUTES_PER_DAY:]
+
+
+def _report(name: str, per_minute: List[int]) -> None:
+    hourly = [sum(per_minute[hour * 60 : (hour + 1) * 60]) for hour in range(24)]
+    mean = statistics.fmean(per_minute)
+    peak = max(per_minute)
+    peak_at = per_minute.index(peak)
+    print(
+        f"{name:<13} total {sum(per_minute):>7}  peak {peak:>5}/min at {peak_at // 60:02d}:{peak_at % 60:02d}  "
+        f"peak/mean {peak / mean:>6.1f}  stdev {statistics.pstdev(per_minute):>6.1f}/min"
+    )
+    print("              per hour " + " ".join(f"{count:>5}" for count in hourly))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--demand", type=float, default=30.0, help="mean requests per user per day")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for name, factory in ENGINES.items():
+        per_minute = asyncio.run(
+            simulate(factory(), users=args.users, limit=args.limit, demand=args.demand, seed=args.seed)
+        )
+        _report(name, per_minute)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Time a 1000-combination parameter sweep of the Quickstart Momentum demo seed."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+for path in (
+    PROJECT_ROOT / "apps" / "api",
+    PROJECT_ROOT / "apps" / "workers",
+    PROJECT_ROOT / "packages" / "shared" / "python",
+):
+    sys.path.insert(0, str(path))
+
+from blockbuilders_shared import compile_strategy  # noqa: E402
+
+from blockbuilders_api.services.workspace import _build_demo_seed  # noqa: E402
+from blockbuilders_workers.backtest import execute_backtest  # noqa: E402
+from blockbuilders_workers.market_data import synthetic_candles  # noqa: E402
+from blockbuilders_workers.sweep import parse_axes, run_sweep, sweep_parameters  # noqa: E402
+
+# 10 fast x 10 slow x 5 stop-loss x 2 position sizes = 1000 combinations.
+RANGES = {
+    "indicator.fast": {"start": 4, "stop": 40, "step": 4},
+    "indicator.slow": {"start": 50, "stop": 230, "step": 20},
+    "risk.stopLoss": [None, 0.01, 0.02, 0.03, 0.05],
+    "risk.positionSize": [0.5, 1.0],
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    seed = _build_demo_seed("bench-user")
+    for block in seed.blocks:
+        if block.kind == "data-source":
+            block.config["interval"] = args.interval
+    plan = compile_strategy(seed)
+    end = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    candles = synthetic_candles("BTC-USD", args.interval, end.replace(year=end.year - args.years), end)
+    print(f"{len(candles):,} {args.interval} bars")
+
+    axes = parse_axes(plan, RANGES)
+    combos = [parameters for _, parameters, _ in sweep_parameters(plan, axes, range(1000)) if parameters]
+    sample = combos[:: max(1, len(combos) // 50)]
+    started = time.perf_counter()
+    for parameters in sample:
+        execute_backtest(candles, parameters)
+    naive = (time.perf_counter() - started) / len(sample) * len(combos)
+    print(f"one execute_backtest per combination (extrapolated from {len(sample)}): {naive:.2f}s")
+
+    for workers in sorted({1, args.workers}):
+        started = time.perf_counter()
+        result = run_sweep(candles, plan, RANGES, workers=workers)
+        elapsed = time.perf_counter() - started
+        print(f"run_sweep, {workers} worker(s): {elapsed:.2f}s for {len(result.kpis)} combinations")
+
+    best = result.to_payload(top=1)["ranked"][0]
+    print(f"best by {result.metric}: {best['parameters']} -> {best['kpis'][result.metric]:.3f}")
+
+
+if __name__ == "__main__":
+    main()
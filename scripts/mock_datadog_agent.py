@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import argparse
+import gzip
 import json
 import logging
 from http.server import BaseHTTPRequestHandler, HTTPServer
@@ -14,6 +15,8 @@ class MockDatadogHandler(BaseHTTPRequestHandler):
     def do_POST(self) -> None:  # noqa: N802 - required signature
         length = int(self.headers.get("Content-Length", "0"))
         raw = self.rfile.read(length)
+        if self.headers.get("Content-Encoding") == "gzip":
+            raw = gzip.decompress(raw)
         try:
             payload = json.loads(raw)
             logging.info("Received Datadog payload: %s", json.dumps(payload, indent=2))